@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+수집 광고 레코드
+- AdVideoInfo: 불변 NamedTuple (인스턴스별 __dict__ 없음, 튜플 하나 크기)
+- AdBatch: 한 번에 저장할 광고를 컬럼별 리스트로 담는 컨테이너
+  save_ads / save_ads_bulk 가 행 객체를 다시 만들지 않고 컬럼을 묶어 executemany 에 바로 넘김
+
+메모리/할당 비교는 benchmark_ad_records.py 참고.
+"""
+
+import sys
+from itertools import repeat
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Set
+
+from youtube_urls import canonicalize
+
+class AdVideoInfo(NamedTuple):
+    """광고 비디오 정보 (불변)"""
+    title: str
+    url: str
+    note: str
+    video_id: Optional[str] = None  # 11자리 YouTube ID (정규화된 중복 방지 키)
+
+class AdBatch:
+    """광고 목록의 컬럼형 표현 (제목/URL/메모/video ID 별 리스트)"""
+    
+    __slots__ = ('titles', 'urls', 'notes', 'video_ids')
+    
+    def __init__(self, ads: Iterable = ()):
+        self.titles: List[str] = []
+        self.urls: List[str] = []
+        self.notes: List[str] = []
+        self.video_ids: List[Optional[str]] = []
+        self.extend(ads)
+    
+    def append(self, title: str, url: str, note: str, video_id: Optional[str] = None):
+        """광고 1건 추가 (video_id 가 없으면 URL 을 정규화해서 채움)"""
+        if not video_id:
+            url, video_id = canonicalize(url)
+        self.titles.append(title)
+        self.urls.append(url)
+        self.notes.append(note)
+        self.video_ids.append(video_id)
+    
+    def add(self, ad):
+        self.append(ad.title, ad.url, ad.note, getattr(ad, 'video_id', None))
+    
+    def extend(self, ads: Iterable):
+        if isinstance(ads, AdBatch):
+            self.titles.extend(ads.titles)
+            self.urls.extend(ads.urls)
+            self.notes.extend(ads.notes)
+            self.video_ids.extend(ads.video_ids)
+            return
+        for ad in ads:
+            self.add(ad)
+    
+    def __len__(self) -> int:
+        return len(self.urls)
+    
+    def __iter__(self) -> Iterator[AdVideoInfo]:
+        return map(AdVideoInfo, self.titles, self.urls, self.notes, self.video_ids)
+    
+    def __getitem__(self, index: int) -> AdVideoInfo:
+        return AdVideoInfo(self.titles[index], self.urls[index], self.notes[index], self.video_ids[index])
+    
+    def __repr__(self) -> str:
+        return f"AdBatch({len(self)}개)"
+    
+    def exclude_video_ids(self, video_ids: Set[str]) -> 'AdBatch':
+        """주어진 video ID 의 광고를 뺀 새 배치 (video ID 가 없는 광고는 유지)"""
+        keep = [i for i, video_id in enumerate(self.video_ids) if not video_id or video_id not in video_ids]
+        if len(keep) == len(self):
+            return self
+        batch = AdBatch()
+        batch.titles = [self.titles[i] for i in keep]
+        batch.urls = [self.urls[i] for i in keep]
+        batch.notes = [self.notes[i] for i in keep]
+        batch.video_ids = [self.video_ids[i] for i in keep]
+        return batch
+    
+    def staging_rows(self, batch_no: int, search_query: str, api_source: str) -> Iterator[tuple]:
+        """
+        staging_ads INSERT 용 행 (batch_no, title, url, video_id, note, search_query, api_source)
+        
+        검색어/API 소스는 배치 전체가 같은 문자열 객체 하나를 공유한다.
+        """
+        search_query = sys.intern(search_query)
+        api_source = sys.intern(api_source)
+        return zip(repeat(batch_no), self.titles, self.urls, self.video_ids, self.notes,
+                   repeat(search_query), repeat(api_source))
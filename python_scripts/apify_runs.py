@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Apify 액터 비동기 실행 관리
+- 검색어마다 실행을 시작만 하고 바로 반환 (POST /acts/{actor}/runs)
+- 진행 중인 실행 상태는 목록 조회 한 번으로 함께 확인 (GET /acts/{actor}/runs)
+- 끝난 실행의 데이터셋은 JSON Lines 로 스트리밍하며 필요한 필드만 받아 페이지 단위로 바로 넘겨줌
+  (GET /datasets/{id}/items?format=jsonl&fields=...)
+- 제한 시간을 넘긴 실행은 중단 (POST /actor-runs/{id}/abort)
+- 응답 캐시(ResponseCache)를 넘기면 실행 시작 응답은 검색어+입력별로, 끝난 실행의 데이터셋은 ID 별로 캐시
+  → 수집 사이클이 죽고 다시 시작되어도 같은 실행을 이어서 확인하고 이미 받은 데이터셋은 다시 받지 않음
+  (상태 확인은 항상 실제 호출, 실패/중단으로 끝난 실행의 시작 응답은 캐시에서 지움)
+
+run-sync-get-dataset-items 는 실행이 끝날 때까지 연결을 붙잡고 있다가 300초를 넘기면 실패하지만,
+이 방식은 모든 실행이 Apify 쪽에서 동시에 돌고 전체 소요 시간이 가장 느린 실행에 가까워진다.
+로컬 테스트는 mock_apify_server.py 를 띄우고 APIFY_BASE_URL 을 그 주소로 지정한다.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional, Tuple
+
+from config import Config
+from json_stream import CHUNK_SIZE, iter_json_lines
+from response_cache import cache_key
+
+logger = logging.getLogger(__name__)
+
+SUCCEEDED = 'SUCCEEDED'
+TERMINAL_STATUSES = {'SUCCEEDED', 'FAILED', 'ABORTED', 'TIMED-OUT'}
+
+@dataclass
+class ApifyRun:
+    """시작된 액터 실행 1건"""
+    search_query: str
+    run_id: str
+    dataset_id: str
+    status: str = 'READY'
+    items_read: int = 0     # 지금까지 넘겨준 데이터셋 항목 수 (읽기가 중간에 실패하면 여기서 이어서)
+    start_key: Optional[str] = None  # 실행 시작 응답의 캐시 키 (캐시를 쓰지 않으면 None)
+
+class ApifyRunClient:
+    """Apify 액터 실행 시작/상태 확인/데이터셋 읽기"""
+    
+    def __init__(self, token: str, http, base_url: str = None, actor_id: str = None, cache=None):
+        """
+        Args:
+            token: Apify API 토큰
+            http: 공용 HttpClient (Apify 속도 제한과 지표를 공유)
+            base_url: API 주소 (기본값: Config.APIFY_BASE_URL)
+            actor_id: 실행할 액터 (기본값: Config.APIFY_ACTOR_ID)
+            cache: 실행 시작/데이터셋 응답을 재사용할 ResponseCache (None 이면 사용 안 함)
+        """
+        self.base_url = (base_url or Config.APIFY_BASE_URL).rstrip('/')
+        self.actor_id = actor_id or Config.APIFY_ACTOR_ID
+        self.http = http
+        self.cache = cache if cache is not None and cache.enabled else None
+        self.headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {token}"
+        }
+    
+    def _request(self, method: str, path: str, **kwargs) -> 'requests.Response':
+        response = self.http.request(method, f"{self.base_url}{path}", provider="Apify",
+                                     headers=self.headers, **kwargs)
+        response.raise_for_status()
+        return response
+    
+    def _cached_request(self, method: str, path: str, context: str = None, **kwargs):
+        """응답 캐시를 거치는 요청 (캐시가 없으면 _request 와 같음)"""
+        if self.cache is None:
+            return self._request(method, path, **kwargs)
+        
+        url = f"{self.base_url}{path}"
+        response = self.cache.fetch(
+            "Apify", method, url,
+            lambda: self.http.request(method, url, provider="Apify", headers=self.headers, **kwargs),
+            params=kwargs.get('params'), body=kwargs.get('json'), context=context,
+            stream=kwargs.get('stream', False)
+        )
+        response.raise_for_status()
+        return response
+    
+    def start_run(self, search_query: str, run_input: dict, timeout_seconds: int = None) -> ApifyRun:
+        """
+        액터 실행 시작 (끝날 때까지 기다리지 않음)
+        
+        Args:
+            timeout_seconds: Apify 쪽 실행 제한 시간 (기본값: Config.APIFY_RUN_TIMEOUT_SECONDS)
+        """
+        timeout_seconds = timeout_seconds or Config.APIFY_RUN_TIMEOUT_SECONDS
+        path = f"/acts/{self.actor_id}/runs"
+        params = {'timeout': int(timeout_seconds)}
+        response = self._cached_request('POST', path, context=search_query, params=params, json=run_input)
+        data = response.json()['data']
+        
+        start_key = None
+        if self.cache is not None:
+            start_key = cache_key("Apify", 'POST', f"{self.base_url}{path}", params, run_input, search_query)
+            if getattr(response, 'from_cache', False):
+                logger.info(f"♻️ Apify '{search_query}' 이전에 시작한 실행 재사용 ({data['id']})")
+        return ApifyRun(search_query, data['id'], data['defaultDatasetId'], data.get('status', 'READY'),
+                        start_key=start_key)
+    
+    def list_run_statuses(self, limit: int) -> Dict[str, str]:
+        """최근 실행 limit 개의 상태 {run_id: status} (요청 1건)"""
+        data = self._request('GET', f"/acts/{self.actor_id}/runs",
+                             params={'desc': 1, 'limit': limit}).json()['data']
+        return {item['id']: item['status'] for item in data.get('items', [])}
+    
+    def get_run_status(self, run_id: str) -> str:
+        return self._request('GET', f"/actor-runs/{run_id}").json()['data']['status']
+    
+    def abort_run(self, run_id: str):
+        self._request('POST', f"/actor-runs/{run_id}/abort")
+    
+    def iter_dataset_items(self, dataset_id: str, offset: int = 0) -> Iterator[dict]:
+        """
+        데이터셋 항목을 하나씩 읽기 (JSON Lines 스트리밍, Config.APIFY_ITEM_FIELDS 필드만)
+        
+        끝난 실행의 데이터셋만 읽으므로 (내용이 더 바뀌지 않음) 데이터셋 ID 별로 캐시한다.
+        """
+        response = self._cached_request('GET', f"/datasets/{dataset_id}/items", stream=True, params={
+            'offset': offset, 'clean': 1, 'format': 'jsonl', 'fields': ','.join(Config.APIFY_ITEM_FIELDS)
+        })
+        try:
+            yield from iter_json_lines(response.iter_content(CHUNK_SIZE))
+        finally:
+            response.close()
+    
+    def iter_dataset_pages(self, dataset_id: str, offset: int = 0, page_size: int = None) -> Iterator[list]:
+        """데이터셋 항목을 page_size 개씩 묶어서 읽기 (본문 전체를 기다리지 않음)"""
+        page_size = page_size or Config.APIFY_DATASET_PAGE_SIZE
+        page = []
+        for item in self.iter_dataset_items(dataset_id, offset):
+            page.append(item)
+            if len(page) >= page_size:
+                yield page
+                page = []
+        if page:
+            yield page
+    
+    def _forget_run(self, run: ApifyRun):
+        """실행 시작 응답을 캐시에서 지움 (다시 시작해도 실패한 실행을 재사용하지 않도록)"""
+        if self.cache is not None and run.start_key:
+            self.cache.discard(run.start_key)
+    
+    def _poll(self, pending: Dict[str, ApifyRun], started: int) -> Dict[str, str]:
+        """진행 중인 실행 상태 확인 (목록에서 밀려난 실행만 개별 조회)"""
+        # 이번에 시작한 실행이 최근 목록에 들어오도록 여유를 둠 (다른 곳에서 시작한 실행)
+        statuses = self.list_run_statuses(limit=min(1000, started + 20))
+        for run_id in pending:
+            if run_id not in statuses:
+                statuses[run_id] = self.get_run_status(run_id)
+        return {run_id: statuses[run_id] for run_id in pending}
+    
+    def run_all(self, inputs: Dict[str, dict], poll_seconds: float = None,
+                timeout_seconds: int = None) -> Iterator[Tuple[str, list]]:
+        """
+        검색어별 실행을 모두 시작하고, 끝나는 순서대로 데이터셋을 페이지 단위로 넘겨줌
+        
+        Args:
+            inputs: {검색어: 액터 입력}
+            poll_seconds: 상태 확인 간격 (기본값: Config.APIFY_POLL_SECONDS)
+            timeout_seconds: 실행 제한 시간 (기본값: Config.APIFY_RUN_TIMEOUT_SECONDS)
+        
+        Yields:
+            (검색어, 데이터셋 항목 목록) - 한 페이지씩, 결과 없이 성공한 실행은 빈 목록 한 번
+        """
+        import requests  # 실제 실행할 때만 로드 (수집기 import 시간 단축)
+        
+        poll_seconds = poll_seconds if poll_seconds is not None else Config.APIFY_POLL_SECONDS
+        timeout_seconds = timeout_seconds or Config.APIFY_RUN_TIMEOUT_SECONDS
+        
+        pending: Dict[str, ApifyRun] = {}
+        for search_query, run_input in inputs.items():
+            try:
+                run = self.start_run(search_query, run_input, timeout_seconds)
+                pending[run.run_id] = run
+                logger.info(f"🚀 Apify 실행 시작: '{search_query}' ({run.run_id})")
+            except (requests.exceptions.RequestException, KeyError, ValueError) as e:
+                logger.error(f"Apify '{search_query}' 실행 시작 실패: {e}")
+        
+        started = len(pending)
+        succeeded = 0
+        # Apify 쪽 제한 시간이 지나면 TIMED-OUT 이 되므로, 상태 확인 한 번 분량의 여유 후 직접 중단
+        deadline = time.monotonic() + timeout_seconds + poll_seconds
+        
+        while pending:
+            try:
+                statuses = self._poll(pending, started)
+            except (requests.exceptions.RequestException, KeyError, ValueError) as e:
+                logger.warning(f"Apify 실행 상태 확인 실패 (다음 확인 때 재시도): {e}")
+                statuses = {}
+            
+            for run_id, status in statuses.items():
+                run = pending[run_id]
+                run.status = status
+                if status not in TERMINAL_STATUSES:
+                    continue
+                
+                if status == SUCCEEDED:
+                    succeeded += 1
+                else:
+                    # 실패/시간 초과여도 그때까지 쌓인 항목은 읽음 (다음 수집은 새 실행으로)
+                    logger.warning(f"Apify '{run.search_query}' 실행 종료: {status}")
+                    self._forget_run(run)
+                
+                try:
+                    for items in self.iter_dataset_pages(run.dataset_id, offset=run.items_read):
+                        run.items_read += len(items)
+                        yield run.search_query, items
+                    if status == SUCCEEDED and not run.items_read:
+                        yield run.search_query, []
+                    del pending[run_id]
+                except (requests.exceptions.RequestException, ValueError) as e:
+                    # 이미 넘겨준 페이지 다음부터 다음 확인 때 다시 읽음
+                    logger.warning(f"Apify '{run.search_query}' 데이터셋 읽기 실패 ({run.items_read}개 이후): {e}")
+                    if status == SUCCEEDED:
+                        succeeded -= 1
+            
+            if not pending:
+                break
+            if time.monotonic() >= deadline:
+                for run in pending.values():
+                    logger.error(f"Apify '{run.search_query}' 실행 시간 초과 → 중단 ({run.status})")
+                    self._forget_run(run)
+                    try:
+                        self.abort_run(run.run_id)
+                    except requests.exceptions.RequestException as e:
+                        logger.warning(f"Apify 실행 중단 요청 실패 ({run.run_id}): {e}")
+                break
+            time.sleep(poll_seconds)
+        
+        logger.info(f"📦 Apify 실행 {started}개 중 {succeeded}개 성공")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+광고 레코드 표현별 메모리/할당/저장 시간 비교
+
+- dataclass: 기존 @dataclass AdVideoInfo (인스턴스별 __dict__)
+- namedtuple: 현재 AdVideoInfo (불변 NamedTuple)
+- batch: AdBatch (컬럼별 리스트)
+
+각 표현으로 광고 N개를 만든 뒤 tracemalloc 으로 잔류 메모리/최대 메모리/할당 블록 수를 재고,
+같은 광고를 임시 DB 에 save_ads 로 저장하는 시간을 잰다.
+
+사용법:
+    python benchmark_ad_records.py --count 100000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import string
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Optional
+
+from ad_records import AdBatch, AdVideoInfo
+from database_setup import YouTubeAdsDatabase
+from youtube_urls import canonical_url
+
+@dataclass
+class DataclassAdVideoInfo:
+    """비교용: 기존 dataclass 표현"""
+    title: str
+    url: str
+    note: str
+    video_id: Optional[str] = None
+
+def make_fields(count: int) -> list:
+    """표현과 무관한 원본 필드 (제목/URL/메모/video ID)"""
+    chars = string.ascii_letters + string.digits + '-_'
+    fields = []
+    for i in range(count):
+        video_id = ''.join(random.choice(chars) for _ in range(11))
+        fields.append((f"Sample ad {i} {video_id}", canonical_url(video_id),
+                       f"✅ Apify 확실한 광고 | 광고주ID: AR{i:010d} | 조회수: {i * 7}", video_id))
+    return fields
+
+def build(kind: str, fields: list):
+    if kind == 'dataclass':
+        return [DataclassAdVideoInfo(*row) for row in fields]
+    if kind == 'namedtuple':
+        return [AdVideoInfo(*row) for row in fields]
+    batch = AdBatch()
+    for row in fields:
+        batch.append(*row)
+    return batch
+
+def measure(kind: str, fields: list) -> dict:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    started = time.perf_counter()
+    ads = build(kind, fields)
+    build_ms = (time.perf_counter() - started) * 1000
+    current, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+    tracemalloc.stop()
+    
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        db = YouTubeAdsDatabase(os.path.join(tmp, 'bench.db'))
+        started = time.perf_counter()
+        db.save_ads(ads, 'benchmark', 'Apify')
+        save_ms = (time.perf_counter() - started) * 1000
+        db.close()
+    
+    return {
+        'kind': kind,
+        'retained_mb': current / 1024 / 1024,
+        'peak_mb': peak / 1024 / 1024,
+        'blocks': blocks,
+        'build_ms': build_ms,
+        'save_ms': save_ms
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="광고 레코드 표현별 메모리/저장 시간 비교")
+    parser.add_argument('--count', type=int, default=100000, help="광고 개수")
+    args = parser.parse_args()
+    
+    random.seed(0)
+    fields = make_fields(args.count)
+    print(f"📏 광고 {args.count:,}개 (문자열 필드 자체는 세 표현이 공유하므로 측정에서 제외)")
+    print(f"{'표현':<12}{'잔류 MB':>10}{'최대 MB':>10}{'할당 블록':>12}{'생성 ms':>10}{'저장 ms':>10}")
+    for kind in ('dataclass', 'namedtuple', 'batch'):
+        result = measure(kind, fields)
+        print(f"{result['kind']:<12}{result['retained_mb']:>10.1f}{result['peak_mb']:>10.1f}"
+              f"{result['blocks']:>12,}{result['build_ms']:>10.0f}{result['save_ms']:>10.0f}")
+
+if __name__ == "__main__":
+    main()
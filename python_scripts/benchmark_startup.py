@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+수집 스크립트 기동 시간 측정
+
+요청마다 Python 을 새로 띄우는 호출자(Next.js API 라우트 등)가 내는 비용을 잰다.
+각 측정은 새 인터프리터에서 실행한다 (이미 import 된 모듈/연결을 재사용하지 않도록).
+
+- import: 모듈 import 시간과 그때 requests / schedule / asyncio 가 로드되는지
+- init (cold): 새 DB 파일로 YouTubeAdsCollectorDB 생성 (스키마 생성 + 마이그레이션)
+- init (warm): 같은 DB 파일로 다시 생성 (PRAGMA user_version 이 최신이면 스키마 작업 생략)
+- process: 인터프리터 시작부터 종료까지 (stats 조회 1번) 전체 시간
+
+사용법:
+    python benchmark_startup.py --runs 5
+    python benchmark_startup.py --importtime 15   # -X importtime 으로 가장 느린 import 15개
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 측정 대상 모듈
+MODULES = ('youtube_ads_collector_with_db', 'web_service_connector', 'collector_worker')
+
+# 기동 시 로드되면 안 되는 무거운 의존성
+HEAVY_MODULES = ('requests', 'schedule', 'asyncio')
+
+IMPORT_SNIPPET = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - started) * 1000
+print(json.dumps({{'ms': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+INIT_SNIPPET = """
+import contextlib, io, json, sys, time
+from youtube_ads_collector_with_db import YouTubeAdsCollectorDB
+started = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    collector = YouTubeAdsCollectorDB(db_path={db_path!r})
+elapsed = (time.perf_counter() - started) * 1000
+collector.get_database_stats()
+print(json.dumps({{'ms': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = SCRIPT_DIR + os.pathsep + env.get('PYTHONPATH', '')
+    env.setdefault('PROVIDER_CACHE_MODE', 'off')
+    return env
+
+def run_snippet(snippet: str, workdir: str) -> dict:
+    """새 인터프리터에서 실행하고 (결과, 프로세스 전체 ms) 반환"""
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-c', snippet], cwd=workdir, env=_env(),
+                               capture_output=True, text=True, check=True)
+    process_ms = (time.perf_counter() - started) * 1000
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['process_ms'] = process_ms
+    return result
+
+def measure_imports(runs: int, workdir: str) -> list:
+    rows = []
+    for module in MODULES:
+        samples = [run_snippet(IMPORT_SNIPPET.format(module=module, heavy=HEAVY_MODULES), workdir)
+                   for _ in range(runs)]
+        rows.append((f"import {module}", samples))
+    return rows
+
+def measure_init(runs: int, workdir: str) -> list:
+    cold, warm = [], []
+    for i in range(runs):
+        db_path = os.path.join(workdir, f"startup_{i}.db")
+        cold.append(run_snippet(INIT_SNIPPET.format(db_path=db_path, heavy=HEAVY_MODULES), workdir))
+        warm.append(run_snippet(INIT_SNIPPET.format(db_path=db_path, heavy=HEAVY_MODULES), workdir))
+    return [("init (cold, 새 DB)", cold), ("init (warm, 기존 DB)", warm)]
+
+def print_importtime(module: str, top: int, workdir: str):
+    """-X importtime 결과 중 누적 시간이 가장 긴 import"""
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                               cwd=workdir, env=_env(), capture_output=True, text=True, check=True)
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit():
+            entries.append((int(cumulative), name.rstrip()))
+    
+    print(f"\n⏱️ {module} import 누적 시간 상위 {top}개 (-X importtime)")
+    for cumulative, name in sorted(entries, reverse=True)[:top]:
+        print(f"{cumulative / 1000:>10.1f} ms  {name}")
+
+def main():
+    parser = argparse.ArgumentParser(description="수집 스크립트 기동 시간 측정")
+    parser.add_argument('--runs', type=int, default=5, help="항목별 반복 횟수 (중앙값 표시)")
+    parser.add_argument('--importtime', type=int, default=0, metavar='N',
+                        help="수집기 모듈의 -X importtime 상위 N개도 출력")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        rows = measure_imports(args.runs, workdir) + measure_init(args.runs, workdir)
+        
+        print(f"🚀 기동 시간 (새 인터프리터 {args.runs}회 중앙값, {sys.version.split()[0]})")
+        print(f"{'항목':<44}{'측정 ms':>10}{'프로세스 ms':>14}  로드된 무거운 모듈")
+        for label, samples in rows:
+            measured = statistics.median(sample['ms'] for sample in samples)
+            process = statistics.median(sample['process_ms'] for sample in samples)
+            loaded = ', '.join(samples[-1]['loaded']) or '-'
+            print(f"{label:<44}{measured:>10.1f}{process:>14.1f}  {loaded}")
+        
+        if args.importtime:
+            print_importtime(MODULES[0], args.importtime, workdir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+서킷 브레이커 (closed / open / half-open)
+- 연속 실패가 임계값에 도달하면 open: 요청을 보내지 않고 즉시 거절
+- 대기 시간이 지나면 half-open: 시험 요청 1건만 허용
+- 시험 요청 성공 → closed, 실패 → 다시 open (대기 시간은 지수적으로 증가, 상한 있음)
+- 허가받은 요청은 record_success / record_failure / release 중 하나로 반드시 결과를 남긴다
+"""
+
+import threading
+import time
+from typing import Dict
+
+from config import Config
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitBreaker:
+    """연속 실패 기반 서킷 브레이커 (스레드 안전)"""
+    
+    def __init__(self, name: str,
+                 failure_threshold: int = None,
+                 reset_timeout: float = None,
+                 max_reset_timeout: float = None,
+                 backoff_multiplier: float = 2.0):
+        """
+        Args:
+            name: 보호 대상 이름 (로그/통계용)
+            failure_threshold: open 으로 전환되는 연속 실패 횟수 (기본값: Config.CIRCUIT_FAILURE_THRESHOLD)
+            reset_timeout: 첫 open 대기 시간 (초, 기본값: Config.CIRCUIT_RESET_SECONDS)
+            max_reset_timeout: open 대기 시간 상한 (초, 기본값: Config.CIRCUIT_MAX_RESET_SECONDS)
+            backoff_multiplier: 시험 요청이 실패할 때마다 대기 시간에 곱하는 값
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold or Config.CIRCUIT_FAILURE_THRESHOLD)
+        self.reset_timeout = reset_timeout or Config.CIRCUIT_RESET_SECONDS
+        self.max_reset_timeout = max_reset_timeout or Config.CIRCUIT_MAX_RESET_SECONDS
+        self.backoff_multiplier = backoff_multiplier
+        
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._current_timeout = self.reset_timeout
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        
+        self.trips = 0             # closed/half-open → open 전환 횟수
+        self.rejected = 0          # open 상태에서 거절한 요청 수
+        self.last_trip_at = None   # 마지막 open 전환 시각 (epoch 초)
+    
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+    
+    def _maybe_half_open(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self._current_timeout:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+    
+    def _trip(self):
+        if self._state == HALF_OPEN:
+            # 시험 요청 실패 → 대기 시간 증가
+            self._current_timeout = min(self.max_reset_timeout, self._current_timeout * self.backoff_multiplier)
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+        self.trips += 1
+        self.last_trip_at = time.time()
+    
+    def allow_request(self) -> bool:
+        """
+        요청을 보내도 되는지 확인
+        
+        half-open 상태에서는 시험 요청 1건만 허용하고, 결과가 기록될 때까지 나머지는 거절한다.
+        """
+        with self._lock:
+            self._maybe_half_open()
+            
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            
+            self.rejected += 1
+            return False
+    
+    def record_success(self):
+        """요청 성공 기록 (half-open 이면 closed 로 복구)"""
+        with self._lock:
+            self._state = CLOSED
+            self._consecutive_failures = 0
+            self._current_timeout = self.reset_timeout
+            self._probe_in_flight = False
+    
+    def record_failure(self):
+        """서비스 장애로 인한 실패 기록 (요청 자체의 오류는 기록하지 않음)"""
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._state == HALF_OPEN or (
+                    self._state == CLOSED and self._consecutive_failures >= self.failure_threshold):
+                self._trip()
+    
+    def release(self):
+        """
+        서비스 상태를 판단할 수 없는 결과 (로컬 오류, 해석할 수 없는 응답) - 상태는 그대로 두고
+        half-open 시험 요청만 풀어줌
+        """
+        with self._lock:
+            self._probe_in_flight = False
+    
+    def retry_after(self) -> float:
+        """다음 시험 요청까지 남은 시간 (초, closed/half-open 이면 0)"""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self._current_timeout - (time.monotonic() - self._opened_at))
+    
+    def stats(self) -> Dict:
+        """
+        브레이커 상태
+        
+        Returns:
+            {'name': 'WebService', 'state': 'open', 'trips': 2, 'consecutive_failures': 6,
+             'rejected': 120, 'retry_after': 41.5, 'reset_timeout': 60.0}
+        """
+        state = self.state
+        with self._lock:
+            return {
+                'name': self.name,
+                'state': state,
+                'trips': self.trips,
+                'consecutive_failures': self._consecutive_failures,
+                'rejected': self.rejected,
+                'retry_after': round(max(0.0, self._current_timeout - (time.monotonic() - self._opened_at))
+                                     if state == OPEN else 0.0, 1),
+                'reset_timeout': self._current_timeout
+            }
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+이벤트 기반 수집 스케줄러
+- (다음 수집 시각, 검색어, API 소스) 우선순위 큐 (heapq), 시작 시 search_history 의 last_collected 로 구성
+- 다음 수집 시각은 수율 기반 재수집 간격 (refresh_policy.py), 일일 호출 예산을 넘는 항목은 다음 날(UTC)로 미룸
+- 가장 가까운 항목의 차례까지 정확히 잠들었다가 (threading.Event.wait) 차례가 된 항목만 수집
+- reload() (SIGHUP) 가 오면 검색어 파일(Config.SEARCH_QUERIES_FILE) 을 바로 다시 읽고,
+  파일이 바뀐 것만으로는 깨어나지 않지만 다음 항목의 차례가 되면 수집 전에 변경 여부를 확인해 반영
+- stop() (SIGTERM) 이 오면 진행 중인 수집만 마치고 종료
+
+고정 30분 주기로 모든 검색어를 확인하던 방식과 달리, 할 일이 없을 때는 API/DB 를 건드리지 않고
+새 검색어는 다음 수집 주기를 기다리지 않고 바로 수집된다.
+"""
+
+import heapq
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import Config
+from refresh_policy import next_budget_reset
+
+class CollectionScheduler:
+    """(검색어, API 소스) 별 다음 수집 시각 기반 수집 데몬"""
+    
+    def __init__(self, collector, default_queries: List[str], max_ads_per_query: int = 50,
+                 queries_file: str = None, on_cycle: Callable[[dict], None] = None):
+        """
+        Args:
+            collector: YouTubeAdsCollectorDB
+            default_queries: 검색어 파일이 없을 때 사용할 검색어
+            max_ads_per_query: 검색어당 최대 수집 개수 (Apify)
+            queries_file: 검색어 파일 경로 (기본값: Config.SEARCH_QUERIES_FILE)
+            on_cycle: 수집을 한 번 마칠 때마다 결과 dict 로 호출
+        """
+        self.collector = collector
+        self.default_queries = list(default_queries)
+        self.max_ads_per_query = max_ads_per_query
+        self.queries_file = queries_file or Config.SEARCH_QUERIES_FILE
+        self.on_cycle = on_cycle
+        self.policy = collector.refresh_policy
+        self.providers = [provider for provider, enabled in (("Apify", collector.apify_token),
+                                                             ("SerpAPI", collector.serp_api_key)) if enabled]
+        
+        self._heap: List[Tuple[float, str, str]] = []
+        self._due: Dict[Tuple[str, str], float] = {}  # 항목별 현재 차례 (힙에 남은 예전 값은 무시)
+        self._queries: List[str] = []
+        self._queries_mtime = None
+        self._reload_requested = False
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self.cycles = 0
+    
+    def stop(self):
+        """진행 중인 수집을 마친 뒤 종료"""
+        self._stop.set()
+        self._wake.set()
+    
+    def reload(self):
+        """검색어 파일 즉시 다시 읽기"""
+        self._reload_requested = True
+        self._wake.set()
+    
+    def load_queries(self) -> List[str]:
+        """검색어 파일 읽기 (빈 줄과 # 주석 제외, 파일이 없으면 기본 검색어)"""
+        if not os.path.exists(self.queries_file):
+            return list(self.default_queries)
+        with open(self.queries_file, encoding='utf-8') as f:
+            queries = [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+        return list(dict.fromkeys(queries))
+    
+    def _queries_mtime_now(self) -> Optional[float]:
+        try:
+            return os.path.getmtime(self.queries_file)
+        except OSError:
+            return None
+    
+    def sync_queries(self):
+        """검색어 목록을 다시 읽어 추가된 검색어는 예약하고 빠진 검색어는 큐에서 제외"""
+        self._queries_mtime = self._queries_mtime_now()
+        queries = self.load_queries()
+        added = [query for query in queries if query not in set(self._queries)]
+        removed = set(self._queries) - set(queries)
+        self._queries = queries
+        
+        for key in [key for key in self._due if key[0] in removed]:
+            del self._due[key]
+        
+        for provider in self.providers:
+            if not added:
+                continue
+            next_due = self.policy.next_due_many(queries, provider)
+            for query in added:
+                self._schedule(query, provider, next_due[query])
+        
+        if self.cycles or removed:
+            print(f"🔄 검색어 목록 갱신: {len(queries)}개 (추가 {len(added)}개, 제외 {len(removed)}개)")
+    
+    def _schedule(self, query: str, provider: str, due: float):
+        self._due[(query, provider)] = due
+        heapq.heappush(self._heap, (due, query, provider))
+    
+    def _is_current(self, entry: Tuple[float, str, str]) -> bool:
+        due, query, provider = entry
+        return self._due.get((query, provider)) == due
+    
+    def next_due(self) -> Optional[Tuple[float, str, str]]:
+        """가장 먼저 차례가 오는 항목 (due, 검색어, API 소스)"""
+        while self._heap and not self._is_current(self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0] if self._heap else None
+    
+    def _pop_due(self, now: float) -> Dict[str, List[str]]:
+        """차례가 된 항목 꺼내기 (곧 차례가 올 항목도 함께 묶음) → {API 소스: [검색어, ...]}"""
+        horizon = now + Config.SCHEDULER_BATCH_WINDOW_SECONDS
+        batch: Dict[str, List[str]] = {}
+        while self._heap and self._heap[0][0] <= horizon:
+            entry = heapq.heappop(self._heap)
+            if not self._is_current(entry):
+                continue
+            due, query, provider = entry
+            del self._due[(query, provider)]
+            batch.setdefault(provider, []).append(query)
+        return batch
+    
+    def _defer_over_budget(self, batch: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """
+        오늘 남은 호출 예산을 넘는 항목은 다음 날(UTC)로 미루고 나머지만 반환
+        
+        예산은 여기서 잡지 않고 끝난 호출만 집계되므로 (RefreshPolicy.within_budget),
+        수집이 실패해 재시도로 돌아간 항목은 예산을 쓰지 않는다.
+        """
+        allowed_batch = {}
+        for provider, provider_queries in batch.items():
+            allowed = self.policy.within_budget(provider_queries, provider)
+            deferred = [query for query in provider_queries if query not in set(allowed)]
+            if deferred:
+                reset = next_budget_reset()
+                print(f"💸 {provider} 일일 호출 예산 소진: {len(deferred)}개 항목을 "
+                      f"{datetime.fromtimestamp(reset).strftime('%Y-%m-%d %H:%M')} 이후로 미룸")
+                for query in deferred:
+                    self._schedule(query, provider, reset)
+            if allowed:
+                allowed_batch[provider] = allowed
+        return allowed_batch
+    
+    def _run_batch(self, batch: Dict[str, List[str]]):
+        batch = self._defer_over_budget(batch)
+        if not batch:
+            return
+        queries = list(dict.fromkeys(query for provider_queries in batch.values() for query in provider_queries))
+        print(f"\n🚀 차례가 된 항목 {sum(len(q) for q in batch.values())}개 수집 "
+              f"({', '.join(f'{provider} {len(q)}개' for provider, q in batch.items())})")
+        
+        results = None
+        try:
+            results = self.collector.collect_all_ads_concurrent(
+                search_queries=queries,
+                max_ads_per_query=self.max_ads_per_query,
+                due_queries=batch
+            )
+        except Exception as e:
+            print(f"❌ 오류 발생: {e}")
+        
+        # 수집 기록과 갱신된 수율 기준으로 다시 예약 (호출이 실패해 기록이 그대로면 잠시 후 재시도)
+        # next_due_many 가 수율 표본을 먼저 반영하므로, 예외 전에 끝난 호출도 여기서 오늘 호출 수에 더해짐
+        current = set(self._queries)
+        for provider, provider_queries in batch.items():
+            next_due = self.policy.next_due_many(self._queries, provider)
+            now = time.time()  # next_due_many 는 기록이 없는 검색어를 자기 호출 시각으로 돌려줌
+            for query in provider_queries:
+                if query not in current:
+                    continue
+                due = next_due[query]
+                if due <= now:
+                    due = now + Config.SCHEDULER_RETRY_SECONDS
+                self._schedule(query, provider, due)
+        
+        self.cycles += 1
+        if results is not None and self.on_cycle:
+            self.on_cycle(results)
+    
+    def run_pending(self) -> bool:
+        """차례가 된 항목이 있으면 수집 (수집했으면 True)"""
+        batch = self._pop_due(time.time())
+        if batch:
+            self._run_batch(batch)
+        return bool(batch)
+    
+    def _queries_changed(self) -> bool:
+        """reload() 요청이 있었거나, 차례가 된 항목이 있을 때 검색어 파일이 바뀌었는지"""
+        if self._reload_requested:
+            return True
+        upcoming = self.next_due()
+        if upcoming is None or upcoming[0] > time.time() + Config.SCHEDULER_BATCH_WINDOW_SECONDS:
+            return False
+        return self._queries_mtime_now() != self._queries_mtime
+    
+    def run(self):
+        """
+        stop() 이 호출될 때까지 실행
+        
+        할 일이 없으면 다음 항목의 차례까지 (항목이 없으면 reload()/stop() 까지) 깨어나지 않는다.
+        """
+        self.sync_queries()
+        print(f"🗓️ 수집 스케줄러 시작: 검색어 {len(self._queries)}개 × {', '.join(self.providers) or 'API 소스 없음'}")
+        announced = None
+        
+        while not self._stop.is_set():
+            try:
+                if self._queries_changed():
+                    self._reload_requested = False
+                    self.sync_queries()
+                
+                if self.run_pending():
+                    continue
+                
+                upcoming = self.next_due()
+                now = time.time()
+                timeout = None
+                if upcoming is not None:
+                    timeout = max(0.0, upcoming[0] - now)
+                    if upcoming != announced:
+                        announced = upcoming
+                        print(f"💤 다음 수집: '{upcoming[1]}' ({upcoming[2]}) "
+                              f"{datetime.fromtimestamp(upcoming[0]).strftime('%Y-%m-%d %H:%M:%S')}")
+            except Exception as e:
+                print(f"❌ 오류 발생: {e}")
+                timeout = 60  # 오류시 1분 대기
+            
+            self._wake.wait(timeout)
+            self._wake.clear()
+        
+        print("⏹️ 수집 스케줄러 종료")
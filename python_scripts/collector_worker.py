@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+상주 수집 작업자 (JSON-lines IPC)
+- YouTubeAdsCollectorDB 를 한 번만 만들어 두고 (인터프리터 기동/모듈 import/DB 초기화 1회)
+  표준 입력 또는 로컬 TCP 소켓으로 들어오는 명령을 한 줄에 하나씩 처리
+- 수집 중 출력(print / logging)은 진행 이벤트로 바꿔 바로 흘려보냄 → 클라이언트가 진행 상황을 실시간으로 확인
+- 명령은 한 번에 하나씩 처리 (수집기/페이지 예산을 공유하므로), 소켓 모드에서는 연결 여러 개가 차례를 기다림
+
+명령 (한 줄 = JSON 객체 하나, id 는 응답 이벤트에 그대로 돌려줌):
+    {"id": "1", "cmd": "collect", "args": {"search_queries": [...], "max_ads_per_query": 30}}
+    {"id": "2", "cmd": "stats"}
+    {"id": "3", "cmd": "export", "args": {"status": "pending", "limit": 100, "after_id": 0}}
+    {"id": "4", "cmd": "ping"}
+    {"id": "5", "cmd": "shutdown"}
+
+이벤트 (표준 출력 또는 소켓, 한 줄 = JSON 객체 하나):
+    {"event": "ready", "pid": 1234}                        - 작업자 준비 완료 (소켓 모드는 "port" 포함)
+    {"id": "1", "event": "started"}                        - 앞선 명령이 끝나 이 명령의 실행을 시작함
+                                                             (클라이언트 제한 시간은 여기서부터 잰다)
+    {"id": "1", "event": "progress", "message": "..."}     - 진행 중 출력 한 줄
+    {"id": "1", "event": "result", "data": {...}}          - 명령 완료
+    {"id": "1", "event": "error", "error": "..."}          - 명령 실패
+
+사용법:
+    python collector_worker.py                 # 표준 입력/출력
+    python collector_worker.py --port 8765     # 127.0.0.1:8765 에서 연결마다 같은 프로토콜
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import socketserver
+import sys
+import threading
+from typing import Callable, Optional
+
+from youtube_ads_collector_with_db import DEFAULT_SEARCH_QUERIES, YouTubeAdsCollectorDB
+
+class _Session:
+    """이벤트를 보낼 대상 (표준 출력 또는 소켓 연결)"""
+    
+    def __init__(self, stream):
+        self._stream = stream  # 바이너리 스트림
+        self._lock = threading.Lock()
+    
+    def send(self, event: dict):
+        # ensure_ascii: 콘솔 인코딩과 무관하게 ASCII 한 줄
+        line = (json.dumps(event, ensure_ascii=True, default=str) + '\n').encode('ascii')
+        with self._lock:
+            try:
+                self._stream.write(line)
+                self._stream.flush()
+            except (OSError, ValueError):
+                pass  # 연결이 끊긴 클라이언트 - 명령은 끝까지 처리
+
+class _ProgressWriter(io.TextIOBase):
+    """print 출력을 줄 단위 진행 이벤트로 바꾸는 sys.stdout 대체 (스레드별 줄 버퍼)"""
+    
+    def __init__(self, emit: Callable[[str], None]):
+        self._emit = emit
+        self._local = threading.local()
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, text: str) -> int:
+        buffer = getattr(self._local, 'buffer', '') + text
+        *lines, self._local.buffer = buffer.split('\n')
+        for line in lines:
+            if line.strip():
+                self._emit(line.rstrip())
+        return len(text)
+
+class _ProgressHandler(logging.Handler):
+    """logging 레코드를 진행 이벤트로 전달"""
+    
+    def __init__(self, emit: Callable[[str], None]):
+        super().__init__(logging.INFO)
+        self._emit = emit
+    
+    def emit(self, record: logging.LogRecord):
+        try:
+            self._emit(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+class CollectorWorker:
+    """상주 수집기 - 명령 한 줄을 받아 진행/결과 이벤트를 보냄"""
+    
+    def __init__(self, db_path: str = "youtube_ads.db", out: _Session = None):
+        """
+        Args:
+            db_path: 데이터베이스 파일 경로
+            out: 명령과 무관한 출력(초기화 메시지 등)을 보낼 대상
+        """
+        self.db_path = db_path
+        self.default_session = out
+        self.commands = {
+            'collect': self.collect,
+            'stats': self.stats,
+            'export': self.export,
+            'ping': self.ping,
+        }
+        
+        self._job_lock = threading.Lock()   # 명령은 한 번에 하나씩
+        self._current = (None, out)         # (진행 중인 명령 id, 보낼 대상)
+        self._install_output_capture()
+        
+        self.collector = YouTubeAdsCollectorDB(db_path=db_path)
+    
+    def _install_output_capture(self):
+        """print / logging 출력을 진행 중인 명령의 진행 이벤트로 돌림 (프로토콜 스트림 보호)"""
+        sys.stdout = _ProgressWriter(self._emit_progress)
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        handler = _ProgressHandler(self._emit_progress)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+    
+    def _emit_progress(self, message: str):
+        request_id, session = self._current
+        if session is not None:
+            session.send({'id': request_id, 'event': 'progress', 'message': message})
+    
+    def handle_line(self, line: str, session: _Session) -> bool:
+        """
+        명령 한 줄 처리
+        
+        Returns:
+            False: shutdown 명령 (작업자 종료)
+        """
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("명령은 JSON 객체여야 합니다")
+        except ValueError as e:
+            session.send({'id': None, 'event': 'error', 'error': f"잘못된 명령: {e}"})
+            return True
+        
+        request_id = request.get('id')
+        cmd = request.get('cmd')
+        if cmd == 'shutdown':
+            session.send({'id': request_id, 'event': 'result', 'data': {'shutdown': True}})
+            return False
+        
+        handler = self.commands.get(cmd)
+        if handler is None:
+            session.send({'id': request_id, 'event': 'error', 'error': f"알 수 없는 명령: {cmd}"})
+            return True
+        
+        with self._job_lock:
+            self._current = (request_id, session)
+            session.send({'id': request_id, 'event': 'started'})
+            try:
+                data = handler(**(request.get('args') or {}))
+                session.send({'id': request_id, 'event': 'result', 'data': data})
+            except Exception as e:
+                session.send({'id': request_id, 'event': 'error', 'error': f"{type(e).__name__}: {e}"})
+            finally:
+                sys.stdout.flush()
+                self._current = (None, self.default_session)
+        return True
+    
+    def collect(self, search_queries: Optional[list] = None, max_ads_per_query: int = 30,
+                concurrent: bool = True) -> dict:
+        """수집 1회 - auto wrapper 의 RESULT_JSON 과 같은 형태"""
+        search_queries = search_queries or DEFAULT_SEARCH_QUERIES
+        if concurrent:
+            results = self.collector.collect_all_ads_concurrent(search_queries, max_ads_per_query)
+        else:
+            results = self.collector.collect_all_ads(search_queries, max_ads_per_query)
+        
+        return {
+            "success": True,
+            **results,
+            "stats": self.collector.get_database_stats(),
+            "http_metrics": self.collector.get_http_metrics(),
+            "seen_filter": self.collector.get_seen_filter_stats(),
+            "response_cache": self.collector.get_cache_stats(),
+            "refresh_budget": self.collector.get_refresh_stats()
+        }
+    
+    def stats(self) -> dict:
+        return self.collector.get_database_stats()
+    
+    def export(self, status: str = 'pending', limit: int = 100, after_id: int = 0) -> list:
+        return self.collector.export_for_web_service(status, limit, after_id)
+    
+    def ping(self) -> dict:
+        return {'pong': True, 'pid': os.getpid()}
+    
+    def serve_stdio(self):
+        """표준 입력에서 명령을 읽어 처리 (입력이 닫히거나 shutdown 이면 종료)"""
+        session = self.default_session
+        session.send({'event': 'ready', 'pid': os.getpid()})
+        for raw in sys.stdin.buffer:
+            line = raw.decode('utf-8', errors='replace').strip()
+            if line and not self.handle_line(line, session):
+                break
+    
+    def serve_socket(self, host: str, port: int):
+        """로컬 TCP 소켓에서 연결마다 같은 프로토콜로 명령 처리 (shutdown 이면 서버 종료)"""
+        worker = self
+        
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                session = _Session(self.wfile)
+                for raw in self.rfile:
+                    line = raw.decode('utf-8', errors='replace').strip()
+                    if line and not worker.handle_line(line, session):
+                        threading.Thread(target=self.server.shutdown, daemon=True).start()
+                        break
+        
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        with socketserver.ThreadingTCPServer((host, port), Handler) as server:
+            server.daemon_threads = True
+            self.default_session.send({'event': 'ready', 'pid': os.getpid(), 'port': server.server_address[1]})
+            server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="상주 YouTube 광고 수집 작업자 (JSON-lines IPC)")
+    parser.add_argument('--db', default="youtube_ads.db", help="데이터베이스 파일 경로")
+    parser.add_argument('--port', type=int, default=None, help="로컬 TCP 포트 (생략하면 표준 입력/출력, 0 이면 임의 포트)")
+    parser.add_argument('--host', default='127.0.0.1')
+    args = parser.parse_args()
+    
+    # 프로토콜은 원래 표준 출력으로만 (print 는 진행 이벤트로 바뀜)
+    out = _Session(sys.stdout.buffer)
+    worker = CollectorWorker(args.db, out=out)
+    
+    if args.port is None:
+        worker.serve_stdio()
+    else:
+        worker.serve_socket(args.host, args.port)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
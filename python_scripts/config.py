@@ -4,7 +4,7 @@
 """
 
 import os
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple
 
 class Config:
     """설정 관리 클래스"""
@@ -15,9 +15,120 @@ class Config:
     
     # 수집 설정
     MAX_ADS_PER_RUN: int = 50
-    REQUEST_DELAY: float = 1.0  # API 요청 간 대기 시간 (초)
+    REQUEST_DELAY: float = 1.0  # API 요청 간 기본 간격 (초, RATE_LIMITS 에 없는 소스에 적용)
     REQUEST_TIMEOUT: int = 60   # 요청 타임아웃 (초)
     
+    # HTTP 전송 설정 (연결 풀/재시도)
+    HTTP_POOL_SIZE: int = 10    # 기본 호스트별 연결 풀 크기
+    HTTP_POOL_SIZES: Dict[str, int] = {
+        "https://api.apify.com": 4,
+        "https://serpapi.com": 8
+    }
+    HTTP_MAX_RETRIES: int = 3
+    HTTP_RETRY_BACKOFF: float = 0.5  # 0.5s, 1s, 2s ...
+    HTTP_RETRY_STATUS: List[int] = [429, 500, 502, 503, 504]
+    
+    # API 소스별 속도 제한 (초당 요청 수, 버스트 허용량)
+    RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+        "Apify": (0.5, 2),
+        "SerpAPI": (1.0, 2),
+        "WebService": (20.0, 10)
+    }
+    
+    # 기존 영상 사전 필터 (Bloom 필터)
+    SEEN_FILTER_ERROR_RATE: float = 0.001
+    SEEN_FILTER_MIN_CAPACITY: int = 100000
+    
+    # API 소스별 재수집 간격 (시간) - 이 시간 안에 수집한 검색어는 건너뜀
+    COLLECT_INTERVAL_HOURS: Dict[str, int] = {
+        "Apify": 24,
+        "SerpAPI": 6
+    }
+    
+    # 적응형 재수집 간격 (refresh_policy.py)
+    # 호출당 신규 광고 수의 지수가중이동평균(EWMA) 이 목표치면 COLLECT_INTERVAL_HOURS 그대로,
+    # 많으면 간격을 줄이고 적으면 늘림 (REFRESH_HOURS_BOUNDS 범위 안에서)
+    REFRESH_EWMA_ALPHA: float = 0.3
+    REFRESH_TARGET_NEW_PER_CALL: Dict[str, float] = {
+        "Apify": 10.0,
+        "SerpAPI": 3.0
+    }
+    REFRESH_HOURS_BOUNDS: Dict[str, Tuple[float, float]] = {
+        "Apify": (6, 168),
+        "SerpAPI": (1, 72)
+    }
+    
+    # API 소스별 하루(UTC) 최대 호출 수 - 넘칠 것 같으면 간격을 함께 늘리고, 다 쓰면 다음 날까지 보류
+    DAILY_CALL_BUDGET: Dict[str, int] = {
+        "Apify": 40,
+        "SerpAPI": 150
+    }
+    
+    # SerpAPI 증분 수집 (페이지 토큰): 검색어당 최대 페이지 수, 수집 사이클 전체 페이지 예산
+    SERPAPI_MAX_PAGES: int = 3
+    SERPAPI_PAGE_BUDGET: int = 30
+    
+    # Apify 비동기 실행 (async: 실행 시작 → 상태 폴링 → 데이터셋 페이지 단위 읽기, sync: run-sync-get-dataset-items)
+    APIFY_BASE_URL: str = os.getenv('APIFY_BASE_URL', "https://api.apify.com/v2")
+    APIFY_ACTOR_ID: str = "xtech~youtube-ads-scraper"
+    APIFY_RUN_MODE: str = os.getenv('APIFY_RUN_MODE', 'async')
+    APIFY_POLL_SECONDS: float = 10.0        # 실행 상태 확인 간격 (초)
+    APIFY_RUN_TIMEOUT_SECONDS: int = 1800   # 이 시간이 지나도 끝나지 않은 실행은 중단 (초)
+    APIFY_DATASET_PAGE_SIZE: int = 100      # 데이터셋 항목을 한 번에 저장하는 개수
+    APIFY_ITEM_FIELDS: List[str] = ["video_id", "advertiser_id", "youtubeData", "youtubeStatistics"]  # 받을 항목 필드
+    
+    # 수집 데몬 (auto wrapper): 검색어 목록 파일 (한 줄에 하나, 수정 후 SIGHUP 또는 다음 수집 차례에 반영)
+    SEARCH_QUERIES_FILE: str = os.getenv('SEARCH_QUERIES_FILE', "search_queries.txt")
+    SCHEDULER_BATCH_WINDOW_SECONDS: float = 5.0  # 이 시간 안에 차례가 오는 항목은 함께 수집
+    SCHEDULER_RETRY_SECONDS: int = 600           # 호출 실패로 기록이 갱신되지 않은 항목의 재시도 간격
+    
+    # API 소스 응답 캐시 (off / on / replay, TTL 은 REFRESH_HOURS_BOUNDS 의 하한과 동일)
+    # Apify 비동기 실행은 실행 시작 응답과 끝난 실행의 데이터셋을 캐시 (상태 확인은 캐시하지 않음)
+    RESPONSE_CACHE_MODE: str = os.getenv('PROVIDER_CACHE_MODE', 'on')
+    RESPONSE_CACHE_PATH: str = "provider_cache.db"
+    RESPONSE_CACHE_MAX_BYTES: int = 100 * 1024 * 1024
+    RESPONSE_CACHE_DEFAULT_TTL: int = 3600  # COLLECT_INTERVAL_HOURS 에 없는 소스 (초)
+    
+    # 분석 큐 설정 (웹서비스 전송 작업자)
+    QUEUE_LEASE_SECONDS: int = 300   # 작업자가 가져간 항목의 임대 시간
+    QUEUE_MAX_ATTEMPTS: int = 3      # 이 횟수만큼 실패하면 failed 처리
+    
+    # 스키마 마이그레이션 (migrations.py): 백필 배치당 행 수, 배치 사이 대기 (다른 프로세스 쓰기 허용)
+    MIGRATION_BATCH_SIZE: int = 5000
+    MIGRATION_BATCH_PAUSE_SECONDS: float = 0.0
+    
+    # 내보내기 시 한 번에 읽는 행 수
+    EXPORT_CHUNK_SIZE: int = 1000
+    
+    # 컬럼형 스냅샷 (Parquet/Arrow) 내보내기 디렉터리와 row group 크기
+    SNAPSHOT_DIR: str = "snapshots"
+    SNAPSHOT_CHUNK_SIZE: int = 50000
+    
+    # get_statistics 결과 캐시 시간 (초)
+    STATS_CACHE_TTL_SECONDS: float = 5.0
+    
+    # 웹서비스 전송 동시 요청 수
+    WEB_SERVICE_CONCURRENCY: int = 8
+    
+    # 웹서비스 일괄 전송 (/api/analyze/batch) 요청당 광고 수
+    WEB_SERVICE_BULK_SIZE: int = 100
+    
+    # 웹서비스 서킷 브레이커 (연속 실패 시 전송 중단, 대기 시간은 시험 요청이 실패할 때마다 2배)
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RESET_SECONDS: float = 30.0
+    CIRCUIT_MAX_RESET_SECONDS: float = 900.0
+    
+    # 동시 수집 설정 (API 소스별 최대 동시 요청 수)
+    PROVIDER_CONCURRENCY: Dict[str, int] = {
+        "Apify": 2,
+        "SerpAPI": 4
+    }
+    
+    # SQLite 연결 설정
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000     # 잠금 대기 시간 (밀리초)
+    SQLITE_SYNCHRONOUS: str = "NORMAL"     # WAL 모드에서 안전한 수준
+    SQLITE_CACHED_STATEMENTS: int = 256    # 연결당 준비된 문장 캐시 크기
+    
     # 출력 설정
     OUTPUT_DIR: str = "output"
     CSV_FILENAME: str = "youtube_ads_collection.csv"
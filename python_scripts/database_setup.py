@@ -3,177 +3,357 @@
 YouTube 광고 수집기 데이터베이스 스키마 설정
 """
 
+import csv
+import gzip
+import json
 import sqlite3
 import os
-from datetime import datetime, timedelta
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, TextIO, Tuple
+
+from ad_records import AdBatch
+from config import Config
+from db_connection import SQLiteConnectionManager
+from migrations import (SCHEMA_VERSION, MigrationContext, MigrationRunner, backfill_video_ids,
+                        enqueue_unqueued_pending, mark_reconciled, rebuild_ads_stats, reconciled_until)
+from youtube_urls import canonicalize
+
+# 내보내기 컬럼 (export_for_analysis / iter_ads)
+EXPORT_COLUMNS = ('id', 'title', 'url', 'note', 'collected_at', 'analysis_status')
 
 class YouTubeAdsDatabase:
     """YouTube 광고 데이터베이스 관리 클래스"""
     
     def __init__(self, db_path: str = "youtube_ads.db"):
         self.db_path = db_path
+        self._connections = SQLiteConnectionManager(db_path)
+        self._stats_cache = None  # (조회 시각, 통계) - get_statistics TTL 캐시
         self.init_database()
     
+    def connection(self) -> sqlite3.Connection:
+        """현재 스레드의 장기 연결 (WAL, 준비된 문장 캐시 적용)"""
+        return self._connections.get()
+    
+    def close(self):
+        """모든 스레드의 DB 연결 종료"""
+        self._connections.close_all()
+    
+    @contextmanager
+    def _write_transaction(self, immediate: bool = False) -> Iterator[sqlite3.Cursor]:
+        """광고 수/상태를 바꾸는 쓰기 트랜잭션 (종료 시 통계 캐시 무효화)"""
+        try:
+            with self._connections.transaction(immediate=immediate) as cursor:
+                yield cursor
+        finally:
+            self._stats_cache = None
+    
     def init_database(self):
-        """데이터베이스 초기화 및 테이블 생성"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # 1. 광고 영상 정보 테이블
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS youtube_ads (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                url TEXT UNIQUE NOT NULL,  -- 중복 방지
-                note TEXT,
-                search_query TEXT,         -- 어떤 검색어로 찾았는지 추적
-                api_source TEXT,           -- Apify 또는 SerpAPI
-                collected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                analyzed_at TIMESTAMP NULL, -- 분석 완료 시간
-                analysis_status TEXT DEFAULT 'pending'  -- pending, completed, failed
-            )
-        """)
-        
-        # 2. 검색 기록 테이블 (중복 호출 방지)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS search_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                query TEXT UNIQUE NOT NULL,
-                api_source TEXT NOT NULL,   -- Apify 또는 SerpAPI
-                last_collected TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                total_found INTEGER DEFAULT 0,
-                success_count INTEGER DEFAULT 0
-            )
-        """)
+        """
+        데이터베이스 초기화 및 테이블 생성
         
-        # 3. 분석 큐 테이블 (웹서비스 연동용)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS analysis_queue (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                youtube_ad_id INTEGER,
-                priority INTEGER DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                processed_at TIMESTAMP NULL,
-                status TEXT DEFAULT 'waiting',  -- waiting, processing, completed, failed
-                error_message TEXT NULL,
-                FOREIGN KEY (youtube_ad_id) REFERENCES youtube_ads (id)
-            )
-        """)
+        스키마 변경은 migrations.py 의 번호 매긴 마이그레이션으로 적용하고 PRAGMA user_version 에 기록한다.
+        이미 최신(SCHEMA_VERSION)인 DB 는 다른 경로로 들어온 행만 확인하므로 수집기/작업자 기동이 빠르다.
+        큰 DB 의 긴 마이그레이션은 `python migrations.py --dry-run` 으로 먼저 소요 시간을 확인한다.
+        """
+        conn = self.connection()
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            self._reconcile_external_rows()
+            return
         
-        # 4. 웹서비스 연동 로그 테이블
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS sync_log (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                sync_type TEXT NOT NULL,  -- 'fetch_new', 'update_status' 등
-                records_count INTEGER,
-                success BOOLEAN,
-                error_message TEXT NULL,
-                sync_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+        # 번호 매긴 마이그레이션 (migrations.py) - 단계마다 user_version 기록
+        results = MigrationRunner(self.db_path, connections=self._connections).migrate()
+        if results:
+            print(f"🔧 스키마 버전 {results[0]['version'] - 1} → {results[-1]['version']} "
+                  f"({sum(r['seconds'] for r in results):.2f}s)")
+        print(f"✅ 데이터베이스 초기화 완료: {self.db_path}")
+    
+    def _reconcile_external_rows(self):
+        """
+        다른 경로(Node 측 스크립트 등)로 들어온 행 정리 - 최신 스키마 DB 의 기동 경로
         
-        # 인덱스 생성 (성능 최적화)
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_ads_url ON youtube_ads(url)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_ads_collected_at ON youtube_ads(collected_at)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_ads_analysis_status ON youtube_ads(analysis_status)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_search_query ON search_history(query)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_queue_status ON analysis_queue(status)")
+        reconcile_state 에 기록한 마지막 id 이후의 행만 확인한다. 새 행이 없으면 기본 키 조회 2번으로
+        끝나고, video_id 를 꺼낼 수 없는 행(채널 URL 등)도 한 번 확인한 뒤에는 다시 훑지 않는다.
+        """
+        conn = self.connection()
+        after_id = reconciled_until(conn.cursor())
+        last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM youtube_ads").fetchone()[0]
+        if last_id <= after_id:
+            return
         
-        conn.commit()
-        conn.close()
+        if conn.execute("SELECT 1 FROM youtube_ads WHERE id > ? AND video_id IS NULL LIMIT 1",
+                        (after_id,)).fetchone():
+            backfill_video_ids(MigrationContext(self._connections), after_id=after_id)
         
-        print(f"✅ 데이터베이스 초기화 완료: {self.db_path}")
+        with self._connections.transaction(immediate=True) as cursor:
+            enqueue_unqueued_pending(cursor, after_id=after_id)
+            mark_reconciled(cursor, last_id)
+    
+    def rebuild_statistics(self):
+        """ads_stats 카운터를 youtube_ads 전체 집계로 다시 계산 (트리거 없이 DB 를 수정한 경우)"""
+        with self._connections.transaction(immediate=True) as cursor:
+            rebuild_ads_stats(cursor)
+        self._stats_cache = None
+    
+    def mark_collected(self, search_query: str, api_source: str):
+        """결과 없이 성공한 호출 기록 (last_collected 만 갱신 → 수율 0 표본)"""
+        with self._connections.transaction() as cursor:
+            cursor.execute("""
+                INSERT INTO search_history (query, api_source) VALUES (?, ?)
+                ON CONFLICT(query, api_source) DO UPDATE SET last_collected = CURRENT_TIMESTAMP
+            """, (search_query, api_source))
     
-    def should_collect(self, search_query: str, api_source: str, hours: int = 24) -> bool:
+    def sample_yields(self, api_source: str, alpha: float) -> int:
         """
-        검색어별로 최근 수집 여부 확인 (중복 호출 방지)
+        지난 표본 이후 수집된 검색어의 신규 광고 수를 수율 EWMA 에 반영하고 오늘 호출 수에 더함
+        
+        저장할 때마다가 아니라 수집을 마친 뒤 한 번에 반영하므로, 여러 페이지로 나눠 저장된
+        호출(Apify 비동기 실행 등)도 호출 한 번으로 집계된다. 호출이 실패해 last_collected 가
+        그대로인 검색어는 표본에서 빠진다.
         
         Args:
-            search_query: 검색어
             api_source: API 소스 (Apify 또는 SerpAPI)
-            hours: 중복 방지 시간 (기본 24시간)
-            
+            alpha: 새 표본의 가중치 (0~1)
+        
         Returns:
-            True: 수집 필요, False: 수집 불필요
+            반영한 호출 수
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connections.transaction(immediate=True) as cursor:
+            cursor.execute("""
+                UPDATE search_history SET
+                    yield_ewma = CASE WHEN yield_ewma IS NULL THEN success_count - yield_success_count
+                                      ELSE ? * (success_count - yield_success_count) + (1 - ?) * yield_ewma END,
+                    yield_success_count = success_count,
+                    yield_sampled_at = last_collected
+                WHERE api_source = ?
+                  AND (yield_sampled_at IS NULL OR last_collected > yield_sampled_at
+                       OR success_count > yield_success_count)
+            """, (alpha, alpha, api_source))
+            sampled = cursor.rowcount
+            if sampled:
+                cursor.execute("""
+                    INSERT INTO api_daily_calls (day, api_source, calls) VALUES (date('now'), ?, ?)
+                    ON CONFLICT(day, api_source) DO UPDATE SET calls = calls + excluded.calls
+                """, (api_source, sampled))
+        return sampled
+    
+    def refresh_state_many(self, search_queries: List[str],
+                           api_source: str) -> Dict[str, Tuple[datetime, Optional[float]]]:
+        """여러 검색어의 (마지막 수집 시각 naive UTC, 수율 EWMA) - 기록이 없는 검색어는 빠짐"""
+        queries = list(dict.fromkeys(search_queries))
+        state = {}
+        cursor = self.connection().cursor()
         
-        try:
+        for start in range(0, len(queries), 500):
+            chunk = queries[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f"""
+                SELECT query, last_collected, yield_ewma FROM search_history
+                WHERE api_source = ? AND query IN ({placeholders})
+            """, [api_source] + chunk)
+            state.update((query, (datetime.fromisoformat(value), ewma)) for query, value, ewma in cursor.fetchall())
+        
+        return state
+    
+    def calls_today(self, api_source: str) -> int:
+        """오늘(UTC) 집계된 API 소스 호출 수"""
+        row = self.connection().execute(
+            "SELECT calls FROM api_daily_calls WHERE day = date('now') AND api_source = ?", (api_source,)
+        ).fetchone()
+        return row[0] if row else 0
+    
+    def get_search_cursor(self, search_query: str, api_source: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        증분 수집 상태 조회
+        
+        Returns:
+            (다음 페이지 토큰, 마지막 첫 페이지 지문) - 기록이 없으면 (None, None)
+        """
+        cursor = self.connection().cursor()
+        cursor.execute("""
+            SELECT last_cursor, last_fingerprint FROM search_history
+            WHERE query = ? AND api_source = ?
+        """, (search_query, api_source))
+        row = cursor.fetchone()
+        return (row[0], row[1]) if row else (None, None)
+    
+    def update_search_cursor(self, search_query: str, api_source: str,
+                             page_token: Optional[str], fingerprint: Optional[str]):
+        """
+        증분 수집 상태 저장 (API 를 호출했으므로 last_collected 도 갱신)
+        
+        Args:
+            page_token: 다음 수집 때 이어서 볼 페이지 토큰 (끝까지 봤으면 None)
+            fingerprint: 첫 페이지 결과 지문
+        """
+        with self._connections.transaction() as cursor:
             cursor.execute("""
-                SELECT last_collected FROM search_history 
-                WHERE query = ? AND api_source = ?
-            """, (search_query, api_source))
-            
-            row = cursor.fetchone()
-            if row:
-                last_collected = datetime.fromisoformat(row[0])
-                time_diff = datetime.now() - last_collected
-                should_collect = time_diff.total_seconds() > hours * 3600
-                
-                print(f"   🕐 마지막 수집: {last_collected.strftime('%Y-%m-%d %H:%M')}")
-                print(f"   ⏰ 경과 시간: {time_diff.total_seconds() / 3600:.1f}시간")
-                print(f"   🎯 수집 필요: {'Yes' if should_collect else 'No'}")
-                
-                return should_collect
-            else:
-                print(f"   🆕 신규 검색어: 수집 필요")
-                return True
-                
-        finally:
-            conn.close()
+                INSERT INTO search_history (query, api_source, last_cursor, last_fingerprint)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(query, api_source) DO UPDATE SET
+                    last_collected = CURRENT_TIMESTAMP,
+                    last_cursor = excluded.last_cursor,
+                    last_fingerprint = excluded.last_fingerprint
+            """, (search_query, api_source, page_token, fingerprint))
     
-    def save_ads(self, ads: list, search_query: str, api_source: str) -> int:
+    def save_ads(self, ads: list, search_query: str, api_source: str, total_found: int = None) -> int:
         """
         광고 데이터를 DB에 저장
         
+        Args:
+            total_found: 검색 기록에 남길 수집 개수 (사전 필터로 ads 를 줄인 경우 원래 개수)
+        
         Returns:
             저장된 신규 광고 개수
         """
-        if not ads:
+        if not ads and not total_found:
             return 0
-            
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         
-        new_count = 0
+        return self.save_ads_bulk([(ads, search_query, api_source, total_found)])[0]
+    
+    def save_ads_bulk(self, batches: list) -> List[int]:
+        """
+        여러 검색어의 광고 배치를 한 트랜잭션으로 저장
         
-        try:
-            for ad in ads:
-                # 광고 데이터 저장 (중복 시 무시)
-                cursor.execute("""
-                    INSERT OR IGNORE INTO youtube_ads 
-                    (title, url, note, search_query, api_source)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (ad.title, ad.url, ad.note, search_query, api_source))
-                
-                if cursor.rowcount > 0:
-                    new_count += 1
-                    ad_id = cursor.lastrowid
-                    
-                    # 분석 큐에 추가
-                    cursor.execute("""
-                        INSERT INTO analysis_queue (youtube_ad_id, priority)
-                        VALUES (?, ?)
-                    """, (ad_id, 1))
+        임시 스테이징 테이블에 executemany 로 적재한 뒤 INSERT ... SELECT 한 번으로
+        youtube_ads / analysis_queue 에 반영한다. 배치 순서대로 save_ads 를 호출한
+        것과 같은 결과(신규 개수, 분석 큐 항목, 검색 기록)를 만든다.
+        
+        Args:
+            batches: [(ads, search_query, api_source), ...] 또는
+                     [(ads, search_query, api_source, total_found), ...]
+                     ads 는 AdVideoInfo 목록 또는 AdBatch (AdBatch 는 컬럼을 그대로 executemany 에 넘김)
+        
+        Returns:
+            배치별 신규 광고 개수 (입력 순서와 동일, 빈 배치는 0)
+        """
+        # (ads, search_query, api_source, total_found) 로 통일
+        batches = [
+            (batch[0], batch[1], batch[2], batch[3] if len(batch) > 3 and batch[3] is not None else len(batch[0]))
+            for batch in batches
+        ]
+        new_counts = [0] * len(batches)
+        if not any(ads or total_found for ads, _, _, total_found in batches):
+            return new_counts
+        
+        def staging_rows():
+            for batch_no, (ads, search_query, api_source, _) in enumerate(batches):
+                if isinstance(ads, AdBatch):
+                    yield from ads.staging_rows(batch_no, search_query, api_source)
+                    continue
+                for ad in ads:
+                    # URL 정규화 (수집기에서 이미 했다면 video_id 를 그대로 사용)
+                    video_id = getattr(ad, 'video_id', None)
+                    if video_id:
+                        url = ad.url
+                    else:
+                        url, video_id = canonicalize(ad.url)
+                    yield (batch_no, ad.title, url, video_id, ad.note, search_query, api_source)
+        
+        # 신규 ID 범위를 MAX(id) 기준으로 판별하므로 쓰기 잠금을 먼저 잡는다
+        with self._write_transaction(immediate=True) as cursor:
+            cursor.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS staging_ads (
+                    seq INTEGER PRIMARY KEY,
+                    batch_no INTEGER NOT NULL,
+                    title TEXT,
+                    url TEXT,
+                    video_id TEXT,
+                    note TEXT,
+                    search_query TEXT,
+                    api_source TEXT
+                )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS temp.idx_staging_url ON staging_ads(url)")
+            cursor.execute("DELETE FROM temp.staging_ads")
             
-            # 검색 기록 업데이트
+            cursor.executemany("""
+                INSERT INTO temp.staging_ads (batch_no, title, url, video_id, note, search_query, api_source)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, staging_rows())
+            
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM youtube_ads")
+            last_id = cursor.fetchone()[0]
+            
+            # 광고 데이터 저장 (URL 또는 video_id 중복 시 무시, 입력 순서 유지)
+            cursor.execute("""
+                INSERT OR IGNORE INTO youtube_ads 
+                (title, url, video_id, note, search_query, api_source)
+                SELECT title, url, video_id, note, search_query, api_source
+                FROM temp.staging_ads
+                ORDER BY seq
+            """)
+            
+            # 분석 큐에 추가
+            cursor.execute("""
+                INSERT INTO analysis_queue (youtube_ad_id, priority)
+                SELECT id, 1 FROM youtube_ads WHERE id > ? ORDER BY id
+            """, (last_id,))
+            
+            # 신규 행이 어느 배치에서 왔는지 (같은 URL 이 여러 번 오면 첫 번째가 저장됨)
             cursor.execute("""
+                SELECT s.batch_no, COUNT(*)
+                FROM youtube_ads a
+                JOIN (SELECT url, MIN(seq) AS seq FROM temp.staging_ads GROUP BY url) f ON f.url = a.url
+                JOIN temp.staging_ads s ON s.seq = f.seq
+                WHERE a.id > ?
+                GROUP BY s.batch_no
+            """, (last_id,))
+            for batch_no, count in cursor.fetchall():
+                new_counts[batch_no] = count
+            
+            # 검색 기록 업데이트
+            cursor.executemany("""
                 INSERT INTO search_history (query, api_source, total_found, success_count)
                 VALUES (?, ?, ?, ?)
-                ON CONFLICT(query) DO UPDATE SET
+                ON CONFLICT(query, api_source) DO UPDATE SET
                     last_collected = CURRENT_TIMESTAMP,
-                    total_found = total_found + ?,
-                    success_count = success_count + ?
-            """, (search_query, api_source, len(ads), new_count, len(ads), new_count))
+                    total_found = total_found + excluded.total_found,
+                    success_count = success_count + excluded.success_count
+            """, [
+                (search_query, api_source, total_found, new_counts[batch_no])
+                for batch_no, (ads, search_query, api_source, total_found) in enumerate(batches)
+                if ads or total_found
+            ])
             
-            conn.commit()
-            
-            print(f"   💾 저장 완료: 전체 {len(ads)}개 중 신규 {new_count}개")
-            return new_count
-            
-        finally:
-            conn.close()
+            cursor.execute("DELETE FROM temp.staging_ads")
+        
+        for batch_no, (ads, search_query, api_source, total_found) in enumerate(batches):
+            if ads or total_found:
+                print(f"   💾 저장 완료: 전체 {total_found}개 중 신규 {new_counts[batch_no]}개")
+        return new_counts
+    
+    def count_video_ids(self) -> int:
+        """video_id 가 있는 광고 수"""
+        cursor = self.connection().cursor()
+        cursor.execute("SELECT COUNT(video_id) FROM youtube_ads")
+        return cursor.fetchone()[0]
+    
+    def iter_video_ids(self, chunk_size: int = 10000) -> Iterator[str]:
+        """저장된 video_id 전체를 청크 단위로 순회 (메모리에 전부 올리지 않음)"""
+        cursor = self.connection().cursor()
+        cursor.execute("SELECT video_id FROM youtube_ads WHERE video_id IS NOT NULL")
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row[0]
+    
+    def existing_video_ids(self, video_ids: Iterable[str]) -> Set[str]:
+        """주어진 video_id 중 이미 저장된 것 (유니크 인덱스 조회)"""
+        video_ids = list(set(video_ids))
+        existing = set()
+        cursor = self.connection().cursor()
+        
+        for start in range(0, len(video_ids), 500):
+            chunk = video_ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f"SELECT video_id FROM youtube_ads WHERE video_id IN ({placeholders})", chunk)
+            existing.update(row[0] for row in cursor.fetchall())
+        
+        return existing
     
     def get_pending_analysis(self, limit: int = 100) -> list:
         """
@@ -182,33 +362,27 @@ class YouTubeAdsDatabase:
         Returns:
             [{'id': 1, 'title': '...', 'url': '...', 'note': '...'}, ...]
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.connection().cursor()
+        cursor.execute("""
+            SELECT a.id, a.title, a.url, a.note, a.collected_at
+            FROM youtube_ads a
+            WHERE a.analysis_status = 'pending'
+            ORDER BY a.collected_at DESC
+            LIMIT ?
+        """, (limit,))
         
-        try:
-            cursor.execute("""
-                SELECT a.id, a.title, a.url, a.note, a.collected_at
-                FROM youtube_ads a
-                WHERE a.analysis_status = 'pending'
-                ORDER BY a.collected_at DESC
-                LIMIT ?
-            """, (limit,))
-            
-            rows = cursor.fetchall()
-            
-            return [
-                {
-                    'id': row[0],
-                    'title': row[1],
-                    'url': row[2],
-                    'note': row[3],
-                    'collected_at': row[4]
-                }
-                for row in rows
-            ]
-            
-        finally:
-            conn.close()
+        rows = cursor.fetchall()
+        
+        return [
+            {
+                'id': row[0],
+                'title': row[1],
+                'url': row[2],
+                'note': row[3],
+                'collected_at': row[4]
+            }
+            for row in rows
+        ]
     
     def update_analysis_status(self, ad_id: int, status: str, error_message: str = None):
         """
@@ -219,10 +393,7 @@ class YouTubeAdsDatabase:
             status: 'completed' 또는 'failed'
             error_message: 실패 시 오류 메시지
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
+        with self._write_transaction() as cursor:
             if status == 'completed':
                 cursor.execute("""
                     UPDATE youtube_ads 
@@ -242,120 +413,427 @@ class YouTubeAdsDatabase:
                 SET status = ?, processed_at = CURRENT_TIMESTAMP, error_message = ?
                 WHERE youtube_ad_id = ?
             """, (status, error_message, ad_id))
-            
-            conn.commit()
-            
-        finally:
-            conn.close()
     
-    def get_statistics(self) -> dict:
-        """데이터베이스 통계 조회"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def claim_batch(self, worker_id: str, n: int = 10, lease_seconds: int = None) -> list:
+        """
+        분석 큐에서 대기 항목을 원자적으로 가져옴 (우선순위 높은 순 → 오래된 순)
         
-        try:
-            stats = {}
-            
-            # 전체 광고 수
-            cursor.execute("SELECT COUNT(*) FROM youtube_ads")
-            stats['total_ads'] = cursor.fetchone()[0]
-            
-            # 분석 상태별 개수
-            cursor.execute("""
-                SELECT analysis_status, COUNT(*) 
-                FROM youtube_ads 
-                GROUP BY analysis_status
-            """)
-            status_counts = dict(cursor.fetchall())
-            stats['pending'] = status_counts.get('pending', 0)
-            stats['completed'] = status_counts.get('completed', 0)
-            stats['failed'] = status_counts.get('failed', 0)
-            
-            # API 소스별 개수
-            cursor.execute("""
-                SELECT api_source, COUNT(*) 
-                FROM youtube_ads 
-                GROUP BY api_source
-            """)
-            source_counts = dict(cursor.fetchall())
-            stats['apify_count'] = source_counts.get('Apify', 0)
-            stats['serpapi_count'] = source_counts.get('SerpAPI', 0)
+        여러 작업자/프로세스가 동시에 호출해도 같은 항목을 중복으로 가져가지 않는다.
+        임대 시간이 지난 항목은 먼저 대기 상태로 되돌린다.
+        
+        Args:
+            worker_id: 작업자 식별자 (ack/nack 시 소유권 확인용)
+            n: 최대 개수
+            lease_seconds: 임대 시간 (기본값: Config.QUEUE_LEASE_SECONDS)
+        
+        Returns:
+            [{'queue_id': 7, 'id': 1, 'title': '...', 'url': '...', 'note': '...',
+              'collected_at': '...', 'attempts': 1}, ...]
+        """
+        lease_seconds = lease_seconds or Config.QUEUE_LEASE_SECONDS
+        
+        with self._write_transaction(immediate=True) as cursor:
+            self._requeue_expired(cursor)
             
-            # 최근 수집 시간
+            # 큐를 거치지 않고 분석이 끝난 광고는 건너뜀 (trg_queue_settle 이 정리하기 전의 항목 포함)
             cursor.execute("""
-                SELECT MAX(collected_at) FROM youtube_ads
-            """)
-            latest = cursor.fetchone()[0]
-            stats['latest_collection'] = latest
+                SELECT q.id FROM analysis_queue q
+                JOIN youtube_ads a ON a.id = q.youtube_ad_id
+                WHERE q.status = 'waiting' AND a.analysis_status = 'pending'
+                ORDER BY q.priority DESC, q.created_at, q.id
+                LIMIT ?
+            """, (n,))
+            queue_ids = [row[0] for row in cursor.fetchall()]
+            if not queue_ids:
+                return []
             
-            return stats
+            placeholders = ','.join('?' * len(queue_ids))
+            cursor.execute(f"""
+                UPDATE analysis_queue 
+                SET status = 'processing', worker_id = ?,
+                    lease_expires_at = datetime('now', ?), attempts = attempts + 1
+                WHERE id IN ({placeholders})
+            """, [worker_id, f'+{int(lease_seconds)} seconds'] + queue_ids)
             
-        finally:
-            conn.close()
+            cursor.execute(f"""
+                SELECT q.id, a.id, a.title, a.url, a.note, a.collected_at, q.attempts
+                FROM analysis_queue q
+                JOIN youtube_ads a ON a.id = q.youtube_ad_id
+                WHERE q.id IN ({placeholders})
+                ORDER BY q.priority DESC, q.created_at, q.id
+            """, queue_ids)
+            rows = cursor.fetchall()
+        
+        return [
+            {
+                'queue_id': row[0],
+                'id': row[1],
+                'title': row[2],
+                'url': row[3],
+                'note': row[4],
+                'collected_at': row[5],
+                'attempts': row[6]
+            }
+            for row in rows
+        ]
+    
+    def ack(self, worker_id: str, queue_ids: List[int]) -> int:
+        """
+        처리 완료 확인 (큐 항목과 광고를 completed 로 변경)
+        
+        Returns:
+            반영된 항목 수 (임대가 만료되어 다른 작업자가 가져간 항목은 제외)
+        """
+        if not queue_ids:
+            return 0
+        
+        with self._write_transaction() as cursor:
+            return self._ack_items(cursor, worker_id, queue_ids)
     
-    def export_for_analysis(self, status: str = 'pending', format: str = 'json') -> str:
+    def nack(self, worker_id: str, queue_ids: List[int], error_message: str = None, requeue: bool = True) -> int:
         """
-        분석용 데이터 내보내기
+        처리 실패 보고
         
         Args:
-            status: 'pending', 'all' 등
-            format: 'json', 'csv'
+            requeue: True 면 최대 시도 횟수(Config.QUEUE_MAX_ATTEMPTS) 전까지 다시 대기 상태로,
+                     False 면 즉시 failed 처리
+        
+        Returns:
+            반영된 항목 수
+        """
+        if not queue_ids:
+            return 0
+        
+        with self._write_transaction() as cursor:
+            return self._nack_items(cursor, worker_id, queue_ids, error_message, requeue)
+    
+    def settle_batch(self, worker_id: str, acked_ids: List[int], failed_ids: List[int],
+                     error_message: str = None, requeue: bool = True,
+                     rejected: Dict[int, str] = None, released: List[int] = None) -> Dict[str, int]:
+        """
+        배치 처리 결과를 한 트랜잭션으로 반영 (ack + nack + release)
+        
+        Args:
+            rejected: 재시도하지 않고 바로 실패 처리할 항목 {queue_id: 오류 메시지}
+            released: 보내지 못한 항목 (시도 횟수 차감 없이 대기 상태로 반환)
+        
+        Returns:
+            {'acked': 8, 'nacked': 2, 'released': 0}
+        """
+        with self._write_transaction() as cursor:
+            result = {
+                'acked': self._ack_items(cursor, worker_id, acked_ids) if acked_ids else 0,
+                'nacked': self._nack_items(cursor, worker_id, failed_ids, error_message, requeue) if failed_ids else 0
+            }
             
+            # 같은 오류 메시지끼리 묶어서 한 번에 반영
+            by_message: Dict[str, List[int]] = {}
+            for queue_id, message in (rejected or {}).items():
+                by_message.setdefault(message, []).append(queue_id)
+            for message, queue_ids in by_message.items():
+                result['nacked'] += self._nack_items(cursor, worker_id, queue_ids, message, requeue=False)
+            
+            result['released'] = self._release_items(cursor, worker_id, released) if released else 0
+            return result
+    
+    @staticmethod
+    def _ack_items(cursor: sqlite3.Cursor, worker_id: str, queue_ids: List[int]) -> int:
+        placeholders = ','.join('?' * len(queue_ids))
+        owned = f"id IN ({placeholders}) AND status = 'processing' AND worker_id = ?"
+        params = list(queue_ids) + [worker_id]
+        
+        cursor.execute(f"""
+            UPDATE youtube_ads 
+            SET analysis_status = 'completed', analyzed_at = CURRENT_TIMESTAMP
+            WHERE id IN (SELECT youtube_ad_id FROM analysis_queue WHERE {owned})
+        """, params)
+        cursor.execute(f"""
+            UPDATE analysis_queue 
+            SET status = 'completed', processed_at = CURRENT_TIMESTAMP,
+                error_message = NULL, worker_id = NULL, lease_expires_at = NULL
+            WHERE {owned}
+        """, params)
+        return cursor.rowcount
+    
+    @staticmethod
+    def _nack_items(cursor: sqlite3.Cursor, worker_id: str, queue_ids: List[int],
+                    error_message: str = None, requeue: bool = True) -> int:
+        placeholders = ','.join('?' * len(queue_ids))
+        owned = f"id IN ({placeholders}) AND status = 'processing' AND worker_id = ?"
+        params = list(queue_ids) + [worker_id]
+        max_attempts = Config.QUEUE_MAX_ATTEMPTS if requeue else 0
+        
+        # 재시도 가능한 항목 → 다시 대기
+        cursor.execute(f"""
+            UPDATE analysis_queue 
+            SET status = 'waiting', error_message = ?, worker_id = NULL, lease_expires_at = NULL
+            WHERE {owned} AND attempts < ?
+        """, [error_message] + params + [max_attempts])
+        requeued = cursor.rowcount
+        
+        # 나머지 → 최종 실패
+        cursor.execute(f"""
+            UPDATE youtube_ads 
+            SET analysis_status = 'failed', analyzed_at = CURRENT_TIMESTAMP
+            WHERE id IN (SELECT youtube_ad_id FROM analysis_queue WHERE {owned})
+        """, params)
+        cursor.execute(f"""
+            UPDATE analysis_queue 
+            SET status = 'failed', processed_at = CURRENT_TIMESTAMP, error_message = ?,
+                worker_id = NULL, lease_expires_at = NULL
+            WHERE {owned}
+        """, [error_message] + params)
+        return requeued + cursor.rowcount
+    
+    def release(self, worker_id: str, queue_ids: List[int]) -> int:
+        """
+        처리하지 못한 항목을 시도 횟수 차감 없이 대기 상태로 반환 (작업자 종료, 전송 중단 등)
+        
         Returns:
-            내보낸 파일 경로
+            반환된 항목 수
         """
-        import json
-        import csv
-        from datetime import datetime
+        if not queue_ids:
+            return 0
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connections.transaction() as cursor:
+            return self._release_items(cursor, worker_id, queue_ids)
+    
+    @staticmethod
+    def _release_items(cursor: sqlite3.Cursor, worker_id: str, queue_ids: List[int]) -> int:
+        placeholders = ','.join('?' * len(queue_ids))
+        cursor.execute(f"""
+            UPDATE analysis_queue 
+            SET status = 'waiting', worker_id = NULL, lease_expires_at = NULL,
+                attempts = MAX(attempts - 1, 0)
+            WHERE id IN ({placeholders}) AND status = 'processing' AND worker_id = ?
+        """, list(queue_ids) + [worker_id])
+        return cursor.rowcount
+    
+    def requeue_expired(self) -> int:
+        """
+        임대 시간이 지난 처리 중 항목을 대기 상태로 되돌림 (최대 시도 횟수를 넘으면 failed)
         
-        try:
+        Returns:
+            처리된 항목 수
+        """
+        with self._write_transaction(immediate=True) as cursor:
+            return self._requeue_expired(cursor)
+    
+    @staticmethod
+    def _requeue_expired(cursor: sqlite3.Cursor) -> int:
+        expired = "status = 'processing' AND lease_expires_at < datetime('now')"
+        
+        cursor.execute(f"""
+            UPDATE youtube_ads 
+            SET analysis_status = 'failed', analyzed_at = CURRENT_TIMESTAMP
+            WHERE id IN (SELECT youtube_ad_id FROM analysis_queue WHERE {expired} AND attempts >= ?)
+        """, (Config.QUEUE_MAX_ATTEMPTS,))
+        cursor.execute(f"""
+            UPDATE analysis_queue 
+            SET status = 'failed', processed_at = CURRENT_TIMESTAMP, error_message = 'Lease expired',
+                worker_id = NULL, lease_expires_at = NULL
+            WHERE {expired} AND attempts >= ?
+        """, (Config.QUEUE_MAX_ATTEMPTS,))
+        failed = cursor.rowcount
+        
+        # 임대 중에 다른 경로로 분석이 끝난 광고는 대기로 되돌리지 않고 그 결과로 정리
+        cursor.execute(f"""
+            UPDATE analysis_queue 
+            SET status = CASE WHEN (SELECT analysis_status FROM youtube_ads a WHERE a.id = youtube_ad_id) = 'completed'
+                              THEN 'completed' ELSE 'failed' END,
+                processed_at = CURRENT_TIMESTAMP, worker_id = NULL, lease_expires_at = NULL
+            WHERE {expired}
+              AND youtube_ad_id IN (SELECT id FROM youtube_ads WHERE analysis_status IS NOT 'pending')
+        """)
+        settled = cursor.rowcount
+        
+        cursor.execute(f"""
+            UPDATE analysis_queue 
+            SET status = 'waiting', worker_id = NULL, lease_expires_at = NULL
+            WHERE {expired}
+        """)
+        return failed + settled + cursor.rowcount
+    
+    def get_statistics(self, max_age: float = None) -> dict:
+        """
+        데이터베이스 통계 조회
+        
+        트리거가 유지하는 ads_stats 카운터를 읽으므로 테이블 크기와 무관하게 일정한 비용이며,
+        결과는 max_age 초 동안 캐시한다 (이 인스턴스의 쓰기는 즉시 반영).
+        
+        Args:
+            max_age: 캐시 허용 시간 (초, 기본값: Config.STATS_CACHE_TTL_SECONDS, 0 이면 항상 새로 조회)
+        """
+        max_age = Config.STATS_CACHE_TTL_SECONDS if max_age is None else max_age
+        cached = self._stats_cache
+        if cached and time.monotonic() - cached[0] < max_age:
+            return dict(cached[1])
+        
+        cursor = self.connection().cursor()
+        
+        counts: Dict[str, Dict[str, int]] = {}
+        for dimension, key, count in cursor.execute("SELECT dimension, key, count FROM ads_stats"):
+            counts.setdefault(dimension, {})[key] = count
+        status_counts = counts.get('status', {})
+        source_counts = counts.get('source', {})
+        
+        stats = {}
+        
+        # 전체 광고 수
+        stats['total_ads'] = counts.get('total', {}).get('', 0)
+        
+        # 분석 상태별 개수
+        stats['pending'] = status_counts.get('pending', 0)
+        stats['completed'] = status_counts.get('completed', 0)
+        stats['failed'] = status_counts.get('failed', 0)
+        
+        # API 소스별 개수
+        stats['apify_count'] = source_counts.get('Apify', 0)
+        stats['serpapi_count'] = source_counts.get('SerpAPI', 0)
+        
+        # 최근 수집 시간 (idx_ads_collected_at 인덱스의 마지막 항목)
+        cursor.execute("""
+            SELECT MAX(collected_at) FROM youtube_ads
+        """)
+        latest = cursor.fetchone()[0]
+        stats['latest_collection'] = latest
+        
+        self._stats_cache = (time.monotonic(), stats)
+        return dict(stats)
+    
+    def iter_ads(self, status: str = 'all', after_id: int = 0, chunk_size: int = None,
+                 limit: int = None, columns: Sequence[str] = EXPORT_COLUMNS) -> Iterator[dict]:
+        """
+        광고를 id 순으로 chunk 단위 조회 (keyset 페이지네이션, 메모리 사용량 일정)
+        
+        chunk 마다 `id > 마지막 id` 조건으로 새로 조회하므로 긴 읽기 트랜잭션을 잡지 않는다.
+        
+        Args:
+            status: 'pending', 'completed', 'failed', 'all'
+            after_id: 이 id 다음부터 조회 (이전 페이지의 마지막 id)
+            chunk_size: 한 번에 읽을 행 수 (기본값: Config.EXPORT_CHUNK_SIZE)
+            limit: 최대 개수 (None 이면 끝까지)
+            columns: 조회할 youtube_ads 컬럼 (첫 컬럼은 id)
+        
+        Yields:
+            {'id': 1, 'title': '...', 'url': '...', 'note': '...', 'collected_at': '...', 'analysis_status': '...'}
+        """
+        chunk_size = chunk_size or Config.EXPORT_CHUNK_SIZE
+        column_list = ', '.join(columns)
+        cursor = self.connection().cursor()
+        remaining = limit
+        
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
             if status == 'all':
-                cursor.execute("""
-                    SELECT id, title, url, note, collected_at, analysis_status
-                    FROM youtube_ads ORDER BY collected_at DESC
-                """)
+                cursor.execute(f"""
+                    SELECT {column_list} FROM youtube_ads
+                    WHERE id > ? ORDER BY id LIMIT ?
+                """, (after_id, size))
             else:
-                cursor.execute("""
-                    SELECT id, title, url, note, collected_at, analysis_status
-                    FROM youtube_ads WHERE analysis_status = ?
-                    ORDER BY collected_at DESC
-                """, (status,))
+                cursor.execute(f"""
+                    SELECT {column_list} FROM youtube_ads
+                    WHERE analysis_status = ? AND id > ? ORDER BY id LIMIT ?
+                """, (status, after_id, size))
             
             rows = cursor.fetchall()
-            data = [
-                {
-                    'id': row[0],
-                    'title': row[1],
-                    'url': row[2],
-                    'note': row[3],
-                    'collected_at': row[4],
-                    'analysis_status': row[5]
-                }
-                for row in rows
-            ]
+            for row in rows:
+                yield dict(zip(columns, row))
             
+            if len(rows) < size:
+                return
+            after_id = rows[-1][0]
+            if remaining is not None:
+                remaining -= len(rows)
+    
+    def export_page(self, status: str = 'pending', after_id: int = 0, limit: int = 100) -> dict:
+        """
+        keyset 페이지 조회 (웹서비스/Node 측에서 이어받기용)
+        
+        Returns:
+            {'items': [...], 'next_after_id': 1234}  - 마지막 페이지면 next_after_id 는 None
+        """
+        items = list(self.iter_ads(status, after_id, chunk_size=limit, limit=limit))
+        return {
+            'items': items,
+            'next_after_id': items[-1]['id'] if len(items) == limit else None
+        }
+    
+    def write_export(self, out: TextIO, status: str = 'pending', format: str = 'ndjson',
+                     after_id: int = 0, limit: int = None) -> int:
+        """
+        열린 텍스트 스트림(파일, stdout, gzip 등)에 한 행씩 기록
+        
+        Args:
+            format: 'ndjson' (한 줄에 한 레코드), 'json' (배열), 'csv'
+        
+        Returns:
+            기록한 레코드 수
+        """
+        rows = self.iter_ads(status, after_id, limit=limit)
+        count = 0
+        
+        if format == 'csv':
+            writer = csv.DictWriter(out, fieldnames=EXPORT_COLUMNS)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        elif format == 'json':
+            out.write('[')
+            for row in rows:
+                out.write(',\n' if count else '\n')
+                out.write(json.dumps(row, ensure_ascii=False))
+                count += 1
+            out.write('\n]\n')
+        elif format == 'ndjson':
+            for row in rows:
+                out.write(json.dumps(row, ensure_ascii=False))
+                out.write('\n')
+                count += 1
+        else:
+            raise ValueError(f"지원하지 않는 형식: {format}")
+        
+        return count
+    
+    def export_for_analysis(self, status: str = 'pending', format: str = 'json',
+                            compress: bool = False, after_id: int = 0, output_path: str = None) -> str:
+        """
+        분석용 데이터 내보내기 (chunk 단위로 읽어 한 행씩 기록하므로 테이블 크기와 무관한 메모리 사용)
+        
+        Args:
+            status: 'pending', 'all' 등
+            format: 'json', 'ndjson', 'csv', 'parquet', 'arrow'
+                    (parquet/arrow 는 status 와 무관하게 전체 광고를 수집일 파티션 디렉터리에 증분 추가,
+                     snapshot_export.export_snapshot 참고)
+            compress: True 면 gzip 으로 압축 (.gz)
+            after_id: 이 id 다음 광고부터 내보내기 (증분 내보내기)
+            output_path: 저장 경로 (기본값: youtube_ads_<status>_<시각>.<format>, 스냅샷은 Config.SNAPSHOT_DIR)
+        
+        Returns:
+            내보낸 파일 경로 (스냅샷은 디렉터리 경로)
+        """
+        if format in ('parquet', 'arrow'):
+            from snapshot_export import export_snapshot
+            output_path = output_path or Config.SNAPSHOT_DIR
+            export_snapshot(self, output_path, format)
+            return output_path
+        
+        if not output_path:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            
-            if format == 'json':
-                filename = f"youtube_ads_{status}_{timestamp}.json"
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-            else:  # CSV
-                filename = f"youtube_ads_{status}_{timestamp}.csv"
-                with open(filename, 'w', newline='', encoding='utf-8') as f:
-                    if data:
-                        writer = csv.DictWriter(f, fieldnames=data[0].keys())
-                        writer.writeheader()
-                        writer.writerows(data)
-            
-            print(f"📁 데이터 내보내기 완료: {filename} ({len(data)}개 레코드)")
-            return filename
-            
-        finally:
-            conn.close()
+            output_path = f"youtube_ads_{status}_{timestamp}.{format}"
+            if compress:
+                output_path += '.gz'
+        
+        if compress:
+            f = gzip.open(output_path, 'wt', encoding='utf-8', newline='')
+        else:
+            f = open(output_path, 'w', encoding='utf-8', newline='')
+        with f:
+            count = self.write_export(f, status, format, after_id)
+        
+        print(f"📁 데이터 내보내기 완료: {output_path} ({count}개 레코드)")
+        return output_path
 
 def main():
     """데이터베이스 설정 및 테스트"""
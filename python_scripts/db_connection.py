@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+SQLite 연결 관리
+- 스레드별 장기 연결 재사용 (호출마다 connect 하지 않음)
+- WAL 저널 모드 + synchronous/busy_timeout PRAGMA
+- 준비된 문장(prepared statement) 캐시
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from config import Config
+
+class SQLiteConnectionManager:
+    """스레드별 SQLite 연결 풀"""
+    
+    def __init__(self, db_path: str,
+                 busy_timeout_ms: int = None,
+                 synchronous: str = None,
+                 cached_statements: int = None):
+        """
+        Args:
+            db_path: 데이터베이스 파일 경로
+            busy_timeout_ms: 잠금 대기 시간 (기본값: Config.SQLITE_BUSY_TIMEOUT_MS)
+            synchronous: PRAGMA synchronous 값 (기본값: Config.SQLITE_SYNCHRONOUS)
+            cached_statements: 연결당 준비된 문장 캐시 크기 (기본값: Config.SQLITE_CACHED_STATEMENTS)
+        """
+        self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms or Config.SQLITE_BUSY_TIMEOUT_MS
+        self.synchronous = synchronous or Config.SQLITE_SYNCHRONOUS
+        self.cached_statements = cached_statements or Config.SQLITE_CACHED_STATEMENTS
+        
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+    
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            cached_statements=self.cached_statements,
+            check_same_thread=False  # close_all() 이 다른 스레드에서 닫을 수 있도록
+        )
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        # WAL: 읽기 연결이 수집기의 쓰기를 막지 않음 (DB 파일에 영구 저장됨)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        return conn
+    
+    def get(self) -> sqlite3.Connection:
+        """현재 스레드 전용 연결 반환 (없으면 생성)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+    
+    @contextmanager
+    def transaction(self, immediate: bool = False) -> Iterator[sqlite3.Cursor]:
+        """
+        트랜잭션 컨텍스트 (정상 종료 시 commit, 예외 시 rollback)
+        
+        Args:
+            immediate: True 면 BEGIN IMMEDIATE 로 시작 (읽은 값을 기준으로 쓰는 경우
+                       다른 프로세스의 쓰기가 끼어들지 않도록 쓰기 잠금을 먼저 획득)
+        
+        Usage:
+            with manager.transaction() as cursor:
+                cursor.execute(...)
+        """
+        conn = self.get()
+        with conn:
+            if immediate and not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            yield conn.cursor()
+    
+    def close_all(self):
+        """모든 스레드의 연결 종료"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+광고 데이터 스트리밍 내보내기 CLI
+- DB 를 chunk 단위로 읽어 한 행씩 출력 (메모리 사용량 일정)
+- 표준 출력으로 내보내면 Node 측에서 spawn 후 stdout 을 그대로 스트리밍 응답으로 넘길 수 있음
+- --after-id 로 이전 내보내기 이후 광고만 (keyset 페이지네이션)
+- parquet / arrow: 수집일 파티션 디렉터리에 컬럼형 스냅샷 증분 추가 (pyarrow 필요)
+
+사용법:
+    python export_ads.py --status all --format ndjson > ads.ndjson
+    python export_ads.py --status all --format csv --gzip --output ads.csv.gz
+    python export_ads.py --after-id 1200 --limit 500
+    python export_ads.py --format parquet --output snapshots
+"""
+
+import argparse
+import contextlib
+import gzip
+import io
+import sys
+
+from database_setup import YouTubeAdsDatabase
+from snapshot_export import export_snapshot
+
+def main():
+    parser = argparse.ArgumentParser(description="YouTube 광고 데이터 스트리밍 내보내기")
+    parser.add_argument('--db', default="youtube_ads.db", help="데이터베이스 파일 경로")
+    parser.add_argument('--status', default='all', help="pending / completed / failed / all")
+    parser.add_argument('--format', default='ndjson', choices=['ndjson', 'json', 'csv', 'parquet', 'arrow'])
+    parser.add_argument('--after-id', type=int, default=0, help="이 id 다음 광고부터")
+    parser.add_argument('--limit', type=int, default=None, help="최대 개수")
+    parser.add_argument('--gzip', action='store_true', help="gzip 압축")
+    parser.add_argument('--output', default='-', help="저장 경로 (기본값: 표준 출력, 스냅샷은 Config.SNAPSHOT_DIR)")
+    parser.add_argument('--full', action='store_true', help="스냅샷을 처음부터 다시 생성")
+    args = parser.parse_args()
+    
+    # 초기화 메시지가 데이터 스트림에 섞이지 않도록 표준 에러로
+    with contextlib.redirect_stdout(sys.stderr):
+        db = YouTubeAdsDatabase(args.db)
+    
+    if args.format in ('parquet', 'arrow'):
+        with contextlib.redirect_stdout(sys.stderr):
+            export_snapshot(db, None if args.output == '-' else args.output, args.format, full=args.full)
+        return
+    
+    if args.output == '-':
+        if args.gzip:
+            out = gzip.open(sys.stdout.buffer, 'wt', encoding='utf-8', newline='')
+        else:
+            out = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', newline='')
+    elif args.gzip:
+        out = gzip.open(args.output, 'wt', encoding='utf-8', newline='')
+    else:
+        out = open(args.output, 'w', encoding='utf-8', newline='')
+    
+    with out:
+        count = db.write_export(out, args.status, args.format, args.after_id, args.limit)
+    
+    print(f"📁 내보내기 완료: {count}개 레코드", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
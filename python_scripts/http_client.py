@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+공용 HTTP 전송 계층
+- keep-alive 연결 풀 재사용 (호스트별 풀 크기 설정)
+- 재시도 + 지수 백오프
+- 기본 타임아웃 (Config.REQUEST_TIMEOUT)
+- API 소스별 호출 지연 시간 지표
+
+requests/urllib3 는 첫 HttpClient 를 만들 때 import 한다 (모듈 import 만으로는 로드하지 않음).
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from config import Config
+from rate_limiter import get_limiter
+
+class LatencyMetrics:
+    """API 소스별 호출 지연 시간 집계 (최근 window 개 기준 백분위)"""
+    
+    def __init__(self, window: int = 500):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[str, deque] = {}
+        self._calls: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+        self._total_ms: Dict[str, float] = {}
+    
+    def record(self, name: str, elapsed_ms: float, success: bool):
+        """호출 1건 기록"""
+        with self._lock:
+            if name not in self._samples:
+                self._samples[name] = deque(maxlen=self.window)
+                self._calls[name] = 0
+                self._errors[name] = 0
+                self._total_ms[name] = 0.0
+            
+            self._samples[name].append(elapsed_ms)
+            self._calls[name] += 1
+            self._total_ms[name] += elapsed_ms
+            if not success:
+                self._errors[name] += 1
+    
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        지표 조회
+        
+        Returns:
+            {'SerpAPI': {'calls': 10, 'errors': 0, 'avg_ms': 812.3, 'p50_ms': 790.1, 'p95_ms': 1203.4, 'max_ms': 1300.0}, ...}
+        """
+        with self._lock:
+            result = {}
+            for name, samples in self._samples.items():
+                ordered = sorted(samples)
+                result[name] = {
+                    'calls': self._calls[name],
+                    'errors': self._errors[name],
+                    'avg_ms': round(self._total_ms[name] / self._calls[name], 1),
+                    'p50_ms': round(self._percentile(ordered, 0.50), 1),
+                    'p95_ms': round(self._percentile(ordered, 0.95), 1),
+                    'max_ms': round(ordered[-1], 1)
+                }
+            return result
+    
+    @staticmethod
+    def _percentile(ordered: List[float], q: float) -> float:
+        if not ordered:
+            return 0.0
+        index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+        return ordered[index]
+
+class HttpClient:
+    """연결 풀을 공유하는 HTTP 클라이언트"""
+    
+    def __init__(self,
+                 pool_sizes: Optional[Dict[str, int]] = None,
+                 default_pool_size: Optional[int] = None,
+                 max_retries: Optional[int] = None,
+                 backoff_factor: Optional[float] = None,
+                 timeout: Optional[float] = None):
+        """
+        Args:
+            pool_sizes: URL 접두사별 연결 풀 크기 (기본값: Config.HTTP_POOL_SIZES)
+            default_pool_size: 그 외 호스트의 연결 풀 크기
+            max_retries: 연결 오류/일시적 HTTP 오류 재시도 횟수
+            backoff_factor: 재시도 백오프 계수 (0.5 → 0.5s, 1s, 2s ...)
+            timeout: 기본 요청 타임아웃 (초)
+        """
+        self.pool_sizes = dict(Config.HTTP_POOL_SIZES if pool_sizes is None else pool_sizes)
+        self.default_pool_size = default_pool_size or Config.HTTP_POOL_SIZE
+        self.max_retries = Config.HTTP_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_factor = Config.HTTP_RETRY_BACKOFF if backoff_factor is None else backoff_factor
+        self.timeout = timeout or Config.REQUEST_TIMEOUT
+        self.metrics = LatencyMetrics()
+        self.session = self._build_session()
+    
+    def _build_retry(self) -> 'Retry':
+        from urllib3.util.retry import Retry
+        
+        # POST 는 연결 단계 오류만 재시도 (유료 API 중복 실행 방지)
+        return Retry(
+            total=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=Config.HTTP_RETRY_STATUS,
+            raise_on_status=False,
+            respect_retry_after_header=True
+        )
+    
+    def _build_adapter(self, pool_size: int) -> 'HTTPAdapter':
+        from requests.adapters import HTTPAdapter
+        
+        return HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            max_retries=self._build_retry()
+        )
+    
+    def _build_session(self) -> 'requests.Session':
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        session = requests.Session()
+        session.headers.update({'User-Agent': 'YouTube-Ads-Collector/1.0'})
+        
+        default_adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=self.default_pool_size,
+            max_retries=self._build_retry()
+        )
+        session.mount('http://', default_adapter)
+        session.mount('https://', default_adapter)
+        
+        # 호스트별 전용 풀 (가장 긴 접두사가 우선 적용됨)
+        for prefix, pool_size in self.pool_sizes.items():
+            session.mount(prefix, self._build_adapter(pool_size))
+        
+        return session
+    
+    def request(self, method: str, url: str, provider: Optional[str] = None, **kwargs) -> 'requests.Response':
+        """
+        HTTP 요청 실행 및 지연 시간 기록
+        
+        Args:
+            method: 'GET', 'POST' 등
+            url: 요청 URL
+            provider: API 소스 이름 - 지정하면 해당 소스의 속도 제한을 따름 (지표 기본값: 호스트명)
+            **kwargs: requests 인자 (timeout 미지정 시 기본 타임아웃 적용)
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        name = provider or urlsplit(url).netloc
+        
+        if provider:
+            get_limiter(provider).acquire()
+        
+        started = time.perf_counter()
+        success = False
+        try:
+            response = self.session.request(method, url, **kwargs)
+            success = response.status_code < 400
+            return response
+        finally:
+            self.metrics.record(name, (time.perf_counter() - started) * 1000, success)
+    
+    def get(self, url: str, provider: Optional[str] = None, **kwargs) -> 'requests.Response':
+        return self.request('GET', url, provider=provider, **kwargs)
+    
+    def post(self, url: str, provider: Optional[str] = None, **kwargs) -> 'requests.Response':
+        return self.request('POST', url, provider=provider, **kwargs)
+    
+    def get_metrics(self) -> Dict[str, dict]:
+        """API 소스별 지연 시간 지표"""
+        return self.metrics.snapshot()
+    
+    def close(self):
+        self.session.close()
+
+_shared_client: Optional[HttpClient] = None
+_shared_lock = threading.Lock()
+
+def get_http_client() -> HttpClient:
+    """프로세스 전체에서 공유하는 HttpClient 반환"""
+    global _shared_client
+    
+    if _shared_client is None:
+        with _shared_lock:
+            if _shared_client is None:
+                _shared_client = HttpClient()
+    return _shared_client
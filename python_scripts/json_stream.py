@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+API 응답 스트리밍 JSON 파싱
+- 응답 본문을 chunk 단위로 받으면서 최상위 배열의 항목을 하나씩 꺼냄 (json.JSONDecoder.raw_decode)
+- JSON Lines (한 줄에 JSON 하나) 도 같은 방식으로 한 줄씩
+- 전체 본문과 전체 항목 목록을 메모리에 올리지 않으므로, 항목 하나 크기만큼의 메모리로 처리
+
+사용 예:
+    response = http.get(url, stream=True)
+    for item in iter_json_array(response.iter_content(CHUNK_SIZE)):
+        ...
+"""
+
+import codecs
+import json
+import re
+from typing import Iterable, Iterator
+
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator:
+    """
+    최상위 JSON 배열 '[{...}, {...}]' 의 항목을 도착하는 대로 하나씩 반환
+    
+    Raises:
+        ValueError: 배열이 아니거나 본문이 중간에 끊긴 경우
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    started = False
+    
+    for chunk in _with_final(chunks):
+        final = chunk is None
+        buffer += text_decoder.decode(b'' if final else chunk, final=final)
+        pos = 0
+        
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos == len(buffer):
+                break
+            
+            if not started:
+                if buffer[pos] != '[':
+                    raise ValueError("JSON 배열이 아닙니다")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == ',':
+                pos += 1
+                continue
+            if buffer[pos] == ']':
+                return
+            
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # 항목이 아직 다 도착하지 않음 → 다음 chunk 와 합쳐서 다시
+            if end == len(buffer) and not final and not isinstance(value, (dict, list, str)):
+                break  # 숫자/리터럴은 다음 chunk 에서 이어질 수 있음
+            yield value
+            pos = end
+        
+        buffer = buffer[pos:]
+    
+    raise ValueError("JSON 배열이 끝나지 않았습니다 (응답이 중간에 끊김)")
+
+def iter_json_lines(chunks: Iterable[bytes]) -> Iterator:
+    """JSON Lines 본문의 값을 한 줄씩 반환 (빈 줄은 무시)"""
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    
+    for chunk in _with_final(chunks):
+        final = chunk is None
+        buffer += text_decoder.decode(b'' if final else chunk, final=final)
+        lines = buffer.split('\n')
+        buffer = '' if final else lines.pop()
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+
+def _with_final(chunks: Iterable[bytes]) -> Iterator:
+    """chunk 를 모두 넘긴 뒤 끝 표시로 None 을 하나 더 넘김"""
+    for chunk in chunks:
+        if chunk:
+            yield chunk
+    yield None
@@ -0,0 +1,736 @@
+#!/usr/bin/env python3
+"""
+youtube_ads.db 스키마 마이그레이션 (번호 매김, PRAGMA user_version 으로 추적)
+- MIGRATIONS 의 각 항목은 버전 번호를 가지며, user_version 보다 큰 버전만 순서대로 적용
+  (한 단계가 끝날 때마다 user_version 을 그 버전으로 기록 → 중간에 멈춰도 이어서 진행)
+- 모든 단계는 이미 적용된 DB 에서 다시 실행해도 안전해야 한다
+  (user_version 을 쓰기 전에 중단된 경우, 버전 관리 이전의 DB 는 일부 변경만 들어 있을 수 있음)
+- 긴 작업(백필)은 짧은 쓰기 트랜잭션 여러 개로 나눠 실행 → 수집기/작업자 쓰기가 배치 사이에 끼어들 수 있음
+- dry-run: DB 를 임시 파일로 복사해 적용해 보고 단계별 소요 시간/변경 행 수만 출력 (원본은 그대로)
+
+새 스키마 변경은 MIGRATIONS 끝에 다음 번호로 추가한다 (이미 배포된 항목의 번호/내용은 바꾸지 않음).
+YouTubeAdsDatabase.init_database 는 user_version 이 SCHEMA_VERSION 보다 작을 때만 이 모듈을 실행한다.
+
+사용법:
+    python migrations.py --db youtube_ads.db --status          # 현재 버전과 대기 중인 마이그레이션
+    python migrations.py --db youtube_ads.db --dry-run         # 사본에 적용해 소요 시간 확인
+    python migrations.py --db youtube_ads.db                   # 최신 버전까지 적용
+    python migrations.py --db youtube_ads.db --target 8 --batch-size 2000 --pause 0.05
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from config import Config
+from db_connection import SQLiteConnectionManager
+from youtube_urls import extract_video_id
+
+# youtube_ads 의 INSERT/DELETE/UPDATE 마다 ads_stats 카운터를 갱신하는 트리거
+# (Node 측 스크립트 등 다른 경로의 쓰기도 집계되도록 DB 에 둔다)
+ADS_STATS_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_ads_stats_insert AFTER INSERT ON youtube_ads
+    BEGIN
+        INSERT INTO ads_stats (dimension, key, count) VALUES
+            ('total', '', 1),
+            ('status', COALESCE(NEW.analysis_status, ''), 1),
+            ('source', COALESCE(NEW.api_source, ''), 1)
+        ON CONFLICT(dimension, key) DO UPDATE SET count = count + excluded.count;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_ads_stats_delete AFTER DELETE ON youtube_ads
+    BEGIN
+        INSERT INTO ads_stats (dimension, key, count) VALUES
+            ('total', '', -1),
+            ('status', COALESCE(OLD.analysis_status, ''), -1),
+            ('source', COALESCE(OLD.api_source, ''), -1)
+        ON CONFLICT(dimension, key) DO UPDATE SET count = count + excluded.count;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_ads_stats_update AFTER UPDATE OF analysis_status, api_source ON youtube_ads
+    WHEN OLD.analysis_status IS NOT NEW.analysis_status OR OLD.api_source IS NOT NEW.api_source
+    BEGIN
+        INSERT INTO ads_stats (dimension, key, count) VALUES
+            ('status', COALESCE(OLD.analysis_status, ''), -1),
+            ('status', COALESCE(NEW.analysis_status, ''), 1),
+            ('source', COALESCE(OLD.api_source, ''), -1),
+            ('source', COALESCE(NEW.api_source, ''), 1)
+        ON CONFLICT(dimension, key) DO UPDATE SET count = count + excluded.count;
+    END
+    """
+)
+
+# 큐를 거치지 않고 youtube_ads.analysis_status 가 바뀐 광고(Node 측 자동 분석 등)의 대기 항목을 정리하는 트리거
+# (처리 중 항목은 작업자의 ack/nack 또는 임대 만료 처리가 정리한다)
+QUEUE_SETTLE_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS trg_queue_settle AFTER UPDATE OF analysis_status ON youtube_ads
+    WHEN NEW.analysis_status IS NOT OLD.analysis_status AND NEW.analysis_status IS NOT 'pending'
+    BEGIN
+        UPDATE analysis_queue
+        SET status = CASE WHEN NEW.analysis_status = 'completed' THEN 'completed' ELSE 'failed' END,
+            processed_at = CURRENT_TIMESTAMP
+        WHERE youtube_ad_id = NEW.id AND status = 'waiting';
+    END
+"""
+
+class MigrationContext:
+    """마이그레이션 단계에 넘겨주는 DB 접근/배치 설정"""
+    
+    def __init__(self, connections: SQLiteConnectionManager, batch_size: int = None,
+                 pause_seconds: float = None):
+        """
+        Args:
+            connections: 대상 DB 의 연결 관리자
+            batch_size: 백필 배치당 행 수 (기본값: Config.MIGRATION_BATCH_SIZE)
+            pause_seconds: 백필 배치 사이 대기 시간 (기본값: Config.MIGRATION_BATCH_PAUSE_SECONDS)
+        """
+        self.connections = connections
+        self.batch_size = batch_size or Config.MIGRATION_BATCH_SIZE
+        self.pause_seconds = Config.MIGRATION_BATCH_PAUSE_SECONDS if pause_seconds is None else pause_seconds
+        self.batches = 0  # 이번 단계에서 실행한 백필 배치 수
+        self.notes: List[str] = []  # 이번 단계에서 알릴 내용 (dry-run 결과에도 포함)
+    
+    def transaction(self):
+        """쓰기 잠금을 먼저 잡는 트랜잭션 (BEGIN IMMEDIATE)"""
+        return self.connections.transaction(immediate=True)
+    
+    @staticmethod
+    def columns(cursor: sqlite3.Cursor, table: str) -> List[str]:
+        return [row[1] for row in cursor.execute(f"PRAGMA table_info({table})")]
+    
+    @staticmethod
+    def has_index(cursor: sqlite3.Cursor, name: str) -> bool:
+        return cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (name,)
+        ).fetchone() is not None
+    
+    def backfill(self, select_batch: str, apply_batch: Callable[[sqlite3.Cursor, list], int],
+                 after_id: int = 0) -> int:
+        """
+        id 순서대로 배치 단위 백필 (배치마다 별도 트랜잭션)
+        
+        Args:
+            select_batch: 첫 컬럼이 id 인 SELECT, 매개변수는 (마지막 id, 배치 크기)
+                          예: "SELECT id, url FROM youtube_ads WHERE video_id IS NULL AND id > ? ORDER BY id LIMIT ?"
+            apply_batch: (cursor, 배치 행 목록) → 변경한 행 수
+            after_id: 이 id 이후의 행부터 시작
+        
+        Returns:
+            변경한 행 수 합계
+        """
+        last_id = after_id
+        changed = 0
+        while True:
+            with self.transaction() as cursor:
+                rows = cursor.execute(select_batch, (last_id, self.batch_size)).fetchall()
+                if not rows:
+                    break
+                changed += apply_batch(cursor, rows)
+                last_id = rows[-1][0]
+            self.batches += 1
+            
+            if len(rows) < self.batch_size:
+                break
+            if self.pause_seconds > 0:
+                time.sleep(self.pause_seconds)  # 다른 프로세스가 쓰기 잠금을 잡을 틈
+        return changed
+
+class Migration(NamedTuple):
+    """번호가 매겨진 스키마 변경 1단계"""
+    version: int
+    name: str
+    apply: Callable[[MigrationContext], Optional[int]]  # 변경한 행 수 (모르면 None)
+
+# ---------------------------------------------------------------------------
+# 공용 정리 작업 (마이그레이션과 init_database 기동 경로에서 함께 사용)
+# ---------------------------------------------------------------------------
+
+def merge_duplicate_ad(cursor: sqlite3.Cursor, keeper_id: int, duplicate_id: int):
+    """같은 영상의 중복 행을 keeper 로 병합 (분석 완료 상태는 유지)"""
+    cursor.execute("""
+        SELECT analysis_status, analyzed_at FROM youtube_ads WHERE id = ?
+    """, (duplicate_id,))
+    duplicate = cursor.fetchone()
+    
+    if duplicate and duplicate[0] == 'completed':
+        cursor.execute("""
+            UPDATE youtube_ads 
+            SET analysis_status = 'completed', analyzed_at = COALESCE(analyzed_at, ?)
+            WHERE id = ? AND analysis_status != 'completed'
+        """, (duplicate[1], keeper_id))
+        if cursor.rowcount > 0:
+            cursor.execute("""
+                UPDATE analysis_queue 
+                SET status = 'completed', processed_at = CURRENT_TIMESTAMP
+                WHERE youtube_ad_id = ? AND status != 'completed'
+            """, (keeper_id,))
+    
+    cursor.execute("DELETE FROM analysis_queue WHERE youtube_ad_id = ?", (duplicate_id,))
+    cursor.execute("DELETE FROM youtube_ads WHERE id = ?", (duplicate_id,))
+
+def backfill_video_ids(ctx: MigrationContext, after_id: int = 0) -> Dict[str, int]:
+    """
+    video_id 가 비어 있는 광고를 URL 에서 채움 (배치 단위)
+    
+    같은 영상의 행이 이미 있으면 먼저 수집된 행으로 병합한다. 유니크 인덱스가 있으면 행마다
+    인덱스로 확인하고 (다른 프로세스가 배치 사이에 넣은 행도 반영), 없으면 (첫 마이그레이션)
+    기존 video_id 를 한 번 읽어 메모리에서 확인한 뒤 merge_video_id_duplicates 로 마무리한다.
+    URL 에서 ID 를 꺼낼 수 없는 행(채널 URL 등)은 NULL 로 남는다.
+    
+    Args:
+        after_id: 이 id 이후의 행만 확인 (기동 경로는 마지막으로 정리한 id 부터)
+    
+    Returns:
+        {'filled': 채운 행 수, 'merged': 병합한 중복 행 수}
+    """
+    with ctx.transaction() as cursor:
+        indexed = ctx.has_index(cursor, 'idx_ads_video_id')
+        known = {} if indexed else dict(
+            cursor.execute("SELECT video_id, id FROM youtube_ads WHERE video_id IS NOT NULL").fetchall()
+        )
+    stats = {'filled': 0, 'merged': 0}
+    
+    def existing_id(cursor: sqlite3.Cursor, video_id: str) -> Optional[int]:
+        if not indexed:
+            return known.get(video_id)
+        row = cursor.execute("SELECT id FROM youtube_ads WHERE video_id = ?", (video_id,)).fetchone()
+        return row[0] if row else None
+    
+    def apply_batch(cursor: sqlite3.Cursor, rows: list) -> int:
+        for ad_id, url in rows:
+            video_id = extract_video_id(url)
+            if not video_id:
+                continue
+            
+            keeper_id = existing_id(cursor, video_id)
+            if keeper_id is not None and keeper_id < ad_id:
+                merge_duplicate_ad(cursor, keeper_id, ad_id)
+                stats['merged'] += 1
+                continue
+            if keeper_id is not None:
+                merge_duplicate_ad(cursor, ad_id, keeper_id)
+                stats['merged'] += 1
+            
+            cursor.execute("UPDATE youtube_ads SET video_id = ? WHERE id = ?", (video_id, ad_id))
+            known[video_id] = ad_id
+            stats['filled'] += 1
+        return len(rows)
+    
+    ctx.backfill("""
+        SELECT id, url FROM youtube_ads
+        WHERE video_id IS NULL AND id > ?
+        ORDER BY id LIMIT ?
+    """, apply_batch, after_id=after_id)
+    
+    if stats['merged']:
+        print(f"🔧 중복 영상 {stats['merged']}개 병합 완료")
+    return stats
+
+def merge_video_id_duplicates(cursor: sqlite3.Cursor) -> int:
+    """같은 video_id 의 행을 가장 먼저 수집된 행으로 병합 (유니크 인덱스 생성 직전)"""
+    duplicates = cursor.execute("""
+        SELECT video_id, MIN(id) FROM youtube_ads
+        WHERE video_id IS NOT NULL
+        GROUP BY video_id HAVING COUNT(*) > 1
+    """).fetchall()
+    merged = 0
+    for video_id, keeper_id in duplicates:
+        others = cursor.execute(
+            "SELECT id FROM youtube_ads WHERE video_id = ? AND id != ?", (video_id, keeper_id)
+        ).fetchall()
+        for (duplicate_id,) in others:
+            merge_duplicate_ad(cursor, keeper_id, duplicate_id)
+            merged += 1
+    return merged
+
+def enqueue_unqueued_pending(cursor: sqlite3.Cursor, after_id: int = 0) -> int:
+    """다른 경로(Node 측 스크립트 등)로 들어와 큐에 없는 대기 광고 등록 (after_id 이후의 행만)"""
+    cursor.execute("""
+        INSERT INTO analysis_queue (youtube_ad_id, priority)
+        SELECT a.id, 1 FROM youtube_ads a
+        WHERE a.id > ? AND a.analysis_status = 'pending'
+          AND NOT EXISTS (SELECT 1 FROM analysis_queue q WHERE q.youtube_ad_id = a.id)
+        ORDER BY a.id
+    """, (after_id,))
+    if cursor.rowcount > 0:
+        print(f"🔧 분석 큐에 대기 광고 {cursor.rowcount}개 등록")
+    return max(cursor.rowcount, 0)
+
+def reconciled_until(cursor: sqlite3.Cursor) -> int:
+    """기동 경로가 마지막으로 정리한 youtube_ads id (이후 행만 다시 확인)"""
+    row = cursor.execute("SELECT last_id FROM reconcile_state WHERE name = 'external_rows'").fetchone()
+    return row[0] if row else 0
+
+def mark_reconciled(cursor: sqlite3.Cursor, last_id: int):
+    """last_id 까지 정리 완료로 기록 (동시에 기동한 프로세스가 더 큰 값을 썼으면 유지)"""
+    cursor.execute("""
+        INSERT INTO reconcile_state (name, last_id) VALUES ('external_rows', ?)
+        ON CONFLICT(name) DO UPDATE SET last_id = MAX(last_id, excluded.last_id)
+    """, (last_id,))
+
+def rebuild_ads_stats(cursor: sqlite3.Cursor):
+    """ads_stats 카운터를 youtube_ads 전체 집계로 다시 계산"""
+    cursor.execute("DELETE FROM ads_stats")
+    cursor.execute("INSERT INTO ads_stats (dimension, key, count) SELECT 'total', '', COUNT(*) FROM youtube_ads")
+    for dimension, column in (('status', 'analysis_status'), ('source', 'api_source')):
+        cursor.execute(f"""
+            INSERT INTO ads_stats (dimension, key, count)
+            SELECT '{dimension}', COALESCE({column}, ''), COUNT(*) FROM youtube_ads
+            GROUP BY COALESCE({column}, '')
+        """)
+
+# ---------------------------------------------------------------------------
+# 마이그레이션 단계 (번호 순서)
+# ---------------------------------------------------------------------------
+
+def _base_tables(ctx: MigrationContext) -> None:
+    """기본 테이블/인덱스 (새 DB 는 최신 컬럼으로 만들어지고 이후 단계는 건너뜀)"""
+    with ctx.transaction() as cursor:
+        # 1. 광고 영상 정보 테이블
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS youtube_ads (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                url TEXT UNIQUE NOT NULL,  -- 중복 방지
+                video_id TEXT,             -- 11자리 YouTube ID (정규화 중복 방지 키)
+                note TEXT,
+                search_query TEXT,         -- 어떤 검색어로 찾았는지 추적
+                api_source TEXT,           -- Apify 또는 SerpAPI
+                collected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                analyzed_at TIMESTAMP NULL, -- 분석 완료 시간
+                analysis_status TEXT DEFAULT 'pending'  -- pending, completed, failed
+            )
+        """)
+        
+        # 2. 검색 기록 테이블 (중복 호출 방지, 검색어 + API 소스별)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS search_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                query TEXT NOT NULL,
+                api_source TEXT NOT NULL,   -- Apify 또는 SerpAPI
+                last_collected TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                total_found INTEGER DEFAULT 0,
+                success_count INTEGER DEFAULT 0,
+                last_cursor TEXT NULL,        -- 증분 수집: 다음에 이어서 볼 페이지 토큰
+                last_fingerprint TEXT NULL,   -- 증분 수집: 마지막 첫 페이지 결과 지문
+                yield_ewma REAL NULL,         -- 적응형 간격: 호출당 신규 광고 수 지수가중이동평균
+                yield_success_count INTEGER DEFAULT 0, -- 적응형 간격: 마지막 표본 때의 success_count
+                yield_sampled_at TIMESTAMP NULL,       -- 적응형 간격: 마지막 표본 때의 last_collected
+                UNIQUE (query, api_source)
+            )
+        """)
+        
+        # 2-1. API 소스별 하루(UTC) 호출 수 (일일 호출 예산)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS api_daily_calls (
+                day TEXT NOT NULL,          -- YYYY-MM-DD (UTC)
+                api_source TEXT NOT NULL,
+                calls INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, api_source)
+            ) WITHOUT ROWID
+        """)
+        
+        # 3. 분석 큐 테이블 (웹서비스 연동용)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS analysis_queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                youtube_ad_id INTEGER,
+                priority INTEGER DEFAULT 1,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                processed_at TIMESTAMP NULL,
+                status TEXT DEFAULT 'waiting',  -- waiting, processing, completed, failed
+                error_message TEXT NULL,
+                worker_id TEXT NULL,            -- 처리 중인 작업자
+                lease_expires_at TIMESTAMP NULL, -- 임대 만료 시각 (UTC, 지나면 다시 waiting)
+                attempts INTEGER DEFAULT 0,     -- 가져간 횟수
+                FOREIGN KEY (youtube_ad_id) REFERENCES youtube_ads (id)
+            )
+        """)
+        
+        # 4. 웹서비스 연동 로그 테이블
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sync_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                sync_type TEXT NOT NULL,  -- 'fetch_new', 'update_status' 등
+                records_count INTEGER,
+                success BOOLEAN,
+                error_message TEXT NULL,
+                sync_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # 인덱스 생성 (성능 최적화)
+        # (url 은 UNIQUE 자동 인덱스, status 는 idx_queue_claim 의 앞부분으로 조회 - 8단계 참고)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_ads_collected_at ON youtube_ads(collected_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_ads_analysis_status ON youtube_ads(analysis_status)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_queue_claim ON analysis_queue(status, priority DESC, created_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_queue_ad ON analysis_queue(youtube_ad_id)")
+
+def _youtube_ads_video_id(ctx: MigrationContext) -> int:
+    """
+    youtube_ads.video_id 컬럼 추가, 배치 백필, 유니크 인덱스 생성
+    
+    URL 만 다르고 같은 영상인 기존 중복 행은 가장 먼저 수집된 행으로 병합한다.
+    """
+    with ctx.transaction() as cursor:
+        if 'video_id' not in ctx.columns(cursor, 'youtube_ads'):
+            print("🔧 youtube_ads.video_id 컬럼 추가 중...")
+            cursor.execute("ALTER TABLE youtube_ads ADD COLUMN video_id TEXT")
+    
+    stats = backfill_video_ids(ctx)
+    
+    # 백필 도중 다른 프로세스가 넣은 같은 영상 행까지 정리한 뒤 인덱스 생성
+    with ctx.transaction() as cursor:
+        if not ctx.has_index(cursor, 'idx_ads_video_id'):
+            stats['merged'] += merge_video_id_duplicates(cursor)
+            cursor.execute("CREATE UNIQUE INDEX idx_ads_video_id ON youtube_ads(video_id)")
+    return stats['filled'] + stats['merged']
+
+# _search_history_key 가 새 테이블에 직접 정의하는 컬럼 (나머지는 PRAGMA table_info 의 정의대로 옮김)
+SEARCH_HISTORY_KEY_COLUMNS = ('id', 'query', 'api_source', 'last_collected', 'total_found', 'success_count')
+
+def _column_definition(column: tuple) -> str:
+    """PRAGMA table_info 행 (cid, name, type, notnull, dflt_value, pk) → 컬럼 정의"""
+    _, name, declared_type, notnull, default, _ = column
+    definition = f'"{name}" {declared_type}'.rstrip()
+    if notnull:
+        definition += " NOT NULL"
+    if default is not None:
+        definition += f" DEFAULT {default}"
+    return definition
+
+def _search_history_key(ctx: MigrationContext) -> None:
+    """
+    search_history 의 query 단독 UNIQUE 를 (query, api_source) 복합 UNIQUE 로 재구성
+    
+    SQLite 는 컬럼 제약을 변경할 수 없으므로 테이블을 새로 만들어 복사한다.
+    기존 테이블에 있던 다른 컬럼(먼저 추가된 컬럼, 직접 추가한 컬럼)은 같은 정의로 옮기고 알린다.
+    """
+    with ctx.transaction() as cursor:
+        query_only_unique = False
+        for index in cursor.execute("PRAGMA index_list(search_history)").fetchall():
+            index_name, is_unique = index[1], index[2]
+            if not is_unique:
+                continue
+            columns = [row[2] for row in cursor.execute(f"PRAGMA index_info('{index_name}')").fetchall()]
+            if columns == ['query']:
+                query_only_unique = True
+                break
+        
+        if not query_only_unique:
+            return
+        
+        print("🔧 search_history 유니크 키를 (query, api_source) 로 변경 중...")
+        table_info = cursor.execute("PRAGMA table_info(search_history)").fetchall()
+        columns = [column[1] for column in table_info]
+        missing = [name for name in SEARCH_HISTORY_KEY_COLUMNS if name not in columns]
+        if missing:
+            raise RuntimeError(f"search_history 에 필요한 컬럼이 없습니다: {', '.join(missing)}")
+        extra = [column for column in table_info if column[1] not in SEARCH_HISTORY_KEY_COLUMNS]
+        if extra:
+            ctx.notes.append(f"search_history 추가 컬럼 유지: {', '.join(column[1] for column in extra)}")
+        
+        extra_definitions = ''.join(f",\n                {_column_definition(column)}" for column in extra)
+        cursor.execute(f"""
+            CREATE TABLE search_history_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                query TEXT NOT NULL,
+                api_source TEXT NOT NULL,
+                last_collected TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                total_found INTEGER DEFAULT 0,
+                success_count INTEGER DEFAULT 0{extra_definitions},
+                UNIQUE (query, api_source)
+            )
+        """)
+        column_list = ', '.join(f'"{name}"' for name in columns)
+        cursor.execute(f"""
+            INSERT INTO search_history_new ({column_list})
+            SELECT {column_list} FROM search_history
+        """)
+        cursor.execute("DROP TABLE search_history")
+        cursor.execute("ALTER TABLE search_history_new RENAME TO search_history")
+
+def _analysis_queue_lease(ctx: MigrationContext) -> int:
+    """analysis_queue 에 작업자 임대 컬럼 추가 및 큐 항목이 없는 대기 광고 등록"""
+    with ctx.transaction() as cursor:
+        columns = ctx.columns(cursor, 'analysis_queue')
+        for column, definition in (('worker_id', 'TEXT NULL'),
+                                   ('lease_expires_at', 'TIMESTAMP NULL'),
+                                   ('attempts', 'INTEGER DEFAULT 0')):
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE analysis_queue ADD COLUMN {column} {definition}")
+        
+        return enqueue_unqueued_pending(cursor)
+
+def _search_history_cursor(ctx: MigrationContext) -> None:
+    """search_history 에 페이지 토큰/결과 지문 컬럼 추가"""
+    with ctx.transaction() as cursor:
+        columns = ctx.columns(cursor, 'search_history')
+        for column in ('last_cursor', 'last_fingerprint'):
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE search_history ADD COLUMN {column} TEXT NULL")
+
+def _search_history_yield(ctx: MigrationContext) -> Optional[int]:
+    """
+    search_history 에 수율(EWMA) 컬럼 추가
+    
+    기존 행은 지금까지 쌓인 success_count 를 호출 한 번의 결과로 보지 않도록
+    현재 값을 기준점으로 둔다 (첫 표본은 마이그레이션 이후의 첫 수집).
+    """
+    with ctx.transaction() as cursor:
+        if 'yield_ewma' in ctx.columns(cursor, 'search_history'):
+            return None
+        cursor.execute("ALTER TABLE search_history ADD COLUMN yield_ewma REAL NULL")
+        cursor.execute("ALTER TABLE search_history ADD COLUMN yield_success_count INTEGER DEFAULT 0")
+        cursor.execute("ALTER TABLE search_history ADD COLUMN yield_sampled_at TIMESTAMP NULL")
+        cursor.execute("""
+            UPDATE search_history SET yield_success_count = success_count, yield_sampled_at = last_collected
+        """)
+        return cursor.rowcount
+
+def _ads_stats(ctx: MigrationContext) -> None:
+    """ads_stats 카운터 테이블/트리거 생성 (처음 만들 때 한 번만 전체 집계)"""
+    with ctx.transaction() as cursor:
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ads_stats'"
+        ).fetchone()
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ads_stats (
+                dimension TEXT NOT NULL,
+                key TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (dimension, key)
+            ) WITHOUT ROWID
+        """)
+        for trigger in ADS_STATS_TRIGGERS:
+            cursor.execute(trigger)
+        
+        if not exists:
+            rebuild_ads_stats(cursor)
+            print("🔧 통계 카운터 테이블 생성 (ads_stats)")
+
+def _drop_redundant_indexes(ctx: MigrationContext) -> None:
+    """
+    중복 인덱스 제거 (쓰기마다 갱신 비용만 들고 조회에는 쓰이지 않음)
+    
+    - idx_ads_url: url UNIQUE 제약의 자동 인덱스와 같음
+    - idx_queue_status: idx_queue_claim(status, priority DESC, created_at) 의 앞부분과 같음
+    """
+    with ctx.transaction() as cursor:
+        cursor.execute("DROP INDEX IF EXISTS idx_ads_url")
+        cursor.execute("DROP INDEX IF EXISTS idx_queue_status")
+
+def _ads_status_collected_index(ctx: MigrationContext) -> None:
+    """
+    (analysis_status, collected_at) 복합 인덱스
+    
+    대기 광고를 최근 수집 순으로 읽는 조회 (get_pending_analysis, Node 측 자동화 라우트) 가
+    정렬 없이 인덱스 범위만 읽는다. SQLite 는 인덱스를 나눠 만들 수 없으므로 한 트랜잭션으로 만든다
+    (다른 프로세스의 쓰기는 busy_timeout 안에서 대기).
+    """
+    with ctx.transaction() as cursor:
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_ads_status_collected
+            ON youtube_ads(analysis_status, collected_at)
+        """)
+
+def _reconcile_marker(ctx: MigrationContext) -> None:
+    """
+    기동 경로 정리 위치(reconcile_state) 테이블
+    
+    2, 4단계가 기존 행의 video_id 백필/큐 등록을 마쳤으므로 현재 마지막 id 를 정리 완료로 기록한다.
+    이후 init_database 는 이 id 이후에 들어온 행만 확인하므로 video_id 를 꺼낼 수 없는 행을
+    기동할 때마다 다시 훑지 않는다.
+    """
+    with ctx.transaction() as cursor:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS reconcile_state (
+                name TEXT PRIMARY KEY,
+                last_id INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+        """)
+        mark_reconciled(cursor, cursor.execute("SELECT COALESCE(MAX(id), 0) FROM youtube_ads").fetchone()[0])
+
+def _queue_settle_trigger(ctx: MigrationContext) -> int:
+    """
+    분석이 끝난 광고의 대기 큐 항목 정리 트리거 생성 및 기존 항목 정리
+    
+    Node 측 스크립트는 youtube_ads.analysis_status 만 바꾸므로 큐에는 대기 항목이 남아
+    작업자가 이미 분석된 광고를 다시 가져갔다.
+    """
+    with ctx.transaction() as cursor:
+        cursor.execute(QUEUE_SETTLE_TRIGGER)
+        cursor.execute("""
+            UPDATE analysis_queue
+            SET status = CASE WHEN (SELECT analysis_status FROM youtube_ads a WHERE a.id = youtube_ad_id) = 'completed'
+                              THEN 'completed' ELSE 'failed' END,
+                processed_at = CURRENT_TIMESTAMP
+            WHERE status = 'waiting'
+              AND youtube_ad_id IN (SELECT id FROM youtube_ads WHERE analysis_status IS NOT 'pending')
+        """)
+        if cursor.rowcount > 0:
+            print(f"🔧 이미 분석된 광고의 대기 큐 항목 {cursor.rowcount}개 정리")
+        return max(cursor.rowcount, 0)
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, 'base_tables', _base_tables),
+    Migration(2, 'youtube_ads_video_id', _youtube_ads_video_id),
+    Migration(3, 'search_history_query_source_key', _search_history_key),
+    Migration(4, 'analysis_queue_lease', _analysis_queue_lease),
+    Migration(5, 'search_history_cursor', _search_history_cursor),
+    Migration(6, 'search_history_yield', _search_history_yield),
+    Migration(7, 'ads_stats_counters', _ads_stats),
+    Migration(8, 'drop_redundant_indexes', _drop_redundant_indexes),
+    Migration(9, 'ads_status_collected_index', _ads_status_collected_index),
+    Migration(10, 'reconcile_marker', _reconcile_marker),
+    Migration(11, 'queue_settle_trigger', _queue_settle_trigger),
+]
+
+# 최신 스키마 버전 (PRAGMA user_version)
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+assert [m.version for m in MIGRATIONS] == list(range(1, SCHEMA_VERSION + 1)), "마이그레이션 번호는 1부터 연속이어야 합니다"
+
+class MigrationRunner:
+    """대기 중인 마이그레이션을 순서대로 적용"""
+    
+    def __init__(self, db_path: str, connections: SQLiteConnectionManager = None,
+                 batch_size: int = None, pause_seconds: float = None, verbose: bool = False):
+        """
+        Args:
+            db_path: 데이터베이스 파일 경로
+            connections: 이미 열린 연결 관리자 (YouTubeAdsDatabase 에서 호출할 때)
+            batch_size / pause_seconds: 백필 배치 설정 (MigrationContext 참고)
+            verbose: 단계별 소요 시간 출력
+        """
+        self.db_path = db_path
+        self._owns_connections = connections is None
+        self.connections = connections or SQLiteConnectionManager(db_path)
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+        self.verbose = verbose
+    
+    def current_version(self) -> int:
+        return self.connections.get().execute("PRAGMA user_version").fetchone()[0]
+    
+    def pending(self, target: int = None) -> List[Migration]:
+        """적용할 마이그레이션 (target 버전까지)"""
+        current = self.current_version()
+        target = SCHEMA_VERSION if target is None else target
+        return [m for m in MIGRATIONS if current < m.version <= target]
+    
+    def migrate(self, target: int = None) -> List[dict]:
+        """
+        target 버전까지 적용 (기본값: 최신)
+        
+        Returns:
+            [{'version': 2, 'name': '...', 'seconds': 0.12, 'rows': 1000, 'batches': 1, 'notes': []}, ...]
+        """
+        conn = self.connections.get()
+        results = []
+        for migration in self.pending(target):
+            ctx = MigrationContext(self.connections, self.batch_size, self.pause_seconds)
+            if self.verbose:
+                print(f"🔧 [{migration.version}] {migration.name} 적용 중...")
+            
+            started = time.perf_counter()
+            rows = migration.apply(ctx)
+            conn.execute(f"PRAGMA user_version = {migration.version}")
+            seconds = time.perf_counter() - started
+            
+            results.append({'version': migration.version, 'name': migration.name, 'seconds': seconds,
+                            'rows': rows, 'batches': ctx.batches, 'notes': ctx.notes})
+            if self.verbose:
+                detail = f", {rows:,}행" if rows else ""
+                detail += f", 배치 {ctx.batches}개" if ctx.batches else ""
+                print(f"   ✅ {seconds:.3f}s{detail}")
+                for note in ctx.notes:
+                    print(f"   ℹ️ {note}")
+        return results
+    
+    def dry_run(self, target: int = None) -> List[dict]:
+        """
+        DB 사본에 적용해 보고 결과만 반환 (원본은 변경하지 않음)
+        
+        사본은 SQLite 백업 API 로 만든 임시 파일이므로 원본 크기만큼 디스크를 쓴다.
+        """
+        workdir = tempfile.mkdtemp(prefix="migrations_dry_run_")
+        copy_path = os.path.join(workdir, os.path.basename(self.db_path) or "copy.db")
+        try:
+            started = time.perf_counter()
+            target_conn = sqlite3.connect(copy_path)
+            try:
+                self.connections.get().backup(target_conn)
+            finally:
+                target_conn.close()
+            if self.verbose:
+                print(f"📋 사본 생성: {time.perf_counter() - started:.3f}s ({copy_path})")
+            
+            copy = MigrationRunner(copy_path, batch_size=self.batch_size, pause_seconds=0,
+                                   verbose=self.verbose)
+            try:
+                return copy.migrate(target)
+            finally:
+                copy.close()
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    
+    def close(self):
+        if self._owns_connections:
+            self.connections.close_all()
+
+def main():
+    parser = argparse.ArgumentParser(description="youtube_ads.db 스키마 마이그레이션")
+    parser.add_argument('--db', default="youtube_ads.db", help="데이터베이스 파일 경로")
+    parser.add_argument('--status', action='store_true', help="현재 버전과 대기 중인 마이그레이션만 출력")
+    parser.add_argument('--dry-run', action='store_true', help="사본에 적용해 소요 시간만 확인")
+    parser.add_argument('--target', type=int, default=None, help=f"적용할 버전 (기본값: {SCHEMA_VERSION})")
+    parser.add_argument('--batch-size', type=int, default=None,
+                        help=f"백필 배치 크기 (기본값: {Config.MIGRATION_BATCH_SIZE})")
+    parser.add_argument('--pause', type=float, default=None,
+                        help=f"백필 배치 사이 대기 초 (기본값: {Config.MIGRATION_BATCH_PAUSE_SECONDS})")
+    args = parser.parse_args()
+    
+    if not os.path.exists(args.db) and (args.status or args.dry_run):
+        print(f"❌ 데이터베이스 파일이 없습니다: {args.db}")
+        return 1
+    
+    runner = MigrationRunner(args.db, batch_size=args.batch_size, pause_seconds=args.pause, verbose=True)
+    try:
+        current = runner.current_version()
+        pending = runner.pending(args.target)
+        print(f"📦 {args.db}: 스키마 버전 {current} (최신 {SCHEMA_VERSION})")
+        if args.target is not None and args.target < current:
+            print(f"❌ 이전 버전으로 되돌리는 마이그레이션은 지원하지 않습니다 (현재 {current}, 요청 {args.target})")
+            return 1
+        if not pending:
+            print("✅ 적용할 마이그레이션이 없습니다")
+            return 0
+        
+        for migration in pending:
+            print(f"   - [{migration.version}] {migration.name}")
+        if args.status:
+            return 0
+        
+        print("\n🧪 dry-run: 사본에 적용" if args.dry_run else "\n🚀 적용 시작")
+        started = time.perf_counter()
+        results = runner.dry_run(args.target) if args.dry_run else runner.migrate(args.target)
+        total = time.perf_counter() - started
+        print(f"\n⏱️ 마이그레이션 {len(results)}개, 합계 {sum(r['seconds'] for r in results):.3f}s (전체 {total:.3f}s)")
+        if args.dry_run:
+            print(f"   원본은 변경하지 않았습니다 (버전 {runner.current_version()})")
+        return 0
+    finally:
+        runner.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+분석 웹서비스 로컬 대역 서버 (WebServiceConnector 테스트용)
+
+엔드포인트:
+- GET  /api/health         → 200 OK
+- POST /api/analyze        → 광고 1건 (JSON)
+- POST /api/analyze/batch  → 광고 N건 (NDJSON 또는 JSON 배열, gzip 허용)
+                             응답: {"results": [{"id": 1, "status": "accepted"}, ...]}
+                             status: accepted(접수) / rejected(영구 거부) / error(일시 오류, 재시도 대상)
+- GET  /api/results        → 지금까지 접수된 광고 목록
+
+사용법:
+    python mock_analysis_server.py --port 8000 --error-rate 0.1 --reject-rate 0.05
+"""
+
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+class MockAnalysisState:
+    """접수된 광고와 응답 설정"""
+    
+    def __init__(self, error_rate: float = 0.0, reject_rate: float = 0.0, latency: float = 0.0):
+        self.error_rate = error_rate
+        self.reject_rate = reject_rate
+        self.latency = latency
+        self.received = {}
+        self.request_count = 0
+        self.lock = threading.Lock()
+    
+    def judge(self, ad: dict) -> dict:
+        """광고 1건의 처리 결과 결정"""
+        if 'id' not in ad or not ad.get('url'):
+            return {'id': ad.get('id'), 'status': 'rejected', 'error': 'id and url are required'}
+        
+        roll = random.random()
+        if roll < self.error_rate:
+            return {'id': ad['id'], 'status': 'error', 'error': 'temporary failure'}
+        if roll < self.error_rate + self.reject_rate:
+            return {'id': ad['id'], 'status': 'rejected', 'error': 'unsupported video'}
+        
+        with self.lock:
+            self.received[ad['id']] = ad
+        return {'id': ad['id'], 'status': 'accepted'}
+
+def make_handler(state: MockAnalysisState):
+    class Handler(BaseHTTPRequestHandler):
+        def _send_json(self, status: int, body):
+            data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        
+        def _read_body(self) -> bytes:
+            body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            if self.headers.get('Content-Encoding') == 'gzip':
+                body = gzip.decompress(body)
+            return body
+        
+        def _parse_batch(self, body: bytes) -> List[dict]:
+            if 'ndjson' in (self.headers.get('Content-Type') or ''):
+                return [json.loads(line) for line in body.decode('utf-8').splitlines() if line.strip()]
+            data = json.loads(body)
+            return data['ads'] if isinstance(data, dict) else data
+        
+        def do_GET(self):
+            if self.path == '/api/health':
+                self._send_json(200, {'status': 'ok'})
+            elif self.path == '/api/results':
+                with state.lock:
+                    self._send_json(200, list(state.received.values()))
+            else:
+                self._send_json(404, {'error': 'not found'})
+        
+        def do_POST(self):
+            with state.lock:
+                state.request_count += 1
+            if state.latency:
+                time.sleep(state.latency)
+            
+            try:
+                body = self._read_body()
+                if self.path == '/api/analyze':
+                    result = state.judge(json.loads(body))
+                    status = {'accepted': 202, 'rejected': 422}.get(result['status'], 503)
+                    self._send_json(status, result)
+                elif self.path == '/api/analyze/batch':
+                    ads = self._parse_batch(body)
+                    self._send_json(200, {'results': [state.judge(ad) for ad in ads]})
+                else:
+                    self._send_json(404, {'error': 'not found'})
+            except (ValueError, OSError) as e:
+                self._send_json(400, {'error': str(e)})
+        
+        def log_message(self, format, *args):
+            pass
+    
+    return Handler
+
+def start_server(port: int = 0, state: MockAnalysisState = None) -> ThreadingHTTPServer:
+    """
+    백그라운드 스레드에서 서버 시작
+    
+    Returns:
+        서버 객체 (server.server_port 로 실제 포트 확인, server.shutdown() 으로 종료)
+    """
+    state = state or MockAnalysisState()
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(state))
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="분석 웹서비스 로컬 대역 서버")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="일시 오류 비율 (0~1)")
+    parser.add_argument('--reject-rate', type=float, default=0.0, help="영구 거부 비율 (0~1)")
+    parser.add_argument('--latency', type=float, default=0.0, help="요청당 지연 시간 (초)")
+    args = parser.parse_args()
+    
+    state = MockAnalysisState(args.error_rate, args.reject_rate, args.latency)
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(state))
+    print(f"🧪 분석 웹서비스 대역 서버: http://127.0.0.1:{args.port}")
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⏹️ 서버 종료")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Apify API 로컬 대역 서버 (비동기 실행 / 동기 실행 테스트용)
+
+엔드포인트 (기본 경로 /v2, APIFY_BASE_URL=http://127.0.0.1:<port>/v2):
+- POST /v2/acts/{actor}/runs                          → 실행 시작 (run_seconds 후 완료)
+- GET  /v2/acts/{actor}/runs?desc=1&limit=N           → 최근 실행 목록
+- GET  /v2/actor-runs/{id}                            → 실행 상태
+- POST /v2/actor-runs/{id}/abort                      → 실행 중단
+- GET  /v2/datasets/{id}/items?offset=&limit=         → 데이터셋 항목 (JSON 배열, format=jsonl 이면 JSON Lines,
+                                                        fields=a,b 면 해당 필드만)
+- POST /v2/acts/{actor}/run-sync-get-dataset-items    → 실행이 끝날 때까지 기다렸다가 항목 반환 (fields 지원)
+
+사용법:
+    python mock_apify_server.py --port 8100 --run-seconds 5 --items 50 --fail-rate 0.1
+"""
+
+import argparse
+import json
+import random
+import string
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+VIDEO_ID_CHARS = string.ascii_letters + string.digits + '-_'
+
+class MockApifyState:
+    """실행/데이터셋 상태와 응답 설정"""
+    
+    def __init__(self, run_seconds: float = 1.0, items_per_run: int = 20, fail_rate: float = 0.0):
+        """
+        Args:
+            run_seconds: 실행 1건의 평균 소요 시간 (실행마다 0.5~1.5배)
+            items_per_run: 실행 1건이 만드는 데이터셋 항목 수
+            fail_rate: FAILED 로 끝나는 실행 비율 (0~1, 항목은 절반만 생성)
+        """
+        self.run_seconds = run_seconds
+        self.items_per_run = items_per_run
+        self.fail_rate = fail_rate
+        self.runs = {}
+        self.datasets = {}
+        self.request_count = 0
+        self.lock = threading.Lock()
+    
+    def _make_items(self, count: int) -> list:
+        items = []
+        for _ in range(count):
+            video_id = ''.join(random.choice(VIDEO_ID_CHARS) for _ in range(11))
+            items.append({
+                'video_id': video_id,
+                'advertiser_id': f"AR{random.randint(10 ** 9, 10 ** 10)}",
+                'youtubeData': {'title': f"Mock ad {video_id}", 'description': 'x' * 500},
+                'youtubeStatistics': {'viewCount': str(random.randint(0, 10 ** 7))}
+            })
+        return items
+    
+    def start_run(self, run_input: dict) -> dict:
+        run_id = uuid.uuid4().hex[:17]
+        failed = random.random() < self.fail_rate
+        count = min(self.items_per_run, int(run_input.get('max_ads') or self.items_per_run))
+        run = {
+            'id': run_id,
+            'status': 'RUNNING',
+            'defaultDatasetId': uuid.uuid4().hex[:17],
+            'startedAt': time.time(),
+            'input': run_input,
+            '_finish_at': time.time() + self.run_seconds * random.uniform(0.5, 1.5),
+            '_final_status': 'FAILED' if failed else 'SUCCEEDED',
+            '_items': self._make_items(count // 2 if failed else count)
+        }
+        with self.lock:
+            self.runs[run_id] = run
+            self.datasets[run['defaultDatasetId']] = []
+        return self.public(run)
+    
+    def refresh(self, run: dict):
+        """완료 시각이 지난 실행의 상태/데이터셋 갱신 (lock 안에서 호출)"""
+        if run['status'] == 'RUNNING' and time.time() >= run['_finish_at']:
+            run['status'] = run['_final_status']
+            self.datasets[run['defaultDatasetId']] = run['_items']
+    
+    @staticmethod
+    def public(run: dict) -> dict:
+        return {key: value for key, value in run.items() if not key.startswith('_') and key != 'input'}
+
+def make_handler(state: MockApifyState):
+    class Handler(BaseHTTPRequestHandler):
+        def _send_json(self, status: int, body):
+            data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        
+        def _send_items(self, items: list, query: dict):
+            if query.get('fields'):
+                fields = query['fields'].split(',')
+                items = [{key: item[key] for key in fields if key in item} for item in items]
+            if query.get('format') != 'jsonl':
+                self._send_json(200, items)
+                return
+            data = ''.join(json.dumps(item, ensure_ascii=False) + '\n' for item in items).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/jsonl')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        
+        def _route(self):
+            parts = urlsplit(self.path)
+            query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+            segments = [segment for segment in parts.path.split('/') if segment]
+            if segments[:1] == ['v2']:
+                segments = segments[1:]
+            return segments, query
+        
+        def _authorized(self) -> bool:
+            if not (self.headers.get('Authorization') or '').startswith('Bearer '):
+                self._send_json(401, {'error': {'type': 'token-not-provided'}})
+                return False
+            with state.lock:
+                state.request_count += 1
+            return True
+        
+        def do_GET(self):
+            if not self._authorized():
+                return
+            segments, query = self._route()
+            
+            with state.lock:
+                for run in state.runs.values():
+                    state.refresh(run)
+                
+                if len(segments) == 3 and segments[0] == 'acts' and segments[2] == 'runs':
+                    runs = sorted(state.runs.values(), key=lambda run: run['startedAt'],
+                                  reverse=query.get('desc') in ('1', 'true'))
+                    limit = int(query.get('limit', 1000))
+                    self._send_json(200, {'data': {'total': len(runs),
+                                                   'items': [state.public(run) for run in runs[:limit]]}})
+                elif len(segments) == 2 and segments[0] == 'actor-runs' and segments[1] in state.runs:
+                    self._send_json(200, {'data': state.public(state.runs[segments[1]])})
+                elif len(segments) == 3 and segments[0] == 'datasets' and segments[1] in state.datasets:
+                    items = state.datasets[segments[1]]
+                    offset = int(query.get('offset', 0))
+                    limit = int(query.get('limit', len(items)))
+                    self._send_items(items[offset:offset + limit], query)
+                else:
+                    self._send_json(404, {'error': {'type': 'record-not-found'}})
+        
+        def do_POST(self):
+            if not self._authorized():
+                return
+            segments, query = self._route()
+            try:
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                run_input = json.loads(body) if body else {}
+            except ValueError as e:
+                self._send_json(400, {'error': {'type': 'invalid-input', 'message': str(e)}})
+                return
+            
+            if len(segments) == 3 and segments[0] == 'acts' and segments[2] == 'runs':
+                self._send_json(201, {'data': state.start_run(run_input)})
+            elif len(segments) == 3 and segments[0] == 'acts' and segments[2] == 'run-sync-get-dataset-items':
+                run = state.start_run(run_input)
+                with state.lock:
+                    finish_at = state.runs[run['id']]['_finish_at']
+                time.sleep(max(0.0, finish_at - time.time()))
+                with state.lock:
+                    run = state.runs[run['id']]
+                    state.refresh(run)
+                    self._send_items(state.datasets[run['defaultDatasetId']], query)
+            elif len(segments) == 3 and segments[0] == 'actor-runs' and segments[2] == 'abort':
+                with state.lock:
+                    run = state.runs.get(segments[1])
+                    if run is None:
+                        self._send_json(404, {'error': {'type': 'record-not-found'}})
+                        return
+                    if run['status'] == 'RUNNING':
+                        run['status'] = 'ABORTED'
+                    self._send_json(200, {'data': state.public(run)})
+            else:
+                self._send_json(404, {'error': {'type': 'record-not-found'}})
+        
+        def log_message(self, format, *args):
+            pass
+    
+    return Handler
+
+def start_server(port: int = 0, state: MockApifyState = None) -> ThreadingHTTPServer:
+    """
+    백그라운드 스레드에서 서버 시작
+    
+    Returns:
+        서버 객체 (server.server_port 로 실제 포트 확인, server.shutdown() 으로 종료)
+    """
+    state = state or MockApifyState()
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(state))
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Apify API 로컬 대역 서버")
+    parser.add_argument('--port', type=int, default=8100)
+    parser.add_argument('--run-seconds', type=float, default=5.0, help="실행 1건의 평균 소요 시간 (초)")
+    parser.add_argument('--items', type=int, default=50, help="실행 1건의 데이터셋 항목 수")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="FAILED 로 끝나는 실행 비율 (0~1)")
+    args = parser.parse_args()
+    
+    state = MockApifyState(args.run_seconds, args.items, args.fail_rate)
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(state))
+    print(f"🧪 Apify 대역 서버: http://127.0.0.1:{args.port}/v2 (APIFY_BASE_URL 로 지정)")
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⏹️ 서버 종료")
+
+if __name__ == "__main__":
+    main()
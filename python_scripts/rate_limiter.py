@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+API 소스별 요청 속도 제한 (토큰 버킷)
+- 초당 요청 수 + 버스트 허용량
+- 동기(스레드)/비동기(asyncio) 코드 모두에서 사용 가능
+- src/lib/limiter/bottleneck.ts 의 Python 대응 모듈
+"""
+
+import threading
+import time
+from typing import Dict, Tuple
+
+from config import Config
+
+class TokenBucket:
+    """토큰 버킷 속도 제한기 (스레드 안전)"""
+    
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Args:
+            rate: 초당 보충되는 토큰 수 (= 초당 허용 요청 수)
+            burst: 버킷 최대 크기 (연속 허용 요청 수)
+        """
+        if rate <= 0:
+            raise ValueError("rate 는 0보다 커야 합니다")
+        
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+    
+    def _reserve(self, tokens: float) -> float:
+        """토큰을 차감하고 대기해야 할 시간(초)을 반환 (0 이면 즉시 사용 가능)"""
+        with self._lock:
+            self._refill()
+            
+            # 부족분은 미리 차감해 두고 (음수 잔고) 대기 시간만 돌려준다
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+    
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        토큰 획득 (필요하면 대기)
+        
+        Returns:
+            실제 대기한 시간 (초)
+        """
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+    
+    async def acquire_async(self, tokens: float = 1) -> float:
+        """acquire 의 asyncio 버전 (이벤트 루프를 막지 않음)"""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            import asyncio  # 동기 코드만 쓰는 프로세스는 asyncio 를 로드하지 않음
+            await asyncio.sleep(wait)
+        return wait
+    
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """대기 없이 토큰 획득 시도"""
+        with self._lock:
+            self._refill()
+            
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+def _default_limit() -> Tuple[float, int]:
+    """Config.RATE_LIMITS 에 없는 소스는 Config.REQUEST_DELAY 간격으로 제한"""
+    delay = Config.REQUEST_DELAY if Config.REQUEST_DELAY > 0 else 1.0
+    return 1.0 / delay, 1
+
+def get_limiter(name: str) -> TokenBucket:
+    """
+    API 소스별 공용 속도 제한기 반환
+    
+    Args:
+        name: 'Apify', 'SerpAPI', 'WebService' 등 (Config.RATE_LIMITS 키)
+    """
+    limiter = _limiters.get(name)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(name)
+            if limiter is None:
+                rate, burst = Config.RATE_LIMITS.get(name) or _default_limit()
+                limiter = TokenBucket(rate, burst)
+                _limiters[name] = limiter
+    return limiter
+
+def configure_limiter(name: str, rate: float, burst: int = 1) -> TokenBucket:
+    """API 소스의 속도 제한 재설정 (운영 중 조정용)"""
+    with _limiters_lock:
+        limiter = TokenBucket(rate, burst)
+        _limiters[name] = limiter
+        return limiter
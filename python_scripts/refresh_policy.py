@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+적응형 재수집 간격
+- (검색어, API 소스) 별 호출당 신규 광고 수를 지수가중이동평균(EWMA) 으로 추적 (search_history.yield_ewma)
+- 간격 = 기본 간격 × 목표 수율 / 수율, REFRESH_HOURS_BOUNDS 범위로 제한
+  새 광고가 잘 나오는 검색어는 자주, 거의 나오지 않는 검색어("infomercial" 등)는 드물게 호출
+- API 소스별 하루 호출 예산(DAILY_CALL_BUDGET): 간격대로면 예산을 넘을 때는 모든 간격을 같은 비율로 늘리고,
+  예산을 다 쓰면 다음 날(UTC)까지 보류. 남은 예산은 수율이 높은 검색어부터 씀
+
+수율 표본은 수집을 마친 뒤 search_history 의 success_count / last_collected 변화로 계산하므로
+(YouTubeAdsDatabase.sample_yields) 호출이 실패한 검색어는 수율 0 으로 잘못 집계되지 않는다.
+일일 호출 수도 같은 표본에서 더하므로 예산은 실제로 끝난 호출만큼만 줄어든다.
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+
+def next_budget_reset() -> float:
+    """일일 호출 예산이 초기화되는 다음 UTC 자정 (epoch 초)"""
+    now = datetime.now(timezone.utc)
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return midnight.timestamp()
+
+class RefreshPolicy:
+    """수율 기반 재수집 간격과 일일 호출 예산"""
+    
+    def __init__(self, db, alpha: float = None):
+        """
+        Args:
+            db: YouTubeAdsDatabase
+            alpha: 새 표본의 가중치 (기본값: Config.REFRESH_EWMA_ALPHA)
+        """
+        self.db = db
+        self.alpha = alpha if alpha is not None else Config.REFRESH_EWMA_ALPHA
+    
+    def refresh(self, api_source: str) -> int:
+        """지난 표본 이후의 수집 결과를 수율에 반영 (반영한 호출 수)"""
+        return self.db.sample_yields(api_source, self.alpha)
+    
+    def interval_hours(self, api_source: str, yield_ewma: Optional[float]) -> float:
+        """수율에 따른 재수집 간격 (시간, 예산 반영 전) - 아직 표본이 없으면 기본 간격"""
+        base = Config.COLLECT_INTERVAL_HOURS[api_source]
+        low, high = Config.REFRESH_HOURS_BOUNDS.get(api_source, (base, base))
+        if yield_ewma is None:
+            return min(max(base, low), high)
+        if yield_ewma <= 0:
+            return high
+        hours = base * Config.REFRESH_TARGET_NEW_PER_CALL[api_source] / yield_ewma
+        return min(max(hours, low), high)
+    
+    def budget_left(self, api_source: str) -> Optional[int]:
+        """오늘 남은 호출 수 (예산이 없으면 None)"""
+        budget = Config.DAILY_CALL_BUDGET.get(api_source)
+        if budget is None:
+            return None
+        return max(0, budget - self.db.calls_today(api_source))
+    
+    def _intervals(self, search_queries: List[str], api_source: str,
+                   state: Dict[str, Tuple[datetime, Optional[float]]]) -> Dict[str, float]:
+        hours = {query: self.interval_hours(api_source, state[query][1] if query in state else None)
+                 for query in search_queries}
+        
+        # 간격대로 호출하면 하루 예산을 넘는 경우 모든 간격을 같은 비율로 늘림 (수율 순서는 유지)
+        budget = Config.DAILY_CALL_BUDGET.get(api_source)
+        demand = sum(24 / h for h in hours.values())
+        if budget and demand > budget:
+            scale = demand / budget
+            hours = {query: h * scale for query, h in hours.items()}
+        return hours
+    
+    def intervals(self, search_queries: List[str], api_source: str) -> Dict[str, float]:
+        """검색어별 재수집 간격 (시간, 일일 예산 반영)"""
+        queries = list(dict.fromkeys(search_queries))
+        return self._intervals(queries, api_source, self.db.refresh_state_many(queries, api_source))
+    
+    def next_due_many(self, search_queries: List[str], api_source: str) -> Dict[str, float]:
+        """
+        검색어별 다음 수집 시각 (epoch 초, 수집 기록이 없으면 지금)
+        
+        목록 전체로 예산 비율을 계산하므로 API 소스의 검색어를 한 번에 넘긴다.
+        """
+        queries = list(dict.fromkeys(search_queries))
+        self.refresh(api_source)
+        state = self.db.refresh_state_many(queries, api_source)
+        hours = self._intervals(queries, api_source, state)
+        
+        now = time.time()
+        due = {}
+        for query in queries:
+            if query not in state:
+                due[query] = now
+                continue
+            last_collected = state[query][0].replace(tzinfo=timezone.utc).timestamp()
+            due[query] = last_collected + hours[query] * 3600
+        return due
+    
+    def within_budget(self, search_queries: List[str], api_source: str) -> List[str]:
+        """
+        오늘 남은 예산 안에서 호출할 검색어 (아직 표본이 없는 검색어, 수율이 높은 검색어 순)
+        
+        고르기만 하고 예산을 미리 잡아 두지 않는다. 호출 수는 호출이 끝나 last_collected 가
+        바뀐 검색어만 sample_yields 가 더하므로, 실패한 수집은 예산을 쓰지 않는다.
+        
+        Returns:
+            호출할 검색어 (예산이 충분하면 입력 순서 그대로)
+        """
+        queries = list(dict.fromkeys(search_queries))
+        left = self.budget_left(api_source)
+        if left is None or left >= len(queries):
+            return queries
+        
+        state = self.db.refresh_state_many(queries, api_source)
+        
+        def priority(query: str) -> float:
+            yield_ewma = state[query][1] if query in state else None
+            return float('inf') if yield_ewma is None else yield_ewma
+        
+        chosen = set(sorted(queries, key=priority, reverse=True)[:left])
+        return [query for query in queries if query in chosen]
+    
+    def due(self, search_queries: List[str], api_source: str) -> Dict[str, bool]:
+        """재수집 간격이 지나고 오늘 예산 안에 드는 검색어 {'검색어': True / False}"""
+        queries = list(dict.fromkeys(search_queries))
+        next_due = self.next_due_many(queries, api_source)
+        now = time.time()
+        allowed = set(self.within_budget([query for query in queries if next_due[query] <= now], api_source))
+        return {query: query in allowed for query in queries}
+    
+    def get_stats(self) -> Dict[str, dict]:
+        """API 소스별 오늘 호출 수 / 예산"""
+        return {
+            api_source: {
+                'calls_today': self.db.calls_today(api_source),
+                'budget': Config.DAILY_CALL_BUDGET.get(api_source)
+            }
+            for api_source in Config.COLLECT_INTERVAL_HOURS
+        }
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+API 소스 응답 캐시 (디스크, 내용 주소 기반)
+- 키: API 소스 + 정규화된 요청 (메서드, URL, 파라미터, 본문, 검색어) 의 SHA-256, 인증 값은 제외
+- 저장: 별도 SQLite 파일에 zlib 압축 본문
+- TTL: API 소스별 적응형 재수집 간격의 하한 (Config.REFRESH_HOURS_BOUNDS)
+  → 재수집 차례가 된 호출은 항상 실제 API 에 도달 (수율 표본에 캐시 재생이 섞이지 않음)
+- 크기 상한을 넘으면 가장 오래 사용하지 않은 항목부터 제거 (LRU)
+- 모드: off (사용 안 함) / on (캐시 우선, 없으면 호출 후 저장) / replay (캐시만 사용, 없으면 오류)
+- 스트리밍 응답 (stream=True) 은 읽는 대로 압축해 임시 파일에 쌓았다가 끝까지 읽으면 저장
+  (본문 전체를 메모리에 올리지 않음)
+
+수집 사이클이 중간에 죽고 다시 시작되어도 이미 비용을 낸 호출은 캐시에서 재사용하고,
+replay 모드로 저장된 응답만으로 재실행/테스트할 수 있다.
+
+requests 는 캐시 미스 오류/HTTP 오류를 만들 때만 import 한다 (CacheMissError 도 처음 참조할 때 생성).
+"""
+
+import hashlib
+import json
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from functools import lru_cache
+from typing import Callable, Dict, Optional
+
+from config import Config
+from db_connection import SQLiteConnectionManager
+
+CACHE_MODES = ('off', 'on', 'replay')
+
+# 키에서 제외할 인증 관련 파라미터/헤더
+SECRET_KEYS = {'api_key', 'token', 'authorization'}
+
+# 스트리밍 응답의 압축 본문을 메모리에 두는 최대 크기 (넘으면 임시 파일로)
+SPOOL_MEMORY_BYTES = 1024 * 1024
+
+# Connection.blobopen 은 Python 3.11 이상 (이전 버전은 압축 본문을 한 번에 읽어 저장)
+HAS_BLOBOPEN = hasattr(sqlite3.Connection, 'blobopen')
+
+@lru_cache(maxsize=None)
+def _cache_miss_error() -> type:
+    import requests
+    
+    class CacheMissError(requests.exceptions.RequestException):
+        """replay 모드에서 캐시에 없는 요청"""
+    
+    CacheMissError.__module__ = __name__
+    return CacheMissError
+
+def __getattr__(name: str):
+    # from response_cache import CacheMissError 호환 (requests.exceptions.RequestException 하위 클래스)
+    if name == 'CacheMissError':
+        return _cache_miss_error()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+class CachedResponse:
+    """requests.Response 중 수집기가 사용하는 부분만 제공하는 응답 객체"""
+    
+    def __init__(self, status_code: int, content: bytes, from_cache: bool = False):
+        self.status_code = status_code
+        self.content = content
+        self.from_cache = from_cache
+    
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+    
+    def json(self):
+        return json.loads(self.content)
+    
+    def iter_content(self, chunk_size: int = 1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+    
+    def close(self):
+        pass
+    
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.exceptions.HTTPError(f"HTTP {self.status_code}", response=None)
+
+class _TeeResponse:
+    """스트리밍 응답을 넘겨주면서 본문을 압축해 임시 파일에 쌓고, 끝까지 읽으면 캐시에 저장"""
+    
+    def __init__(self, response, store: Callable[[int, tempfile.SpooledTemporaryFile, int], None]):
+        self._response = response
+        self._store = store
+        self._spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+        self._compressor = zlib.compressobj()
+        self._size = 0
+    
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+    
+    def _write(self, data: bytes):
+        if data:
+            self._spool.write(data)
+            self._size += len(data)
+    
+    def iter_content(self, chunk_size: int = 1):
+        for chunk in self._response.iter_content(chunk_size):
+            self._write(self._compressor.compress(chunk))
+            yield chunk
+        self._write(self._compressor.flush())
+        self._spool.seek(0)
+        self._store(self._response.status_code, self._spool, self._size)
+    
+    def close(self):
+        self._spool.close()
+        self._response.close()
+
+def _strip_secrets(value):
+    if isinstance(value, dict):
+        return {k: _strip_secrets(v) for k, v in value.items() if str(k).lower() not in SECRET_KEYS}
+    return value
+
+def cache_key(provider: str, method: str, url: str, params: dict = None, body=None, context: str = None) -> str:
+    """정규화된 요청의 SHA-256 (파라미터 순서/인증 값과 무관)"""
+    normalized = json.dumps({
+        'provider': provider,
+        'method': method.upper(),
+        'url': url.rstrip('/'),
+        'params': _strip_secrets(params or {}),
+        'body': _strip_secrets(body),
+        'context': context
+    }, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+def default_ttl_seconds() -> Dict[str, float]:
+    """
+    API 소스별 기본 TTL (초) - 재수집 간격의 하한
+    
+    적응형 간격은 이 값보다 짧아지지 않으므로 지난 호출의 응답은 다음 호출 차례 전에 만료된다.
+    """
+    return {
+        provider: Config.REFRESH_HOURS_BOUNDS.get(provider, (hours, hours))[0] * 3600
+        for provider, hours in Config.COLLECT_INTERVAL_HOURS.items()
+    }
+
+class ResponseCache:
+    """API 소스 응답 디스크 캐시 (스레드 안전)"""
+    
+    def __init__(self, path: str = None, mode: str = None, max_bytes: int = None,
+                 ttl_seconds: Dict[str, float] = None):
+        """
+        Args:
+            path: 캐시 SQLite 파일 경로 (기본값: Config.RESPONSE_CACHE_PATH)
+            mode: 'off' / 'on' / 'replay' (기본값: Config.RESPONSE_CACHE_MODE)
+            max_bytes: 압축 본문 총 크기 상한 (기본값: Config.RESPONSE_CACHE_MAX_BYTES)
+            ttl_seconds: API 소스별 TTL (기본값: default_ttl_seconds())
+        """
+        self.path = path or Config.RESPONSE_CACHE_PATH
+        self.mode = mode or Config.RESPONSE_CACHE_MODE
+        if self.mode not in CACHE_MODES:
+            raise ValueError(f"지원하지 않는 캐시 모드: {self.mode} ({', '.join(CACHE_MODES)})")
+        self.max_bytes = max_bytes or Config.RESPONSE_CACHE_MAX_BYTES
+        self.ttl_seconds = ttl_seconds or default_ttl_seconds()
+        
+        self._connections = SQLiteConnectionManager(self.path)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        
+        with self._connections.transaction() as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    provider TEXT NOT NULL,
+                    status_code INTEGER NOT NULL,
+                    body BLOB NOT NULL,        -- zlib 압축
+                    size INTEGER NOT NULL,     -- 압축 후 크기
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON response_cache(accessed_at)")
+    
+    @property
+    def enabled(self) -> bool:
+        return self.mode != 'off'
+    
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """만료되지 않은 캐시 응답 (없으면 None)"""
+        now = time.time()
+        conn = self._connections.get()
+        row = conn.execute(
+            "SELECT status_code, body FROM response_cache WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        if row is None:
+            return None
+        
+        with self._connections.transaction() as cursor:
+            cursor.execute("UPDATE response_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return CachedResponse(row[0], zlib.decompress(row[1]), from_cache=True)
+    
+    def put(self, key: str, provider: str, status_code: int, content: bytes):
+        """응답 저장 후 크기 상한 초과분 제거"""
+        now = time.time()
+        body = zlib.compress(content)
+        ttl = self.ttl_seconds.get(provider, Config.RESPONSE_CACHE_DEFAULT_TTL)
+        
+        with self._connections.transaction(immediate=True) as cursor:
+            cursor.execute("""
+                INSERT OR REPLACE INTO response_cache
+                    (key, provider, status_code, body, size, created_at, accessed_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (key, provider, status_code, body, len(body), now, now, now + ttl))
+            self._evict(cursor, now)
+        
+        with self._lock:
+            self.stores += 1
+    
+    def put_compressed(self, key: str, provider: str, status_code: int, body, size: int):
+        """
+        이미 zlib 압축된 본문(파일 객체)을 저장 - 스트리밍 응답용
+        
+        빈 BLOB 을 크기만큼 만든 뒤 나눠 써서 본문 전체를 한 번에 읽지 않는다
+        (blobopen 이 없는 Python 3.10 이하는 압축 본문을 읽어 한 번에 저장).
+        """
+        now = time.time()
+        ttl = self.ttl_seconds.get(provider, Config.RESPONSE_CACHE_DEFAULT_TTL)
+        
+        body_sql, body_value = ('zeroblob(?)', size) if HAS_BLOBOPEN else ('?', body.read())
+        
+        with self._connections.transaction(immediate=True) as cursor:
+            cursor.execute(f"""
+                INSERT OR REPLACE INTO response_cache
+                    (key, provider, status_code, body, size, created_at, accessed_at, expires_at)
+                VALUES (?, ?, ?, {body_sql}, ?, ?, ?, ?)
+            """, (key, provider, status_code, body_value, size, now, now, now + ttl))
+            if HAS_BLOBOPEN:
+                with cursor.connection.blobopen('response_cache', 'body', cursor.lastrowid) as blob:
+                    shutil.copyfileobj(body, blob)
+            self._evict(cursor, now)
+        
+        with self._lock:
+            self.stores += 1
+    
+    def _evict(self, cursor, now: float):
+        cursor.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+        removed = cursor.rowcount
+        
+        total = cursor.execute("SELECT COALESCE(SUM(size), 0) FROM response_cache").fetchone()[0]
+        if total > self.max_bytes:
+            # 가장 오래 사용하지 않은 항목부터 누적 크기가 초과분을 넘을 때까지 제거
+            excess = total - self.max_bytes
+            freed = 0
+            victims = []
+            for key, size in cursor.execute("SELECT key, size FROM response_cache ORDER BY accessed_at"):
+                victims.append((key,))
+                freed += size
+                if freed >= excess:
+                    break
+            cursor.executemany("DELETE FROM response_cache WHERE key = ?", victims)
+            removed += len(victims)
+        
+        if removed:
+            with self._lock:
+                self.evictions += removed
+    
+    def fetch(self, provider: str, method: str, url: str, send: Callable[[], 'requests.Response'],
+              params: dict = None, body=None, context: str = None, stream: bool = False):
+        """
+        캐시를 거쳐 요청
+        
+        Args:
+            send: 캐시에 없을 때 실제 요청을 보내는 함수
+            params / body / context: 키 계산용 요청 내용 (context 는 검색어 등 추가 구분 값)
+            stream: send() 가 스트리밍 응답을 반환하는 경우 - iter_content 로 끝까지 읽었을 때만 저장
+        
+        Returns:
+            CachedResponse (캐시 적중) 또는 send() 의 응답
+        
+        Raises:
+            CacheMissError: replay 모드에서 캐시에 없는 경우
+        """
+        if self.mode == 'off':
+            return send()
+        
+        key = cache_key(provider, method, url, params, body, context)
+        cached = self.get(key)
+        with self._lock:
+            if cached is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if cached is not None:
+            return cached
+        
+        if self.mode == 'replay':
+            raise _cache_miss_error()(f"캐시에 없는 {provider} 요청 (replay 모드)")
+        
+        response = send()
+        if not 200 <= response.status_code < 300:
+            return response
+        if stream:
+            return _TeeResponse(response, lambda status_code, spool, size:
+                                self.put_compressed(key, provider, status_code, spool, size))
+        self.put(key, provider, response.status_code, response.content)
+        return response
+    
+    def stats(self) -> Dict:
+        """
+        캐시 상태
+        
+        Returns:
+            {'mode': 'on', 'entries': 42, 'bytes': 183220, 'hits': 3, 'misses': 12, 'stores': 12, 'evictions': 0}
+        """
+        entries, size = self._connections.get().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM response_cache"
+        ).fetchone()
+        with self._lock:
+            return {
+                'mode': self.mode,
+                'entries': entries,
+                'bytes': size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stores': self.stores,
+                'evictions': self.evictions
+            }
+    
+    def discard(self, key: str):
+        """항목 1개 삭제 (더 이상 재사용하면 안 되는 응답)"""
+        with self._connections.transaction() as cursor:
+            cursor.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+    
+    def clear(self):
+        """캐시 전체 삭제"""
+        with self._connections.transaction() as cursor:
+            cursor.execute("DELETE FROM response_cache")
+    
+    def close(self):
+        self._connections.close_all()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+이미 수집된 영상 사전 필터
+- DB 의 video_id 로 Bloom 필터를 채워 두고, 확실히 새 영상만 DB 쓰기로 보냄
+- Bloom 양성(이미 있을 수 있음)은 인덱스 조회로 확인하므로 신규 광고를 잘못 버리지 않음
+- 메모리 사용량 / 오탐률 보고
+"""
+
+import hashlib
+import math
+from typing import Dict, Iterable
+
+from ad_records import AdBatch
+from config import Config
+
+class BloomFilter:
+    """비트 배열 기반 Bloom 필터 (double hashing)"""
+    
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        Args:
+            capacity: 예상 최대 원소 수
+            error_rate: capacity 에 도달했을 때의 목표 오탐률
+        """
+        self.capacity = max(1, int(capacity))
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / self.capacity * math.log(2))))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+    
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+    
+    def add(self, key: str):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+    
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+    
+    @property
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+    
+    def estimated_false_positive_rate(self) -> float:
+        """현재 원소 수 기준 이론적 오탐률"""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+class SeenVideoFilter:
+    """YouTubeAdsCollectorDB 용 기존 영상 사전 필터 (단일 스레드에서 사용)"""
+    
+    def __init__(self, db, error_rate: float = None, min_capacity: int = None):
+        """
+        Args:
+            db: YouTubeAdsDatabase
+            error_rate: Bloom 필터 목표 오탐률 (기본값: Config.SEEN_FILTER_ERROR_RATE)
+            min_capacity: 최소 용량 (기본값: Config.SEEN_FILTER_MIN_CAPACITY)
+        """
+        self.db = db
+        self.error_rate = error_rate or Config.SEEN_FILTER_ERROR_RATE
+        self.min_capacity = min_capacity or Config.SEEN_FILTER_MIN_CAPACITY
+        self.bloom = BloomFilter(self.min_capacity, self.error_rate)
+        
+        self.checked = 0           # 필터를 거친 광고 수
+        self.dropped = 0           # DB 쓰기 전에 제외된 광고 수
+        self.bloom_positives = 0   # Bloom 이 '있을 수 있음' 으로 판단한 수
+        self.false_positives = 0   # 그중 실제로는 DB 에 없던 수
+    
+    def warm(self) -> int:
+        """
+        DB 의 video_id 전체로 필터 재구성 (용량은 현재 행 수의 2배)
+        
+        Returns:
+            적재된 video ID 개수
+        """
+        total = self.db.count_video_ids()
+        self.bloom = BloomFilter(max(self.min_capacity, total * 2), self.error_rate)
+        for video_id in self.db.iter_video_ids():
+            self.bloom.add(video_id)
+        return self.bloom.count
+    
+    def add(self, video_ids: Iterable[str]):
+        """DB 에 저장된 video ID 반영 (용량을 넘으면 DB 에서 다시 적재)"""
+        for video_id in video_ids:
+            self.bloom.add(video_id)
+        if self.bloom.count > self.bloom.capacity:
+            self.warm()
+    
+    def filter_new(self, ads: list) -> list:
+        """
+        이미 DB 에 있는 영상을 제외한 광고 목록 반환
+        
+        video_id 가 없는 광고는 그대로 통과시킨다 (DB 의 URL 유니크 제약으로 처리).
+        AdBatch 를 넘기면 AdBatch 를 반환한다.
+        """
+        video_ids = ads.video_ids if isinstance(ads, AdBatch) else [ad.video_id for ad in ads]
+        maybe_seen = [video_id for video_id in video_ids if video_id and video_id in self.bloom]
+        self.checked += len(ads)
+        self.bloom_positives += len(maybe_seen)
+        if not maybe_seen:
+            return ads if isinstance(ads, AdBatch) else list(ads)
+        
+        existing = self.db.existing_video_ids(maybe_seen)
+        self.false_positives += len(set(maybe_seen) - existing)
+        
+        if isinstance(ads, AdBatch):
+            fresh = ads.exclude_video_ids(existing)
+        else:
+            fresh = [ad for ad in ads if not ad.video_id or ad.video_id not in existing]
+        self.dropped += len(ads) - len(fresh)
+        return fresh
+    
+    def stats(self) -> Dict[str, float]:
+        """
+        필터 상태
+        
+        Returns:
+            {'items': 120000, 'capacity': 240000, 'memory_bytes': 431327, 'estimated_fp_rate': 0.00002,
+             'observed_fp_rate': 0.0, 'checked': 300, 'dropped': 270}
+        """
+        negatives = self.checked - (self.bloom_positives - self.false_positives)
+        return {
+            'items': self.bloom.count,
+            'capacity': self.bloom.capacity,
+            'memory_bytes': self.bloom.memory_bytes,
+            'estimated_fp_rate': round(self.bloom.estimated_false_positive_rate(), 6),
+            'observed_fp_rate': round(self.false_positives / negatives, 6) if negatives > 0 else 0.0,
+            'checked': self.checked,
+            'dropped': self.dropped
+        }
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+광고 데이터 컬럼형 스냅샷 내보내기 (Parquet / Arrow IPC)
+- 타입이 있는 컬럼 (id int64, 타임스탬프, Parquet 에서는 검색어/소스/상태를 dictionary 인코딩)
+- 수집일 기준 파티션 디렉터리: <출력 디렉터리>/collected_date=YYYY-MM-DD/part-*.parquet
+- 증분 추가: 마지막으로 내보낸 id 를 _snapshot_state.json 에 기록하고 그 이후 광고만 새 파일로 추가
+- pyarrow 필요 (선택 의존성, 사용할 때만 import)
+
+읽기 예:
+    import pyarrow.dataset as ds
+    dataset = ds.dataset("snapshots", format="parquet", partitioning="hive")
+    table = dataset.to_table(columns=["video_id", "api_source"])
+
+주의: analysis_status / analyzed_at 은 내보낸 시점의 값이다 (이후 변경을 반영하려면 full=True 로 다시 생성).
+"""
+
+import glob
+import json
+import os
+from datetime import datetime
+from typing import Dict
+
+from config import Config
+
+SNAPSHOT_COLUMNS = ('id', 'video_id', 'title', 'url', 'note', 'search_query', 'api_source',
+                    'collected_at', 'analysis_status', 'analyzed_at')
+
+TIMESTAMP_COLUMNS = ('collected_at', 'analyzed_at')
+
+STATE_FILE = '_snapshot_state.json'
+
+FORMAT_EXTENSIONS = {'parquet': 'parquet', 'arrow': 'arrow'}
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError:
+        raise ImportError("Parquet/Arrow 내보내기에는 pyarrow 가 필요합니다: pip install pyarrow")
+
+def snapshot_schema(pa, dictionary: bool = True):
+    """
+    스냅샷 컬럼 타입
+    
+    Args:
+        dictionary: 반복 값이 많은 컬럼을 dictionary 인코딩할지 여부
+                    (Arrow IPC 파일은 배치마다 다른 dictionary 를 쓸 수 없으므로 False)
+    """
+    categories = pa.dictionary(pa.int32(), pa.string()) if dictionary else pa.string()
+    return pa.schema([
+        pa.field('id', pa.int64(), nullable=False),
+        pa.field('video_id', pa.string()),
+        pa.field('title', pa.string()),
+        pa.field('url', pa.string()),
+        pa.field('note', pa.string()),
+        pa.field('search_query', categories),
+        pa.field('api_source', categories),
+        pa.field('collected_at', pa.timestamp('s')),
+        pa.field('analysis_status', categories),
+        pa.field('analyzed_at', pa.timestamp('s'))
+    ])
+
+def _parse_timestamp(value):
+    """SQLite CURRENT_TIMESTAMP 문자열 → datetime"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+class _PartitionWriter:
+    """수집일 파티션 하나에 대한 Parquet/Arrow 파일 작성기"""
+    
+    def __init__(self, pa, schema, path: str, format: str):
+        self.path = path
+        self.rows = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if format == 'parquet':
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(path, schema, compression='zstd')
+        else:
+            self._writer = pa.ipc.new_file(path, schema)
+    
+    def write(self, table):
+        self._writer.write_table(table)
+        self.rows += table.num_rows
+    
+    def close(self):
+        self._writer.close()
+
+def _read_state(output_dir: str) -> dict:
+    path = os.path.join(output_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def _write_state(output_dir: str, state: dict):
+    # 중간에 중단되어도 이전 상태 파일이 깨지지 않도록 임시 파일 후 교체
+    path = os.path.join(output_dir, STATE_FILE)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(path + '.tmp', path)
+
+def export_snapshot(db, output_dir: str = None, format: str = 'parquet', full: bool = False,
+                    chunk_size: int = None) -> Dict:
+    """
+    광고 데이터를 수집일 파티션별 컬럼형 파일로 내보내기
+    
+    Args:
+        db: YouTubeAdsDatabase
+        output_dir: 스냅샷 디렉터리 (기본값: Config.SNAPSHOT_DIR)
+        format: 'parquet' 또는 'arrow' (Arrow IPC 파일, 메모리 매핑용)
+        full: True 면 기존 파티션을 지우고 처음부터 다시 생성, False 면 마지막 내보내기 이후 광고만 추가
+        chunk_size: 한 번에 읽어 쓰는 행 수 (= 최대 row group 크기, 기본값: Config.SNAPSHOT_CHUNK_SIZE)
+    
+    Returns:
+        {'rows': 1200, 'files': 3, 'partitions': ['2025-01-01', ...], 'last_id': 5400}
+    """
+    if format not in FORMAT_EXTENSIONS:
+        raise ValueError(f"지원하지 않는 형식: {format}")
+    
+    pa = _import_pyarrow()
+    schema = snapshot_schema(pa, dictionary=(format == 'parquet'))
+    output_dir = output_dir or Config.SNAPSHOT_DIR
+    chunk_size = chunk_size or Config.SNAPSHOT_CHUNK_SIZE
+    extension = FORMAT_EXTENSIONS[format]
+    os.makedirs(output_dir, exist_ok=True)
+    
+    state = _read_state(output_dir)
+    if state.get('format', format) != format:
+        full = True  # 형식이 바뀌면 섞이지 않도록 다시 생성
+    
+    if full:
+        for path in glob.glob(os.path.join(output_dir, 'collected_date=*', 'part-*.*')):
+            os.remove(path)
+        state = {}
+    
+    after_id = state.get('last_id', 0)
+    run_id = after_id + 1  # 같은 구간을 다시 내보내면 같은 파일명을 덮어씀
+    
+    writers: Dict[str, _PartitionWriter] = {}
+    opened: Dict[str, int] = {}
+    closed = []
+    buffer = []
+    last_id = after_id
+    
+    def flush():
+        by_date: Dict[str, list] = {}
+        for row in buffer:
+            by_date.setdefault((row['collected_at'] or '')[:10] or 'unknown', []).append(row)
+        
+        for date, rows in by_date.items():
+            columns = {name: [row[name] for row in rows] for name in SNAPSHOT_COLUMNS}
+            for name in TIMESTAMP_COLUMNS:
+                columns[name] = [_parse_timestamp(value) for value in columns[name]]
+            
+            writer = writers.get(date)
+            if writer is None:
+                opened[date] = opened.get(date, 0) + 1
+                path = os.path.join(output_dir, f"collected_date={date}",
+                                    f"part-{run_id:010d}-{opened[date]}.{extension}")
+                writer = writers[date] = _PartitionWriter(pa, schema, path, format)
+            writer.write(pa.Table.from_pydict(columns, schema=schema))
+        
+        # id 순으로 읽으므로 이번 chunk 보다 이전 날짜 파티션은 더 이상 쓰이지 않음 → 닫기
+        oldest = min(by_date)
+        for date in [date for date in writers if date < oldest]:
+            writer = writers.pop(date)
+            writer.close()
+            closed.append(writer)
+        buffer.clear()
+    
+    try:
+        for row in db.iter_ads('all', after_id, chunk_size=chunk_size, columns=SNAPSHOT_COLUMNS):
+            buffer.append(row)
+            last_id = row['id']
+            if len(buffer) >= chunk_size:
+                flush()
+        if buffer:
+            flush()
+    finally:
+        for writer in writers.values():
+            writer.close()
+            closed.append(writer)
+    
+    partitions = sorted({os.path.basename(os.path.dirname(writer.path)).split('=', 1)[1] for writer in closed})
+    rows = sum(writer.rows for writer in closed)
+    
+    _write_state(output_dir, {
+        'format': format,
+        'last_id': last_id,
+        'rows': state.get('rows', 0) + rows,
+        'updated_at': datetime.now().isoformat(timespec='seconds')
+    })
+    
+    print(f"📦 스냅샷 내보내기 완료: {output_dir} ({rows}개 레코드, 파일 {len(closed)}개, 파티션 {len(partitions)}개)")
+    return {'rows': rows, 'files': len(closed), 'partitions': partitions, 'last_id': last_id}
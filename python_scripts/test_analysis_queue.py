@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+분석 큐가 큐 밖에서 분석이 끝난 광고를 건너뛰는지 확인
+
+사용법:
+    python -m pytest test_analysis_queue.py    (또는 python test_analysis_queue.py)
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from ad_records import AdVideoInfo
+from database_setup import YouTubeAdsDatabase
+
+ADS = [
+    AdVideoInfo("first ad", "https://www.youtube.com/watch?v=aaaaaaaaaaa", "note", "aaaaaaaaaaa"),
+    AdVideoInfo("second ad", "https://www.youtube.com/watch?v=bbbbbbbbbbb", "note", "bbbbbbbbbbb"),
+]
+
+class ExternalCompletionTest(unittest.TestCase):
+    """Node 측 스크립트처럼 youtube_ads.analysis_status 만 바꾼 광고는 다시 가져가지 않는지"""
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="analysis_queue_test_")
+        self.db = YouTubeAdsDatabase(os.path.join(self.workdir, "ads.db"))
+        self.db.save_ads(ADS, "query", "SerpAPI")
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def _complete_outside_queue(self, url: str):
+        with self.db.connection():
+            self.db.connection().execute("""
+                UPDATE youtube_ads SET analysis_status = 'completed', analyzed_at = datetime('now')
+                WHERE url = ?
+            """, (url,))
+
+    def _queue_status(self, url: str) -> str:
+        return self.db.connection().execute("""
+            SELECT q.status FROM analysis_queue q JOIN youtube_ads a ON a.id = q.youtube_ad_id
+            WHERE a.url = ?
+        """, (url,)).fetchone()[0]
+
+    def test_claim_skips_ad_completed_outside_queue(self):
+        self._complete_outside_queue(ADS[0].url)
+
+        claimed = self.db.claim_batch("worker-1", n=10)
+        self.assertEqual([item['url'] for item in claimed], [ADS[1].url])
+        self.assertEqual(self._queue_status(ADS[0].url), 'completed')
+
+    def test_expired_lease_of_completed_ad_is_not_requeued(self):
+        claimed = self.db.claim_batch("worker-1", n=10, lease_seconds=1)
+        self.assertEqual(len(claimed), 2)
+        self._complete_outside_queue(ADS[0].url)
+        with self.db.connection():
+            self.db.connection().execute(
+                "UPDATE analysis_queue SET lease_expires_at = datetime('now', '-1 minute')")
+
+        self.assertEqual(self.db.requeue_expired(), 2)
+        self.assertEqual(self._queue_status(ADS[0].url), 'completed')
+        self.assertEqual([item['url'] for item in self.db.claim_batch("worker-2", n=10)], [ADS[1].url])
+
+    def test_worker_ack_still_counts(self):
+        claimed = self.db.claim_batch("worker-1", n=10)
+        self.assertEqual(self.db.ack("worker-1", [item['queue_id'] for item in claimed]), 2)
+        self.assertEqual(self._queue_status(ADS[0].url), 'completed')
+
+if __name__ == "__main__":
+    unittest.main()
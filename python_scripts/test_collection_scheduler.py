@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+수집 스케줄러의 일일 호출 예산 확인
+
+사용법:
+    python -m pytest test_collection_scheduler.py    (또는 python test_collection_scheduler.py)
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from collection_scheduler import CollectionScheduler
+from config import Config
+from database_setup import YouTubeAdsDatabase
+from refresh_policy import RefreshPolicy
+
+QUERIES = ["first query", "second query", "third query"]
+
+class _FailingCollector:
+    """collect_all_ads_concurrent 가 예외를 내는 수집기 (fail_after 개 검색어는 기록한 뒤)"""
+
+    apify_token = None
+    serp_api_key = "test-key"
+
+    def __init__(self, db: YouTubeAdsDatabase, fail_after: int = 0):
+        self.db = db
+        self.refresh_policy = RefreshPolicy(db)
+        self.fail_after = fail_after
+        self.calls = 0
+
+    def collect_all_ads_concurrent(self, search_queries, max_ads_per_query, due_queries):
+        self.calls += 1
+        for query in due_queries["SerpAPI"][:self.fail_after]:
+            self.db.mark_collected(query, "SerpAPI")
+        raise RuntimeError("collector crashed")
+
+class SchedulerBudgetTest(unittest.TestCase):
+    """수집이 실패해도 끝나지 않은 호출은 예산을 쓰지 않는지"""
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="scheduler_test_")
+        self.db = YouTubeAdsDatabase(os.path.join(self.workdir, "ads.db"))
+        budget = mock.patch.dict(Config.DAILY_CALL_BUDGET, {"SerpAPI": 2})
+        budget.start()
+        self.addCleanup(budget.stop)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def _scheduler(self, collector) -> CollectionScheduler:
+        scheduler = CollectionScheduler(collector, QUERIES,
+                                        queries_file=os.path.join(self.workdir, "missing.txt"))
+        scheduler._queries = list(QUERIES)
+        return scheduler
+
+    def test_failed_batches_keep_budget(self):
+        collector = _FailingCollector(self.db)
+        scheduler = self._scheduler(collector)
+        for _ in range(5):
+            scheduler._run_batch({"SerpAPI": list(QUERIES)})
+
+        self.assertEqual(collector.calls, 5)
+        self.assertEqual(self.db.calls_today("SerpAPI"), 0)
+        self.assertEqual(scheduler.policy.budget_left("SerpAPI"), 2)
+
+    def test_calls_finished_before_failure_are_charged(self):
+        collector = _FailingCollector(self.db, fail_after=1)
+        scheduler = self._scheduler(collector)
+        scheduler._run_batch({"SerpAPI": list(QUERIES)})
+
+        self.assertEqual(self.db.calls_today("SerpAPI"), 1)
+        self.assertEqual(scheduler.policy.budget_left("SerpAPI"), 1)
+
+class SchedulerIdleTest(unittest.TestCase):
+    """할 일이 없을 때 검색어 파일을 주기적으로 확인하지 않고 reload() 에만 반응하는지"""
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="scheduler_test_")
+        self.db = YouTubeAdsDatabase(os.path.join(self.workdir, "ads.db"))
+        for query in QUERIES:
+            self.db.mark_collected(query, "SerpAPI")
+        self.queries_file = os.path.join(self.workdir, "queries.txt")
+        with open(self.queries_file, "w", encoding="utf-8") as f:
+            f.write("\n".join(QUERIES))
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def test_idle_scheduler_waits_for_reload(self):
+        scheduler = CollectionScheduler(_FailingCollector(self.db), QUERIES, queries_file=self.queries_file)
+        thread = threading.Thread(target=scheduler.run)
+        with mock.patch.object(scheduler, "_queries_mtime_now", wraps=scheduler._queries_mtime_now) as stat, \
+             mock.patch.object(scheduler, "sync_queries", wraps=scheduler.sync_queries) as sync:
+            thread.start()
+            self.addCleanup(thread.join, 5)
+            self.addCleanup(scheduler.stop)
+            time.sleep(0.3)
+            self.assertEqual(stat.call_count, 1)  # 시작할 때 한 번
+            self.assertEqual(sync.call_count, 1)
+
+            with open(self.queries_file, "a", encoding="utf-8") as f:
+                f.write("\nfourth query")
+            scheduler.reload()
+            time.sleep(0.3)
+            self.assertEqual(sync.call_count, 2)
+            self.assertIn("fourth query", scheduler._queries)
+            self.assertEqual(scheduler.collector.calls, 1)  # 새 검색어만 바로 수집
+
+if __name__ == "__main__":
+    unittest.main()
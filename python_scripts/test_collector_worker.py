@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+상주 수집 작업자 JSON-lines 프로토콜 확인 (이벤트 순서, 대기 중인 명령의 started 시점)
+
+사용법:
+    python -m pytest test_collector_worker.py    (또는 python test_collector_worker.py)
+"""
+
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import collector_worker
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "collector_worker.py")
+
+class StdioProtocolTest(unittest.TestCase):
+    """표준 입력으로 보낸 명령이 보낸 순서대로 started → result/error 이벤트를 내는지"""
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="collector_worker_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def test_events_follow_command_order(self):
+        commands = [
+            {"id": "1", "cmd": "ping"},
+            {"id": "2", "cmd": "no-such-command"},
+            {"id": "3", "cmd": "stats"},
+            {"id": "4", "cmd": "shutdown"},
+        ]
+        env = dict(os.environ, SERPAPI_KEY="test-key", APIFY_TOKEN="", PYTHONUNBUFFERED="1")
+        completed = subprocess.run(
+            [sys.executable, WORKER_SCRIPT, "--db", os.path.join(self.workdir, "ads.db")],
+            input="".join(json.dumps(command) + "\n" for command in commands),
+            capture_output=True, text=True, cwd=self.workdir, env=env, timeout=60)
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+
+        # 초기화 중 출력은 id 없는 progress 이벤트로 ready 보다 먼저 나옴
+        events = [json.loads(line) for line in completed.stdout.splitlines()]
+        replies = [(event.get("id"), event["event"]) for event in events if event["event"] != "progress"]
+        self.assertEqual(replies, [
+            (None, "ready"),
+            ("1", "started"), ("1", "result"),
+            ("2", "error"),
+            ("3", "started"), ("3", "result"),
+            ("4", "result"),
+        ])
+
+class _RecordingSession:
+    """보낸 이벤트를 기록하는 세션"""
+
+    def __init__(self):
+        self.events = []
+        self.sent = threading.Condition()
+
+    def send(self, event: dict):
+        with self.sent:
+            self.events.append(event)
+            self.sent.notify_all()
+
+    def wait_for(self, request_id: str, name: str, timeout: float = 5) -> bool:
+        with self.sent:
+            return self.sent.wait_for(lambda: self.has(request_id, name), timeout)
+
+    def has(self, request_id: str, name: str) -> bool:
+        return any(e.get("id") == request_id and e["event"] == name for e in self.events)
+
+class _BlockingCollector:
+    """release 될 때까지 끝나지 않는 수집기"""
+
+    def __init__(self, db_path: str = None):
+        self.release = threading.Event()
+
+    def collect_all_ads_concurrent(self, search_queries, max_ads_per_query):
+        print("collecting")
+        self.release.wait(5)
+        return {"total_collected": 0}
+
+    def get_database_stats(self):
+        return {"total_ads": 0}
+
+    get_http_metrics = get_seen_filter_stats = get_cache_stats = get_refresh_stats = get_database_stats
+
+class QueuedCommandTest(unittest.TestCase):
+    """앞선 명령을 기다리는 동안에는 started 를 보내지 않는지 (클라이언트 제한 시간의 시작점)"""
+
+    def setUp(self):
+        root = logging.getLogger()
+        handlers, level = list(root.handlers), root.level
+        self.addCleanup(lambda: (setattr(root, "handlers", handlers), root.setLevel(level)))
+        stdout = mock.patch.object(sys, "stdout", sys.stdout)
+        stdout.start()
+        self.addCleanup(stdout.stop)
+        factory = mock.patch.object(collector_worker, "YouTubeAdsCollectorDB", _BlockingCollector)
+        factory.start()
+        self.addCleanup(factory.stop)
+
+        self.worker = collector_worker.CollectorWorker(out=None)
+
+    def _submit(self, session: _RecordingSession, command: dict) -> threading.Thread:
+        thread = threading.Thread(target=self.worker.handle_line, args=(json.dumps(command), session))
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        return thread
+
+    def test_queued_command_starts_after_running_one(self):
+        first, second = _RecordingSession(), _RecordingSession()
+        self._submit(first, {"id": "1", "cmd": "collect", "args": {"search_queries": ["q"]}})
+        self.assertTrue(first.wait_for("1", "started"))
+
+        self._submit(second, {"id": "2", "cmd": "stats"})
+        self.assertFalse(second.wait_for("2", "started", timeout=0.3))
+
+        self.worker.collector.release.set()
+        self.assertTrue(second.wait_for("2", "result"))
+        self.assertEqual([e["event"] for e in first.events], ["started", "progress", "result"])
+        self.assertEqual([e["event"] for e in second.events], ["started", "result"])
+        self.assertEqual(first.events[1]["message"], "collecting")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+응답 캐시 TTL 과 적응형 재수집 간격, 스트리밍 응답 저장 확인
+
+사용법:
+    python -m pytest test_response_cache.py    (또는 python test_response_cache.py)
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from config import Config
+from database_setup import YouTubeAdsDatabase
+from refresh_policy import RefreshPolicy
+from response_cache import CachedResponse, ResponseCache, cache_key
+
+class ShortIntervalCacheTest(unittest.TestCase):
+    """간격이 하한까지 줄어든 검색어도 재수집 차례에는 실제 API 를 호출하는지"""
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="response_cache_test_")
+        self.db = YouTubeAdsDatabase(os.path.join(self.workdir, "ads.db"))
+        self.cache = ResponseCache(path=os.path.join(self.workdir, "cache.db"), mode='on')
+        self.policy = RefreshPolicy(self.db)
+
+    def tearDown(self):
+        self.cache.close()
+        self.db.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def _fetch(self, provider: str, query: str, calls: list):
+        def send():
+            calls.append(query)
+            return CachedResponse(200, b'{"video_results": []}')
+        return self.cache.fetch(provider, "GET", "https://serpapi.com/search", send,
+                                params={"search_query": query}, context=query)
+
+    def test_due_query_reaches_provider(self):
+        for provider in Config.REFRESH_HOURS_BOUNDS:
+            with self.subTest(provider=provider):
+                query = f"high yield {provider}"
+                calls = []
+                self._fetch(provider, query, calls)
+
+                # 수율이 높아 간격이 하한까지 줄어든 검색어
+                self.db.mark_collected(query, provider)
+                with self.db.connection():
+                    self.db.connection().execute("""
+                        UPDATE search_history SET yield_ewma = 1000, yield_sampled_at = last_collected
+                        WHERE query = ? AND api_source = ?
+                    """, (query, provider))
+                hours = self.policy.intervals([query], provider)[query]
+                self.assertEqual(hours, Config.REFRESH_HOURS_BOUNDS[provider][0])
+
+                later = time.time() + hours * 3600 + 5
+                with mock.patch('time.time', return_value=later):
+                    self.assertTrue(self.policy.due([query], provider)[query])
+                    response = self._fetch(provider, query, calls)
+
+                self.assertFalse(getattr(response, 'from_cache', False))
+                self.assertEqual(calls, [query, query])
+
+    def test_restart_within_interval_reuses_response(self):
+        calls = []
+        self._fetch("SerpAPI", "restart", calls)
+        self.assertTrue(self._fetch("SerpAPI", "restart", calls).from_cache)
+        self.assertEqual(calls, ["restart"])
+        key = cache_key("SerpAPI", "GET", "https://serpapi.com/search", {"search_query": "restart"}, None, "restart")
+        self.assertIsNotNone(self.cache.get(key))
+
+class _StreamingResponse:
+    """iter_content 만 제공하는 스트리밍 응답 (content 를 읽으면 실패)"""
+
+    status_code = 200
+
+    def __init__(self, chunks: list):
+        self.chunks = chunks
+        self.closed = False
+
+    @property
+    def content(self):
+        raise AssertionError("스트리밍 응답 본문을 한 번에 읽음")
+
+    def iter_content(self, chunk_size: int = 1):
+        yield from self.chunks
+
+    def close(self):
+        self.closed = True
+
+class StreamedResponseCacheTest(unittest.TestCase):
+    """stream=True 응답은 읽는 대로 캐시에 쌓고 끝까지 읽었을 때만 저장하는지"""
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="response_cache_test_")
+        self.cache = ResponseCache(path=os.path.join(self.workdir, "cache.db"), mode='on')
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def _fetch(self, response):
+        return self.cache.fetch("Apify", "POST", "https://api.apify.com/v2/run", lambda: response,
+                                body={"max_ads": 1}, context="q", stream=True)
+
+    def test_stream_is_stored_after_full_read(self):
+        chunks = [b'[{"video_id": "abc"}', b', {"video_id": "def"}]']
+        response = self._fetch(_StreamingResponse(chunks))
+        self.assertEqual(list(response.iter_content(4)), chunks)
+        response.close()
+
+        cached = self._fetch(_StreamingResponse([]))
+        self.assertTrue(cached.from_cache)
+        self.assertEqual(cached.content, b''.join(chunks))
+
+    def test_stream_is_stored_without_blobopen(self):
+        chunks = [b'[{"video_id": "abc"}]']
+        with mock.patch('response_cache.HAS_BLOBOPEN', False):
+            response = self._fetch(_StreamingResponse(chunks))
+            self.assertEqual(list(response.iter_content(4)), chunks)
+        self.assertEqual(self._fetch(_StreamingResponse([])).content, chunks[0])
+
+    def test_partial_stream_is_not_stored(self):
+        response = self._fetch(_StreamingResponse([b'[{"video_id": ', b'"abc"}]']))
+        next(response.iter_content(4))
+        response.close()
+        self.assertEqual(self.cache.stats()['stores'], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,148 +3,417 @@
 웹서비스 연동 모듈
 - DB에서 분석 대기 중인 광고 데이터를 웹서비스로 전송
 - 스케줄링 및 상태 업데이트 관리
+- requests / schedule 은 실제로 전송하거나 스케줄을 설정할 때 로드
 """
 
-import requests
+import argparse
+import gzip
 import json
+import os
+import socket
+import sys
 import time
-import schedule
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
 
 try:
     from database_setup import YouTubeAdsDatabase
+    from config import Config
+    from http_client import get_http_client
+    from circuit_breaker import CircuitBreaker, OPEN
 except ImportError:
-    print("❌ database_setup.py 파일이 필요합니다!")
+    print("❌ database_setup.py, config.py, http_client.py, circuit_breaker.py 파일이 필요합니다!")
     exit(1)
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class WebServiceConnector:
     """웹서비스 연동 클래스"""
     
-    def __init__(self, web_service_url: str, api_key: str = None, db_path: str = "youtube_ads.db"):
+    def __init__(self, web_service_url: str, api_key: str = None, db_path: str = "youtube_ads.db",
+                 worker_id: str = None):
         """
         Args:
             web_service_url: 웹서비스 API 엔드포인트 URL
             api_key: 웹서비스 인증 키 (필요시)
             db_path: 데이터베이스 파일 경로
+            worker_id: 분석 큐 작업자 식별자 (기본값: 호스트명:PID)
         """
         self.web_service_url = web_service_url.rstrip('/')
         self.api_key = api_key
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
         self.db = YouTubeAdsDatabase(db_path)
-        self.session = requests.Session()
+        self._http = None
         
-        # 공통 헤더 설정
-        self.session.headers.update({
+        # 웹서비스 장애 시 전송을 멈추고 광고를 대기 상태로 유지
+        self.breaker = CircuitBreaker("WebService")
+        
+        # 공통 헤더 설정 (공용 세션이므로 요청마다 전달)
+        self.headers = {
             'Content-Type': 'application/json',
             'User-Agent': 'YouTube-Ads-Collector/1.0'
-        })
+        }
         
         if api_key:
-            self.session.headers.update({
-                'Authorization': f'Bearer {api_key}'
-            })
+            self.headers['Authorization'] = f'Bearer {api_key}'
+    
+    @property
+    def http(self):
+        """공용 HttpClient (처음 요청할 때 만듦)"""
+        if self._http is None:
+            self._http = get_http_client()
+        return self._http
     
-    def send_batch_to_web_service(self, batch_size: int = 10) -> Dict[str, int]:
+    def send_batch_to_web_service(self, batch_size: int = 10, max_in_flight: int = None) -> Dict[str, int]:
         """
         분석 대기 중인 광고를 배치로 웹서비스에 전송
         
         Args:
             batch_size: 한 번에 전송할 광고 개수
-            
+            max_in_flight: 동시 전송 요청 수 (기본값: Config.WEB_SERVICE_CONCURRENCY, 1 이면 순차 전송)
+        
         Returns:
-            {'sent': 5, 'success': 4, 'failed': 1}
+            {'sent': 5, 'success': 4, 'failed': 1, 'deferred': 0}
+            deferred: 웹서비스 장애로 보내지 못하고 대기 상태로 돌려놓은 광고 수
         """
         logger.info(f"📤 웹서비스 배치 전송 시작 (배치 크기: {batch_size})")
         
-        # 분석 대기 중인 광고 조회
-        pending_ads = self.db.get_pending_analysis(batch_size)
+        if self._circuit_open():
+            return {'sent': 0, 'success': 0, 'failed': 0, 'deferred': 0}
+        
+        # 분석 큐에서 대기 항목 가져오기 (다른 작업자와 중복되지 않음)
+        pending_ads = self.db.claim_batch(self.worker_id, batch_size)
         
         if not pending_ads:
             logger.info("📭 전송할 대기 중인 광고가 없습니다.")
-            return {'sent': 0, 'success': 0, 'failed': 0}
+            return {'sent': 0, 'success': 0, 'failed': 0, 'deferred': 0}
         
         results = {
             'sent': len(pending_ads),
             'success': 0,
-            'failed': 0
+            'failed': 0,
+            'deferred': 0
         }
         
-        logger.info(f"📋 전송할 광고: {len(pending_ads)}개")
+        max_in_flight = max(1, max_in_flight or Config.WEB_SERVICE_CONCURRENCY)
+        logger.info(f"📋 전송할 광고: {len(pending_ads)}개 (동시 전송: {max_in_flight}개)")
         
-        for ad in pending_ads:
-            success = self._send_single_ad(ad)
-            if success:
-                results['success'] += 1
-                # DB에서 상태 업데이트
-                self.db.update_analysis_status(ad['id'], 'completed')
-            else:
-                results['failed'] += 1
-                self.db.update_analysis_status(ad['id'], 'failed', 'Web service transmission failed')
-            
-            # 요청 간격 (웹서비스 과부하 방지)
-            time.sleep(0.5)
+        acked_ids, failed_ids, deferred_ids, _ = self._send_ads_individually(pending_ads, max_in_flight)
+        results['success'] = len(acked_ids)
+        results['failed'] = len(failed_ids)
+        results['deferred'] = len(deferred_ids)
+        
+        # DB 상태 업데이트 (배치당 한 트랜잭션, 실패 항목은 최대 시도 횟수 전까지 다시 대기열로,
+        # 장애로 보내지 못한 항목은 시도 횟수 차감 없이 대기 상태로)
+        self.db.settle_batch(self.worker_id, acked_ids, failed_ids, 'Web service transmission failed',
+                             released=deferred_ids)
         
-        logger.info(f"✅ 배치 전송 완료: 성공 {results['success']}개, 실패 {results['failed']}개")
+        logger.info(f"✅ 배치 전송 완료: 성공 {results['success']}개, 실패 {results['failed']}개, "
+                    f"보류 {results['deferred']}개")
         
         # 동기화 로그 기록
-        self._log_sync_result('batch_send', results['sent'], results['failed'] == 0)
+        self._log_sync_result('batch_send', results['sent'],
+                              results['failed'] == 0 and results['deferred'] == 0)
         
         return results
     
-    def _send_single_ad(self, ad: Dict) -> bool:
+    def _send_ads_individually(self, ads: List[Dict],
+                               max_in_flight: int) -> Tuple[List[int], List[int], List[int], int]:
+        """
+        이미 가져온 광고를 한 건씩 전송 (DB 반영은 호출자가 함)
+        
+        Returns:
+            (성공 queue_id 목록, 실패 queue_id 목록, 장애로 보내지 못한 queue_id 목록, 실제로 보낸 요청 수)
+        """
+        if max_in_flight == 1 or len(ads) == 1:
+            outcomes = [self._send_single_ad(ad) for ad in ads]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_in_flight, len(ads)),
+                                    thread_name_prefix="web-send") as executor:
+                outcomes = list(executor.map(self._send_single_ad, ads))
+        
+        acked_ids = [ad['queue_id'] for ad, (outcome, _) in zip(ads, outcomes) if outcome is True]
+        failed_ids = [ad['queue_id'] for ad, (outcome, _) in zip(ads, outcomes) if outcome is False]
+        deferred_ids = [ad['queue_id'] for ad, (outcome, _) in zip(ads, outcomes) if outcome is None]
+        return acked_ids, failed_ids, deferred_ids, sum(1 for _, requested in outcomes if requested)
+    
+    def send_bulk_to_web_service(self, batch_size: int = None, chunk_size: int = None,
+                                 max_in_flight: int = None) -> Dict[str, int]:
+        """
+        분석 대기 중인 광고를 일괄 전송 엔드포인트(/api/analyze/batch)로 전송
+        
+        요청 하나에 광고 chunk_size 개를 gzip NDJSON 으로 담아 보내고,
+        응답의 항목별 상태를 분석 큐에 반영한다.
+        - accepted: 완료 처리
+        - rejected: 재시도 없이 실패 처리 (서버가 알려준 사유 기록)
+        - error / 응답 누락 / 요청 자체 실패: 최대 시도 횟수 전까지 다시 대기
+        
+        서버에 일괄 엔드포인트가 없으면 (404/405/501) 그 요청에 담았던 광고만 개별 전송으로 대체한다.
+        
+        Args:
+            batch_size: 큐에서 가져올 광고 개수 (기본값: chunk_size * max_in_flight)
+            chunk_size: 요청당 광고 수 (기본값: Config.WEB_SERVICE_BULK_SIZE)
+            max_in_flight: 동시 전송 요청 수 (기본값: Config.WEB_SERVICE_CONCURRENCY)
+        
+        Returns:
+            {'sent': 200, 'success': 195, 'failed': 5, 'deferred': 0, 'requests': 2}
+        """
+        chunk_size = max(1, chunk_size or Config.WEB_SERVICE_BULK_SIZE)
+        max_in_flight = max(1, max_in_flight or Config.WEB_SERVICE_CONCURRENCY)
+        batch_size = batch_size or chunk_size * max_in_flight
+        logger.info(f"📦 웹서비스 일괄 전송 시작 (배치 크기: {batch_size}, 요청당 {chunk_size}개)")
+        
+        if self._circuit_open():
+            return {'sent': 0, 'success': 0, 'failed': 0, 'deferred': 0, 'requests': 0}
+        
+        pending_ads = self.db.claim_batch(self.worker_id, batch_size)
+        
+        if not pending_ads:
+            logger.info("📭 전송할 대기 중인 광고가 없습니다.")
+            return {'sent': 0, 'success': 0, 'failed': 0, 'deferred': 0, 'requests': 0}
+        
+        chunks = [pending_ads[i:i + chunk_size] for i in range(0, len(pending_ads), chunk_size)]
+        
+        if max_in_flight == 1 or len(chunks) == 1:
+            outcomes = [self._send_bulk_chunk(chunk) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_in_flight, len(chunks)),
+                                    thread_name_prefix="web-bulk") as executor:
+                outcomes = list(executor.map(self._send_bulk_chunk, chunks))
+        
+        acked_ids, failed_ids, deferred_ids, rejected = [], [], [], {}
+        fallback_ads = []
+        for outcome in outcomes:
+            fallback_ads.extend(outcome['fallback'])
+            acked_ids.extend(outcome['acked'])
+            failed_ids.extend(outcome['failed'])
+            deferred_ids.extend(outcome['deferred'])
+            rejected.update(outcome['rejected'])
+        
+        requests_made = sum(1 for outcome in outcomes if outcome['requested'])
+        if fallback_ads:
+            # 일괄 엔드포인트 미지원 → 그 요청에 담았던 광고만 (가져온 그대로) 개별 전송
+            # 서버가 이미 받은 묶음, 요청 본문을 만들지 못해 실패 처리한 광고는 다시 보내지 않음
+            logger.warning(f"⚠️ 일괄 전송 엔드포인트를 지원하지 않아 {len(fallback_ads)}개를 개별 전송으로 전환합니다")
+            single_acked, single_failed, single_deferred, single_requests = \
+                self._send_ads_individually(fallback_ads, max_in_flight)
+            acked_ids.extend(single_acked)
+            failed_ids.extend(single_failed)
+            deferred_ids.extend(single_deferred)
+            requests_made += single_requests  # 브레이커가 막아 보내지 못한 광고는 제외
+        
+        # DB 상태 업데이트 (배치 전체를 한 트랜잭션으로)
+        self.db.settle_batch(self.worker_id, acked_ids, failed_ids, 'Web service transmission failed',
+                             rejected=rejected, released=deferred_ids)
+        
+        results = {
+            'sent': len(pending_ads),
+            'success': len(acked_ids),
+            'failed': len(failed_ids) + len(rejected),
+            'deferred': len(deferred_ids),
+            'requests': requests_made
+        }
+        logger.info(f"✅ 일괄 전송 완료: 요청 {results['requests']}회, "
+                    f"성공 {results['success']}개, 실패 {results['failed']}개 (거부 {len(rejected)}개), "
+                    f"보류 {results['deferred']}개")
+        
+        self._log_sync_result('bulk_send', results['sent'],
+                              results['failed'] == 0 and results['deferred'] == 0)
+        
+        return results
+    
+    def _send_bulk_chunk(self, ads: List[Dict]) -> Dict:
+        """
+        광고 묶음을 한 번의 요청으로 전송
+        
+        Returns:
+            {'acked': [queue_id, ...], 'failed': [queue_id, ...], 'deferred': [queue_id, ...],
+             'rejected': {queue_id: '사유'}, 'fallback': [광고, ...], 'requested': True}
+            fallback: 일괄 엔드포인트를 지원하지 않아 개별 전송할 광고 (요청 본문에 담았던 광고만)
+            requested: 실제로 요청을 보냈는지
+        """
+        import requests
+        
+        endpoint = f"{self.web_service_url}/api/analyze/batch"
+        queue_ids = {ad['id']: ad['queue_id'] for ad in ads}
+        outcome = {'acked': [], 'failed': [], 'deferred': [], 'rejected': {}, 'fallback': [], 'requested': False}
+        
+        # 요청 본문은 브레이커 허가 전에 만든다 (허가받은 요청은 모두 결과를 기록해야 하므로)
+        lines = []
+        sent_ads = []
+        for ad in ads:
+            try:
+                lines.append(json.dumps(self._build_payload(ad), ensure_ascii=False))
+                sent_ads.append(ad)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.error(f"   💥 광고 데이터 오류 (id={ad['id']}): {e}")
+                outcome['failed'].append(queue_ids.pop(ad['id']))
+        if not lines:
+            return outcome
+        body = gzip.compress('\n'.join(lines).encode('utf-8'))
+        headers = dict(self.headers, **{
+            'Content-Type': 'application/x-ndjson',
+            'Content-Encoding': 'gzip'
+        })
+        
+        if not self.breaker.allow_request():
+            outcome['deferred'].extend(queue_ids.values())
+            return outcome
+        
+        outcome['requested'] = True
+        try:
+            response = self.http.post(endpoint, provider="WebService", data=body,
+                                      headers=headers, timeout=60)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"   🌐 일괄 전송 네트워크 오류: {e}")
+            self.breaker.record_failure()
+            outcome['deferred'].extend(queue_ids.values())
+            return outcome
+        except Exception as e:
+            logger.error(f"   💥 일괄 전송 중 예상치 못한 오류: {e}")
+            self.breaker.release()  # 로컬 오류는 장애로 집계하지 않음 (half-open 시험 요청만 풀어줌)
+            outcome['failed'].extend(queue_ids.values())
+            return outcome
+        
+        if response.status_code in (404, 405, 501):
+            self.breaker.record_success()
+            outcome['fallback'] = sent_ads
+            return outcome
+        if self._is_outage_status(response.status_code):
+            logger.error(f"   🚧 웹서비스 장애: HTTP {response.status_code}")
+            self.breaker.record_failure()
+            outcome['deferred'].extend(queue_ids.values())
+            return outcome
+        if response.status_code not in (200, 207):
+            self.breaker.record_success()
+            logger.error(f"   ❌ 일괄 전송 실패: HTTP {response.status_code} - {response.text[:200]}")
+            outcome['failed'].extend(queue_ids.values())
+            return outcome
+        
+        items = self._bulk_results(response)
+        if items is None:
+            logger.error(f"   💥 일괄 전송 응답 해석 실패: {response.text[:200]}")
+            self.breaker.release()
+            outcome['failed'].extend(queue_ids.values())
+            return outcome
+        self.breaker.record_success()
+        
+        for item in items:
+            queue_id = queue_ids.pop(item.get('id'), None)
+            if queue_id is None:
+                continue
+            status = item.get('status')
+            if status == 'accepted':
+                outcome['acked'].append(queue_id)
+            elif status == 'rejected':
+                outcome['rejected'][queue_id] = item.get('error') or 'Rejected by web service'
+            else:
+                outcome['failed'].append(queue_id)
+        
+        # 응답에 없는 항목은 일시 실패로 간주
+        outcome['failed'].extend(queue_ids.values())
+        return outcome
+    
+    @staticmethod
+    def _bulk_results(response) -> Optional[List[Dict]]:
+        """일괄 전송 응답의 항목별 결과 {'results': [{'id': ..., 'status': ...}, ...]} (형식이 다르면 None)"""
+        try:
+            data = response.json()
+        except ValueError:
+            return None
+        if not isinstance(data, dict) or not isinstance(data.get('results', []), list):
+            return None
+        return [item for item in data.get('results', []) if isinstance(item, dict)]
+    
+    def _build_payload(self, ad: Dict) -> Dict:
+        """웹서비스로 보낼 광고 데이터"""
+        return {
+            'id': ad['id'],
+            'title': ad['title'],
+            'url': ad['url'],
+            'note': ad['note'],
+            'collected_at': ad['collected_at'],
+            'source': 'youtube_ads_collector'
+        }
+    
+    def _send_single_ad(self, ad: Dict) -> Tuple[Optional[bool], bool]:
         """
         개별 광고를 웹서비스에 전송
         
         Args:
             ad: {'id': 1, 'title': '...', 'url': '...', 'note': '...'}
-            
+        
         Returns:
-            전송 성공 여부
+            (전송 성공 여부 - 웹서비스 장애로 보내지 못했으면 None, 실제로 요청을 보냈는지)
         """
+        # 웹서비스 API 엔드포인트 (예시)
+        endpoint = f"{self.web_service_url}/api/analyze"
+        
+        # 전송할 데이터 구성 (브레이커 허가 전에: 허가받은 요청은 모두 결과를 기록해야 하므로)
         try:
-            # 웹서비스 API 엔드포인트 (예시)
-            endpoint = f"{self.web_service_url}/api/analyze"
-            
-            # 전송할 데이터 구성
-            payload = {
-                'id': ad['id'],
-                'title': ad['title'],
-                'url': ad['url'],
-                'note': ad['note'],
-                'collected_at': ad['collected_at'],
-                'source': 'youtube_ads_collector'
-            }
-            
-            logger.info(f"📤 전송 중: {ad['title'][:30]}...")
-            
-            response = self.session.post(endpoint, json=payload, timeout=30)
-            
-            if response.status_code in [200, 201, 202]:
-                logger.info(f"   ✅ 전송 성공 (HTTP {response.status_code})")
-                return True
-            else:
-                logger.error(f"   ❌ 전송 실패: HTTP {response.status_code} - {response.text}")
-                return False
-                
+            payload = self._build_payload(ad)
+            logger.info(f"📤 전송 중: {str(payload['title'])[:30]}...")
+        except (KeyError, TypeError) as e:
+            logger.error(f"   💥 광고 데이터 오류: {e}")
+            return False, False
+        
+        if not self.breaker.allow_request():
+            return None, False
+        
+        import requests
+        
+        try:
+            response = self.http.post(endpoint, provider="WebService", json=payload,
+                                      headers=self.headers, timeout=30)
         except requests.exceptions.Timeout:
             logger.error(f"   ⏰ 전송 시간 초과")
-            return False
+            self.breaker.record_failure()
+            return None, True
         except requests.exceptions.RequestException as e:
             logger.error(f"   🌐 네트워크 오류: {e}")
-            return False
+            self.breaker.record_failure()
+            return None, True
         except Exception as e:
             logger.error(f"   💥 예상치 못한 오류: {e}")
+            self.breaker.release()  # 로컬 오류는 장애로 집계하지 않음 (half-open 시험 요청만 풀어줌)
+            return False, True
+        
+        if self._is_outage_status(response.status_code):
+            logger.error(f"   🚧 웹서비스 장애: HTTP {response.status_code}")
+            self.breaker.record_failure()
+            return None, True
+        
+        self.breaker.record_success()
+        if response.status_code in [200, 201, 202]:
+            logger.info(f"   ✅ 전송 성공 (HTTP {response.status_code})")
+            return True, True
+        else:
+            logger.error(f"   ❌ 전송 실패: HTTP {response.status_code} - {response.text}")
+            return False, True
+    
+    @staticmethod
+    def _is_outage_status(status_code: int) -> bool:
+        """광고가 아니라 웹서비스 쪽 문제로 보는 응답 (서킷 브레이커 실패로 집계)"""
+        return status_code == 429 or status_code >= 500 and status_code != 501
+    
+    def _circuit_open(self) -> bool:
+        """서킷이 열려 있으면 큐에서 가져오지 않고 건너뜀"""
+        if self.breaker.state != OPEN:
             return False
+        logger.warning(f"🚧 웹서비스 서킷 열림: 전송 보류 ({self.breaker.retry_after():.0f}초 후 재시도)")
+        return True
+    
+    def get_circuit_stats(self) -> Dict:
+        """웹서비스 서킷 브레이커 상태 (state, trips, rejected, retry_after ...)"""
+        return self.breaker.stats()
     
     def check_web_service_status(self) -> bool:
         """웹서비스 상태 확인"""
         try:
             health_endpoint = f"{self.web_service_url}/api/health"
-            response = self.session.get(health_endpoint, timeout=10)
+            response = self.http.get(health_endpoint, provider="WebService", headers=self.headers, timeout=10)
             
             if response.status_code == 200:
                 logger.info("✅ 웹서비스 정상 상태")
@@ -152,7 +421,7 @@ class WebServiceConnector:
             else:
                 logger.warning(f"⚠️ 웹서비스 상태 이상: HTTP {response.status_code}")
                 return False
-                
+        
         except Exception as e:
             logger.error(f"❌ 웹서비스 연결 실패: {e}")
             return False
@@ -166,7 +435,7 @@ class WebServiceConnector:
         """
         try:
             endpoint = f"{self.web_service_url}/api/results"
-            response = self.session.get(endpoint, timeout=30)
+            response = self.http.get(endpoint, provider="WebService", headers=self.headers, timeout=30)
             
             if response.status_code == 200:
                 results = response.json()
@@ -175,27 +444,20 @@ class WebServiceConnector:
             else:
                 logger.error(f"❌ 결과 조회 실패: HTTP {response.status_code}")
                 return []
-                
+        
         except Exception as e:
             logger.error(f"❌ 결과 조회 중 오류: {e}")
             return []
     
     def _log_sync_result(self, sync_type: str, records_count: int, success: bool, error_message: str = None):
         """동기화 로그 기록"""
-        import sqlite3
-        
         try:
-            conn = sqlite3.connect(self.db.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO sync_log (sync_type, records_count, success, error_message)
-                VALUES (?, ?, ?, ?)
-            """, (sync_type, records_count, success, error_message))
-            
-            conn.commit()
-            conn.close()
-            
+            with self.db.connection() as conn:
+                conn.execute("""
+                    INSERT INTO sync_log (sync_type, records_count, success, error_message)
+                    VALUES (?, ?, ?, ?)
+                """, (sync_type, records_count, success, error_message))
+        
         except Exception as e:
             logger.error(f"로그 기록 실패: {e}")
     
@@ -203,13 +465,16 @@ class WebServiceConnector:
         """스케줄된 동기화 실행"""
         logger.info("⏰ 스케줄된 동기화 시작")
         
+        if self._circuit_open():
+            return
+        
         # 웹서비스 상태 확인
         if not self.check_web_service_status():
             logger.error("❌ 웹서비스 연결 불가로 동기화 중단")
             return
         
-        # 배치 전송
-        results = self.send_batch_to_web_service()
+        # 일괄 전송 (미지원 서버면 개별 전송으로 대체)
+        results = self.send_bulk_to_web_service()
         
         if results['success'] > 0:
             logger.info(f"🎉 동기화 완료: {results['success']}개 전송 성공")
@@ -221,7 +486,7 @@ class ScheduledSyncManager:
     
     def __init__(self, connector: WebServiceConnector):
         self.connector = connector
-        
+    
     def setup_schedules(self, 
                        interval_minutes: int = 30, 
                        batch_size: int = 10,
@@ -239,6 +504,8 @@ class ScheduledSyncManager:
         logger.info(f"   - 배치 크기: {batch_size}개")
         logger.info(f"   - 전체 동기화: 매일 {daily_full_sync_hour}시")
         
+        import schedule
+        
         # 정기 동기화 (30분마다)
         schedule.every(interval_minutes).minutes.do(
             lambda: self.connector.send_batch_to_web_service(batch_size)
@@ -246,7 +513,7 @@ class ScheduledSyncManager:
         
         # 전체 동기화 (매일 새벽 2시)
         schedule.every().day.at(f"{daily_full_sync_hour:02d}:00").do(
-            lambda: self.connector.send_batch_to_web_service(100)  # 더 큰 배치
+            lambda: self.connector.send_bulk_to_web_service(1000)  # 더 큰 배치, 일괄 엔드포인트 사용
         )
         
         # 상태 체크 (매시간)
@@ -256,63 +523,98 @@ class ScheduledSyncManager:
         """무한 루프로 스케줄 실행"""
         logger.info("🔄 스케줄러 시작 (Ctrl+C로 중단)")
         
+        import schedule
+        
         try:
             while True:
                 schedule.run_pending()
                 time.sleep(60)  # 1분마다 스케줄 확인
-                
+        
         except KeyboardInterrupt:
             logger.info("⏸️ 스케줄러 중단됨")
 
+def _ask(prompt: str, default: str = "") -> str:
+    """터미널에서 직접 실행한 경우만 입력을 받음 (파이프/서비스 실행이면 기본값)"""
+    if not sys.stdin.isatty():
+        return default
+    return input(prompt).strip() or default
+
+def _print_send_results(results: Dict[str, int], connector: WebServiceConnector):
+    print(f"\n📊 전송 결과:")
+    if 'requests' in results:
+        print(f"   전송: {results['sent']}개 (요청 {results['requests']}회)")
+    else:
+        print(f"   전송: {results['sent']}개")
+    print(f"   성공: {results['success']}개")
+    print(f"   실패: {results['failed']}개")
+    print(f"   보류: {results['deferred']}개 (서킷: {connector.get_circuit_stats()['state']})")
+    
+    # 호출한 쪽(Next.js)에서 파싱할 한 줄
+    print(f"RESULT_JSON:{json.dumps(results, ensure_ascii=False)}")
+
 def main():
-    """메인 실행 함수"""
+    """
+    메인 실행 함수
+    
+    인자/환경 변수(WEB_SERVICE_URL, WEB_SERVICE_API_KEY)로 지정하지 않은 값만 터미널에서 물어보고,
+    파이프나 서비스로 실행되면 기본값으로 바로 실행한다.
+    """
+    logging.basicConfig(level=logging.INFO)
+    
+    parser = argparse.ArgumentParser(description="YouTube 광고 분석 웹서비스 연동 도구")
+    parser.add_argument('--url', default=os.getenv('WEB_SERVICE_URL') or None, help="웹서비스 URL")
+    parser.add_argument('--api-key', default=os.getenv('WEB_SERVICE_API_KEY') or None, help="웹서비스 API 키")
+    parser.add_argument('--mode', choices=['1', '2', '3', '4'], default=None,
+                        help="1: 즉시 배치 전송, 2: 스케줄된 자동 동기화, 3: DB 상태 확인, 4: 일괄 전송")
+    parser.add_argument('--batch-size', type=int, default=None, help="배치 크기")
+    parser.add_argument('--interval', type=int, default=None, help="동기화 간격 (분, 모드 2)")
+    args = parser.parse_args()
+    
     print("🌐 YouTube 광고 분석 웹서비스 연동 도구")
     print("=" * 50)
     
     # 설정 입력
-    web_service_url = input("🔗 웹서비스 URL을 입력하세요: ").strip()
+    web_service_url = args.url or _ask("🔗 웹서비스 URL을 입력하세요: ")
     if not web_service_url:
         web_service_url = "http://localhost:8000"  # 기본값
         print(f"   기본값 사용: {web_service_url}")
     
-    api_key = input("🔑 웹서비스 API 키 (선택사항): ").strip() or None
+    api_key = args.api_key or _ask("🔑 웹서비스 API 키 (선택사항): ") or None
     
     # 연동기 초기화
     connector = WebServiceConnector(web_service_url, api_key)
     
-    # 웹서비스 상태 확인
-    if not connector.check_web_service_status():
-        print("❌ 웹서비스에 연결할 수 없습니다. URL을 확인해주세요.")
-        return
-    
     # 실행 모드 선택
-    print(f"\n실행 모드를 선택하세요:")
-    print(f"1. 즉시 배치 전송")
-    print(f"2. 스케줄된 자동 동기화")
-    print(f"3. DB 상태 확인")
+    mode = args.mode
+    if mode is None:
+        print(f"\n실행 모드를 선택하세요:")
+        print(f"1. 즉시 배치 전송")
+        print(f"2. 스케줄된 자동 동기화")
+        print(f"3. DB 상태 확인")
+        print(f"4. 일괄 전송 (/api/analyze/batch)")
+        mode = _ask("선택 (1-4, 기본값: 1): ", "1")
     
-    mode = input("선택 (1-3): ").strip()
+    # DB 상태 확인은 웹서비스 연결 없이도 가능
+    if mode != "3" and not connector.check_web_service_status():
+        print("❌ 웹서비스에 연결할 수 없습니다. URL을 확인해주세요.")
+        return
     
     if mode == "1":
         # 즉시 전송
-        batch_size = int(input("배치 크기 (기본값: 10): ") or "10")
+        batch_size = args.batch_size or int(_ask("배치 크기 (기본값: 10): ", "10"))
         results = connector.send_batch_to_web_service(batch_size)
-        
-        print(f"\n📊 전송 결과:")
-        print(f"   전송: {results['sent']}개")
-        print(f"   성공: {results['success']}개")
-        print(f"   실패: {results['failed']}개")
-        
+        _print_send_results(results, connector)
+    
     elif mode == "2":
         # 스케줄된 동기화
         manager = ScheduledSyncManager(connector)
         
-        interval = int(input("동기화 간격(분, 기본값: 30): ") or "30")
-        batch_size = int(input("배치 크기 (기본값: 10): ") or "10")
+        interval = args.interval or int(_ask("동기화 간격(분, 기본값: 30): ", "30"))
+        batch_size = args.batch_size or int(_ask("배치 크기 (기본값: 10): ", "10"))
         
         manager.setup_schedules(interval, batch_size)
         manager.run_forever()
-        
+    
     elif mode == "3":
         # DB 상태 확인
         stats = connector.db.get_statistics()
@@ -324,10 +626,8 @@ def main():
         print(f"   분석 실패: {stats['failed']}개")
         
         # 최근 동기화 로그 확인
-        import sqlite3
         try:
-            conn = sqlite3.connect(connector.db.db_path)
-            cursor = conn.cursor()
+            cursor = connector.db.connection().cursor()
             
             cursor.execute("""
                 SELECT sync_type, records_count, success, sync_at
@@ -342,12 +642,17 @@ def main():
                 for log in logs:
                     status = "✅" if log[2] else "❌"
                     print(f"   {status} {log[0]}: {log[1]}개 ({log[3]})")
-            
-            conn.close()
-            
+        
         except Exception as e:
             print(f"   로그 조회 실패: {e}")
     
+    elif mode == "4":
+        # 일괄 전송
+        default_size = str(Config.WEB_SERVICE_BULK_SIZE * 4)
+        batch_size = args.batch_size or int(_ask(f"배치 크기 (기본값: {default_size}): ", default_size))
+        results = connector.send_bulk_to_web_service(batch_size)
+        _print_send_results(results, connector)
+    
     else:
         print("❌ 잘못된 선택입니다.")
 
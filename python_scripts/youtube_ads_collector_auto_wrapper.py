@@ -1,17 +1,47 @@
 #!/usr/bin/env python3
 """
 완전 자동 모드 - 사용자 입력 없이 계속 실행
+- 검색어/API 소스별 다음 수집 시각까지 잠들었다가 차례가 된 항목만 수집 (collection_scheduler.py)
+- 검색어 파일(SEARCH_QUERIES_FILE, 기본 search_queries.txt) 을 수정한 뒤 SIGHUP 을 보내면 재시작 없이 바로 반영
+  (보내지 않으면 다음 항목의 차례에 반영)
+- SIGTERM / Ctrl+C 는 진행 중인 수집을 마친 뒤 종료
 """
 import os
 import sys
 import json
-import time
+import logging
+import signal
+from collection_scheduler import CollectionScheduler
 from youtube_ads_collector_with_db import YouTubeAdsCollectorDB
 
+# 검색어 파일이 없을 때 사용할 검색어 목록
+SEARCH_QUERIES = [
+    "advertisement commercial",
+    "product promotion",
+    "brand commercial",
+    "sponsored content",
+    "new product launch",
+    "company ad",
+    "marketing video",
+    "product review",
+    "unboxing video sponsored",
+    "paid partnership",
+    "ad campaign",
+    "promotional video",
+    "infomercial",
+    "sponsored review",
+    "affiliate marketing"
+]
+
 def main():
-    # 환경변수 설정
-    serp_api_key = os.environ.get('SERPAPI_KEY', '646e6386e54a3e331122aa9460166830bcdbd35c89283b857dcf66901e11db2a')
+    logging.basicConfig(level=logging.INFO)
+    
+    # 환경변수 설정 (SerpAPI 키는 코드에 두지 않음)
+    serp_api_key = os.environ.get('SERPAPI_KEY')
     apify_token = os.environ.get('APIFY_TOKEN', '')
+    if not serp_api_key:
+        logging.error("SERPAPI_KEY 환경 변수가 설정되지 않았습니다 (export SERPAPI_KEY=...)")
+        return 1
     
     # 수집기 초기화
     collector = YouTubeAdsCollectorDB(
@@ -19,63 +49,45 @@ def main():
         serp_api_key=serp_api_key
     )
     
-    # 검색 키워드 목록
-    search_queries = [
-        "advertisement commercial",
-        "product promotion",
-        "brand commercial",
-        "sponsored content",
-        "new product launch",
-        "company ad",
-        "marketing video",
-        "product review",
-        "unboxing video sponsored",
-        "paid partnership",
-        "ad campaign",
-        "promotional video",
-        "infomercial",
-        "sponsored review",
-        "affiliate marketing"
-    ]
+    def report(results):
+        # 현재 DB 상태
+        stats = collector.get_database_stats()
+        print(f"\n📊 DB 상태: 전체 {stats['total_ads']}개, 대기 {stats['pending']}개")
+        
+        # 결과 JSON 출력
+        result_json = {
+            "success": True,
+            "total_collected": results['total_collected'],
+            "new_ads": results['new_ads'],
+            "apify": results['apify'],
+            "serpapi": results['serpapi'],
+            "skipped_queries": results['skipped_queries'],
+            "stats": stats,
+            "http_metrics": collector.get_http_metrics(),
+            "seen_filter": collector.get_seen_filter_stats(),
+            "response_cache": collector.get_cache_stats(),
+            "refresh_budget": collector.get_refresh_stats()
+        }
+        
+        print(f"RESULT_JSON:{json.dumps(result_json)}", flush=True)
+    
+    # 검색어당 50개씩, 검색어/API 소스 동시 수집
+    scheduler = CollectionScheduler(collector, SEARCH_QUERIES, max_ads_per_query=50, on_cycle=report)
+    
+    def handle_stop(signum, frame):
+        print(f"\n⏹️ 자동 수집 중단 요청 ({signal.Signals(signum).name}) - 진행 중인 수집을 마친 뒤 종료")
+        scheduler.stop()
+    
+    signal.signal(signal.SIGTERM, handle_stop)
+    signal.signal(signal.SIGINT, handle_stop)
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, lambda signum, frame: scheduler.reload())
     
     print(f"🤖 완전 자동 모드 실행")
-    print(f"🔍 검색어 {len(search_queries)}개로 계속 수집")
+    print(f"🔍 검색어 파일: {scheduler.queries_file} (없으면 기본 검색어 {len(SEARCH_QUERIES)}개)")
     
-    while True:
-        try:
-            # 현재 DB 상태
-            stats = collector.get_database_stats()
-            print(f"\n📊 DB 상태: 전체 {stats['total_ads']}개, 대기 {stats['pending']}개")
-            
-            # 수집 실행 (검색어당 50개씩)
-            results = collector.collect_all_ads(
-                search_queries=search_queries,
-                max_ads_per_query=50
-            )
-            
-            # 결과 JSON 출력
-            result_json = {
-                "success": True,
-                "total_collected": results['total_collected'],
-                "new_ads": results['new_ads'],
-                "apify": results['apify'],
-                "serpapi": results['serpapi'],
-                "skipped_queries": results['skipped_queries'],
-                "stats": collector.get_database_stats()
-            }
-            
-            print(f"RESULT_JSON:{json.dumps(result_json)}")
-            
-            # 30분 대기 후 다시 실행
-            print(f"\n💤 30분 후 다시 수집 시작...")
-            time.sleep(1800)  # 30분
-            
-        except KeyboardInterrupt:
-            print("\n⏹️ 자동 수집 중단")
-            break
-        except Exception as e:
-            print(f"❌ 오류 발생: {e}")
-            time.sleep(60)  # 오류시 1분 대기
+    scheduler.run()
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -4,118 +4,407 @@ YouTube 광고 동영상 URL 자동 수집 엔진 (DB 연동 버전)
 - 중복 호출 방지
 - 데이터베이스 누적 저장
 - 웹서비스 연동 준비
+- requests 는 실제 API 를 호출할 때 로드 (통계 조회/내보내기만 하는 프로세스는 빠르게 시작)
 """
 
-import requests
-import time
+import argparse
+import hashlib
 import json
 import os
-from typing import List, Dict, Optional
-from dataclasses import dataclass
+import sys
+import threading
+from itertools import islice
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 # 로컬 DB 모듈 import
 try:
+    from ad_records import AdBatch, AdVideoInfo
     from database_setup import YouTubeAdsDatabase
+    from config import Config
+    from http_client import get_http_client
+    from youtube_urls import canonical_url, canonicalize, is_valid_video_id
+    from seen_filter import SeenVideoFilter
+    from response_cache import ResponseCache
+    from apify_runs import ApifyRunClient
+    from json_stream import CHUNK_SIZE, iter_json_array
+    from refresh_policy import RefreshPolicy
 except ImportError:
-    print("❌ database_setup.py 파일이 필요합니다!")
+    print("❌ ad_records.py, database_setup.py, config.py, http_client.py, youtube_urls.py, seen_filter.py, response_cache.py, apify_runs.py, json_stream.py, refresh_policy.py 파일이 필요합니다!")
     exit(1)
 
-# 로깅 설정
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
-class AdVideoInfo:
-    """광고 비디오 정보를 담는 데이터 클래스"""
-    title: str
-    url: str
-    note: str
+# 기본 검색어 목록
+DEFAULT_SEARCH_QUERIES = [
+    "advertisement commercial",
+    "product promotion",
+    "brand commercial",
+    "sponsored content",
+    "new product launch",
+    "company ad",
+    "marketing video",
+    "product review"
+]
+
+class _Counted:
+    """순회한 항목 수를 세는 이터레이터 래퍼"""
+    
+    def __init__(self, iterable: Iterable):
+        self._iterator = iter(iterable)
+        self.count = 0
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        item = next(self._iterator)
+        self.count += 1
+        return item
 
 class YouTubeAdsCollectorDB:
     """YouTube 광고 동영상 URL 수집기 (DB 연동 버전)"""
     
-    def __init__(self, apify_token: Optional[str] = None, serp_api_key: Optional[str] = None, db_path: str = "youtube_ads.db"):
+    def __init__(self, apify_token: Optional[str] = None, serp_api_key: Optional[str] = None, db_path: str = "youtube_ads.db",
+                 use_seen_filter: bool = True, cache_mode: Optional[str] = None, apify_mode: Optional[str] = None):
+        """
+        Args:
+            cache_mode: API 응답 캐시 모드 'off' / 'on' / 'replay' (기본값: Config.RESPONSE_CACHE_MODE)
+            apify_mode: 'async' (실행 시작 후 폴링) / 'sync' (run-sync-get-dataset-items) (기본값: Config.APIFY_RUN_MODE)
+        """
         self.apify_token = apify_token or os.getenv('APIFY_TOKEN')
         self.serp_api_key = serp_api_key or os.getenv('SERPAPI_KEY')
         self.db = YouTubeAdsDatabase(db_path)
+        self._http = None
+        
+        # (검색어, API 소스) 별 수율 기반 재수집 간격 + 일일 호출 예산
+        self.refresh_policy = RefreshPolicy(self.db)
+        
+        # 재시작 시 이미 비용을 낸 호출은 캐시에서 재사용
+        cache_mode = cache_mode or Config.RESPONSE_CACHE_MODE
+        self.response_cache = ResponseCache(mode=cache_mode) if cache_mode != 'off' else None
+        
+        # 일괄 수집 시 Apify 실행을 한꺼번에 시작하고 끝나는 대로 읽음 (replay 는 캐시된 동기 응답만 재생)
+        self.apify_mode = 'sync' if cache_mode == 'replay' else (apify_mode or Config.APIFY_RUN_MODE)
+        self._apify_runs = None
+        
+        # 수집 사이클당 SerpAPI 페이지 예산 (사이클 밖에서는 None = 무제한)
+        self._budget_lock = threading.Lock()
+        self._save_lock = threading.Lock()  # _save_collected (기존 영상 필터는 스레드 안전하지 않음)
+        self._serpapi_pages_left = None
+        self.serpapi_pages_used = 0
+        
+        # 이미 수집된 영상은 DB 쓰기 전에 제외
+        self.seen_filter = None
+        if use_seen_filter:
+            self.seen_filter = SeenVideoFilter(self.db)
+            loaded = self.seen_filter.warm()
+            logger.info(f"🧠 기존 영상 필터 준비: {loaded}개 ({self.seen_filter.bloom.memory_bytes / 1024:.0f}KB)")
+    
+    @property
+    def http(self):
+        """공용 HttpClient (처음 API 를 호출할 때 만듦)"""
+        if self._http is None:
+            self._http = get_http_client()
+        return self._http
+    
+    @property
+    def apify_runs(self) -> Optional[ApifyRunClient]:
+        """Apify 비동기 실행 클라이언트 (토큰이 없으면 None)"""
+        if self._apify_runs is None and self.apify_token:
+            self._apify_runs = ApifyRunClient(self.apify_token, self.http, cache=self.response_cache)
+        return self._apify_runs
+    
+    def _save_collected(self, ads, search_query: str, api_source: str) -> int:
+        """
+        수집 결과 저장 (이미 있는 영상은 사전 필터로 제외하고 검색 기록은 원래 개수로 갱신)
+        
+        Apify 동기 실행 작업자 스레드도 페이지마다 저장하므로 잠금으로 한 번에 하나씩 처리한다.
+        
+        Args:
+            ads: AdVideoInfo 목록 또는 AdBatch
+        
+        Returns:
+            저장된 신규 광고 개수
+        """
+        with self._save_lock:
+            if self.seen_filter is None:
+                return self.db.save_ads(ads, search_query, api_source)
+            
+            fresh_ads = self.seen_filter.filter_new(ads)
+            new_count = self.db.save_ads(fresh_ads, search_query, api_source, total_found=len(ads))
+            video_ids = fresh_ads.video_ids if isinstance(fresh_ads, AdBatch) else [ad.video_id for ad in fresh_ads]
+            self.seen_filter.add(video_id for video_id in video_ids if video_id)
+            return new_count
+    
+    def _provider_request(self, provider: str, method: str, url: str, context: str = None, **kwargs):
+        """
+        API 소스 호출 (응답 캐시 경유)
+        
+        Args:
+            context: 요청 내용 외에 캐시 키를 구분할 값 (검색어 등)
+        """
+        def send():
+            return self.http.request(method, url, provider=provider, **kwargs)
+        
+        if self.response_cache is None:
+            return send()
+        return self.response_cache.fetch(provider, method, url, send, params=kwargs.get('params'),
+                                         body=kwargs.get('json'), context=context,
+                                         stream=kwargs.get('stream', False))
+    
+    def collect_ads_with_apify(self, search_query: str, max_ads: int = 50, check_freshness: bool = True) -> AdBatch:
+        """
+        Apify YouTube Ads Scraper를 사용한 광고 수집
+        
+        Args:
+            check_freshness: False 면 재수집 간격 확인 생략 (호출자가 refresh_policy 로 확인한 경우)
         
-    def collect_ads_with_apify(self, search_query: str, max_ads: int = 50) -> List[AdVideoInfo]:
-        """Apify YouTube Ads Scraper를 사용한 광고 수집"""
+        Returns:
+            AdBatch (AdVideoInfo 를 순회/len/인덱싱 가능한 컬럼형 목록)
+        """
+        ad_videos = AdBatch()
+        if self._apify_ready(search_query, check_freshness):
+            for page in self._iter_apify_sync_pages(search_query, max_ads):
+                ad_videos.extend(page)
+        return ad_videos
+    
+    def save_ads_with_apify(self, search_query: str, max_ads: int = 50,
+                            check_freshness: bool = True) -> Tuple[int, int]:
+        """
+        Apify 동기 실행으로 수집하면서 APIFY_DATASET_PAGE_SIZE 개씩 바로 저장 (응답 크기와 무관한 메모리)
+        
+        Returns:
+            (수집 개수, 저장된 신규 광고 개수)
+        """
+        collected = new_count = 0
+        if self._apify_ready(search_query, check_freshness):
+            for page in self._iter_apify_sync_pages(search_query, max_ads):
+                new_count += self._save_collected(page, search_query, "Apify")
+                collected += len(page)
+        return collected, new_count
+    
+    def _apify_ready(self, search_query: str, check_freshness: bool) -> bool:
+        """토큰과 재수집 간격 확인 (동기 실행 공통)"""
         if not self.apify_token:
             logger.error("Apify token이 필요합니다.")
-            return []
-            
-        # 🔥 중복 호출 방지 체크
-        if not self.db.should_collect(search_query, "Apify", hours=24):
-            logger.info(f"⏭️ Apify '{search_query}' 수집 건너뛰기 (24시간 이내 수집됨)")
-            return []
+            return False
         
-        url = "https://api.apify.com/v2/acts/xtech~youtube-ads-scraper/run-sync-get-dataset-items"
+        # 🔥 중복 호출 방지 체크 (수율 기반 재수집 간격 + 일일 예산)
+        if check_freshness and not self.refresh_policy.due([search_query], "Apify")[search_query]:
+            logger.info(f"⏭️ Apify '{search_query}' 수집 건너뛰기 (재수집 간격 이내 또는 일일 예산 소진)")
+            return False
+        return True
+    
+    def _iter_apify_sync_pages(self, search_query: str, max_ads: int) -> Iterator[AdBatch]:
+        """
+        run-sync-get-dataset-items 응답을 읽으면서 APIFY_DATASET_PAGE_SIZE 개씩 AdBatch 로 반환
+        
+        오류가 나면 기록하고 멈춘다 (이미 넘겨준 페이지는 그대로 유효).
+        """
+        import requests
+        
+        url = f"{Config.APIFY_BASE_URL}/acts/{Config.APIFY_ACTOR_ID}/run-sync-get-dataset-items"
         headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.apify_token}"
         }
-        data = {"max_ads": max_ads}
+        data = self._apify_input(max_ads)
+        params = {"fields": ",".join(Config.APIFY_ITEM_FIELDS)}
         
+        total = 0
         try:
             logger.info(f"📡 Apify로 '{search_query}' 수집 중...")
-            response = requests.post(url, headers=headers, json=data, timeout=300)
-            response.raise_for_status()
-            
-            ads_data = response.json()
-            logger.info(f"   📥 수신된 데이터: {len(ads_data)}개")
-            
-            ad_videos = []
-            for ad in ads_data:
-                if isinstance(ad, dict):
-                    video_id = ad.get('video_id', '')
-                    youtube_url = f"https://www.youtube.com/watch?v={video_id}" if video_id else ""
-                    
-                    title = ""
-                    if 'youtubeData' in ad and 'title' in ad['youtubeData']:
-                        title = ad['youtubeData']['title'].strip()
-                    
-                    note_parts = [f"✅ Apify 확실한 광고"]
-                    if 'advertiser_id' in ad:
-                        note_parts.append(f"광고주ID: {ad['advertiser_id']}")
-                    if 'youtubeStatistics' in ad:
-                        stats = ad['youtubeStatistics']
-                        if 'viewCount' in stats:
-                            note_parts.append(f"조회수: {stats['viewCount']}")
-                    
-                    note = " | ".join(note_parts)
-                    
-                    if youtube_url and title:
-                        ad_video = AdVideoInfo(
-                            title=title[:150],
-                            url=youtube_url,
-                            note=note[:200]
-                        )
-                        ad_videos.append(ad_video)
+            response = self._provider_request("Apify", "POST", url, context=search_query,
+                                              headers=headers, params=params, json=data, timeout=300, stream=True)
+            try:
+                response.raise_for_status()
+                
+                # 항목을 하나씩 디코딩하면서 바로 AdVideoInfo 로 변환 (원본 항목 목록을 만들지 않음)
+                chunks = response.iter_content(CHUNK_SIZE)
+                items = _Counted(iter_json_array(chunks))
+                ads = self._iter_apify_ads(items)
+                while True:
+                    page = AdBatch(islice(ads, Config.APIFY_DATASET_PAGE_SIZE))
+                    if not page:
+                        break
+                    total += len(page)
+                    yield page
+                for _ in chunks:
+                    pass  # 배열 뒤에 남은 본문까지 읽어야 응답 캐시에 저장됨
+            finally:
+                response.close()
+            logger.info(f"   📥 수신된 데이터: {items.count}개")
             
-            logger.info(f"   ✅ 처리된 광고: {len(ad_videos)}개")
-            return ad_videos
+            if not total:
+                self.db.mark_collected(search_query, "Apify")  # 결과 없는 호출도 수율 0 으로 집계
             
+            logger.info(f"   ✅ 처리된 광고: {total}개")
+        
         except requests.exceptions.RequestException as e:
             logger.error(f"Apify API 요청 실패: {e}")
-            return []
         except Exception as e:
             logger.error(f"Apify 데이터 처리 중 오류: {e}")
-            return []
     
-    def collect_ads_with_serpapi(self, search_query: str) -> List[AdVideoInfo]:
-        """SerpAPI를 사용한 YouTube 광고 검색"""
+    @staticmethod
+    def _apify_input(max_ads: int) -> dict:
+        """액터 입력 (동기/비동기 실행 공통)"""
+        return {"max_ads": max_ads}
+    
+    def _parse_apify_items(self, items: list) -> AdBatch:
+        """Apify 데이터셋 항목 → AdBatch (URL 과 제목이 있는 항목만)"""
+        return AdBatch(self._iter_apify_ads(items))
+    
+    def _iter_apify_ads(self, items: Iterable) -> Iterator[AdVideoInfo]:
+        """Apify 데이터셋 항목을 하나씩 AdVideoInfo 로 변환 (필요한 필드만 꺼냄)"""
+        for ad in items:
+            if not isinstance(ad, dict):
+                continue
+            
+            video_id = ad.get('video_id', '')
+            if not is_valid_video_id(video_id):
+                continue
+            title = ((ad.get('youtubeData') or {}).get('title') or '').strip()
+            if not title:
+                continue
+            
+            note_parts = [f"✅ Apify 확실한 광고"]
+            if 'advertiser_id' in ad:
+                note_parts.append(f"광고주ID: {ad['advertiser_id']}")
+            stats = ad.get('youtubeStatistics') or {}
+            if 'viewCount' in stats:
+                note_parts.append(f"조회수: {stats['viewCount']}")
+            
+            yield AdVideoInfo(
+                title=title[:150],
+                url=canonical_url(video_id),
+                note=" | ".join(note_parts)[:200],
+                video_id=video_id
+            )
+    
+    def _collect_apify_runs(self, search_queries: List[str], max_ads_per_query: int, results: dict) -> Dict[str, int]:
+        """
+        Apify 비동기 실행으로 여러 검색어를 한꺼번에 수집 (데이터셋 페이지가 도착하는 대로 저장, results 를 갱신)
+        
+        Returns:
+            검색어별 수집 개수
+        """
+        collected = {query: 0 for query in search_queries}
+        if not search_queries:
+            return collected
+        
+        logger.info(f"📡 Apify 비동기 실행 {len(search_queries)}개 시작")
+        inputs = {query: self._apify_input(max_ads_per_query) for query in search_queries}
+        for query, items in self.apify_runs.run_all(inputs):
+            if not items:
+                self.db.mark_collected(query, "Apify")  # 결과 없이 성공한 실행도 수율 0 으로 집계
+                continue
+            try:
+                ads = self._parse_apify_items(items)
+            except Exception as e:
+                logger.error(f"Apify 데이터 처리 중 오류: {e}")
+                continue
+            if not ads:
+                continue
+            new_count = self._save_collected(ads, query, "Apify")
+            results['total_collected'] += len(ads)
+            results['new_ads'] += new_count
+            results['apify'] += len(ads)
+            collected[query] += len(ads)
+            print(f"   ✅ [Apify] '{query}': {len(ads)}개 수집")
+        return collected
+    
+    def collect_ads_with_serpapi(self, search_query: str, check_freshness: bool = True,
+                                 max_pages: int = None) -> List[AdVideoInfo]:
+        """
+        SerpAPI를 사용한 YouTube 광고 검색 (페이지 토큰 기반 증분 수집)
+        
+        첫 페이지에 새 영상이 있으면 다음 페이지로 계속 진행하고, 모든 영상이 이미 DB 에 있는
+        페이지를 만나면 멈춘다. 첫 페이지가 모두 알려진 영상이면 지난번에 예산이 떨어져 멈춘
+        위치(search_history.last_cursor)부터 이어서 더 깊이 본다.
+        
+        Args:
+            check_freshness: False 면 재수집 간격 확인 생략 (호출자가 refresh_policy 로 확인한 경우)
+            max_pages: 이번 호출에서 가져올 최대 페이지 수 (기본값: Config.SERPAPI_MAX_PAGES)
+        """
         if not self.serp_api_key:
             logger.error("SerpAPI 키가 필요합니다.")
             return []
         
-        # 🔥 중복 호출 방지 체크
-        if not self.db.should_collect(search_query, "SerpAPI", hours=6):  # SerpAPI는 6시간
-            logger.info(f"⏭️ SerpAPI '{search_query}' 수집 건너뛰기 (6시간 이내 수집됨)")
+        # 🔥 중복 호출 방지 체크 (수율 기반 재수집 간격 + 일일 예산)
+        if check_freshness and not self.refresh_policy.due([search_query], "SerpAPI")[search_query]:
+            logger.info(f"⏭️ SerpAPI '{search_query}' 수집 건너뛰기 (재수집 간격 이내 또는 일일 예산 소진)")
             return []
         
+        import requests
+        
+        max_pages = max_pages or Config.SERPAPI_MAX_PAGES
+        saved_token, saved_fingerprint = self.db.get_search_cursor(search_query, "SerpAPI")
+        
+        ad_videos = []
+        seen_ids = set()
+        page_token = None      # 이번에 요청할 페이지 (None = 첫 페이지)
+        next_token = None      # 다음 수집 때 이어서 볼 페이지
+        fingerprint = saved_fingerprint
+        pages = 0              # 받은 페이지 수
+        
+        try:
+            logger.info(f"📡 SerpAPI로 '{search_query}' 수집 중...")
+            
+            while pages < max_pages and self._reserve_serpapi_page():
+                data = self._fetch_serpapi_page(search_query, page_token)
+                if data is None:
+                    if page_token and page_token == saved_token:
+                        next_token = None  # 저장된 토큰이 만료됨 → 다음에는 처음부터
+                    break
+                pages += 1
+                
+                page_ads = self._parse_serpapi_page(data)
+                page_token = data.get("serpapi_pagination", {}).get("next_page_token")
+                ad_videos.extend(page_ads)
+                
+                if pages == 1:
+                    fingerprint = self._serpapi_fingerprint(page_ads)
+                
+                # 이 페이지에 DB 에도, 앞 페이지에도 없던 영상이 있는지
+                page_ids = {ad.video_id for ad in page_ads}
+                unseen = page_ids - seen_ids
+                seen_ids |= page_ids
+                has_new = bool(unseen) and bool(unseen - self.db.existing_video_ids(unseen))
+                
+                if not page_token:
+                    next_token = None
+                    break
+                if has_new and not (pages == 1 and fingerprint == saved_fingerprint):
+                    # 새 영상이 있으면 다음 페이지도 새 영상일 수 있음 (예산이 떨어지면 여기서 이어서)
+                    next_token = page_token
+                    continue
+                if pages == 1 and saved_token:
+                    # 첫 페이지는 변화 없음 → 지난번에 멈춘 깊이부터 이어서
+                    logger.info(f"   ↪️ 첫 페이지 변화 없음, 저장된 위치부터 이어서 수집")
+                    page_token = next_token = saved_token
+                    continue
+                # 모두 알려진 페이지 → 더 볼 필요 없음
+                next_token = None
+                break
+            
+            if pages:
+                self.db.update_search_cursor(search_query, "SerpAPI", next_token, fingerprint)
+            
+            logger.info(f"   ✅ 수집된 광고: {len(ad_videos)}개 ({pages}페이지)")
+            return ad_videos
+        
+        except requests.exceptions.RequestException as e:
+            logger.error(f"SerpAPI 요청 실패: {e}")
+            return ad_videos
+        except Exception as e:
+            logger.error(f"SerpAPI 데이터 처리 중 오류: {e}")
+            return ad_videos
+    
+    def _fetch_serpapi_page(self, search_query: str, page_token: Optional[str] = None) -> Optional[dict]:
+        """SerpAPI 검색 결과 한 페이지 (실패 시 None)"""
         url = "https://serpapi.com/search"
         params = {
             "engine": "youtube",
@@ -123,181 +412,382 @@ class YouTubeAdsCollectorDB:
             "api_key": self.serp_api_key,
             "num": 20
         }
+        if page_token:
+            params["sp"] = page_token
         
-        try:
-            logger.info(f"📡 SerpAPI로 '{search_query}' 수집 중...")
-            response = requests.get(url, params=params, timeout=60)
+        response = self._provider_request("SerpAPI", "GET", url, params=params)
+        
+        if response.status_code != 200:
+            logger.error(f"SerpAPI 요청 실패: HTTP {response.status_code}")
+            return None
+        
+        data = response.json()
+        if "error" in data:
+            logger.error(f"SerpAPI 오류: {data['error']}")
+            return None
+        return data
+    
+    def _parse_serpapi_page(self, data: dict) -> List[AdVideoInfo]:
+        """SerpAPI 응답에서 광고 / 광고성 영상 추출"""
+        ad_videos = []
+        
+        # 실제 광고 결과 처리
+        ads_results = data.get("ads_results", [])
+        for ad in ads_results:
+            title = ad.get('title', 'Unknown Title').strip()
+            link, video_id = canonicalize(ad.get('link', ''))
             
-            if response.status_code == 200:
-                data = response.json()
-                
-                if "error" in data:
-                    logger.error(f"SerpAPI 오류: {data['error']}")
-                    return []
+            if link and video_id:  # video ID 가 없는 링크(채널/재생목록 등)는 저장하지 않음
+                note_parts = [f"📢 SerpAPI 광고"]
+                if 'views' in ad:
+                    note_parts.append(f"조회수: {ad['views']}")
+                if 'channel' in ad and 'name' in ad['channel']:
+                    note_parts.append(f"채널: {ad['channel']['name']}")
                 
-                ad_videos = []
+                note = " | ".join(note_parts)
                 
-                # 실제 광고 결과 처리
-                ads_results = data.get("ads_results", [])
-                for ad in ads_results:
-                    title = ad.get('title', 'Unknown Title').strip()
-                    link = ad.get('link', '')
+                ad_video = AdVideoInfo(
+                    title=title[:150],
+                    url=link,
+                    note=note[:200],
+                    video_id=video_id
+                )
+                ad_videos.append(ad_video)
+        
+        # 광고성 키워드 비디오 필터링
+        video_results = data.get("video_results", [])
+        ad_keywords = ['ad', 'advertisement', 'commercial', 'sponsored', 'promo', 'review', 'unboxing']
+        
+        for video in video_results:
+            title = video.get('title', '').strip()
+            link, video_id = canonicalize(video.get('link', ''))
+            
+            if any(keyword in title.lower() for keyword in ad_keywords):
+                if link and video_id:
+                    note_parts = [f"🎬 SerpAPI 광고성 콘텐츠"]
+                    if 'views' in video:
+                        note_parts.append(f"조회수: {video['views']}")
+                    if 'channel' in video and 'name' in video['channel']:
+                        note_parts.append(f"채널: {video['channel']['name']}")
                     
-                    if link and 'youtube.com' in link:
-                        note_parts = [f"📢 SerpAPI 광고"]
-                        if 'views' in ad:
-                            note_parts.append(f"조회수: {ad['views']}")
-                        if 'channel' in ad and 'name' in ad['channel']:
-                            note_parts.append(f"채널: {ad['channel']['name']}")
-                        
-                        note = " | ".join(note_parts)
-                        
-                        ad_video = AdVideoInfo(
-                            title=title[:150],
-                            url=link,
-                            note=note[:200]
-                        )
-                        ad_videos.append(ad_video)
-                
-                # 광고성 키워드 비디오 필터링
-                video_results = data.get("video_results", [])
-                ad_keywords = ['ad', 'advertisement', 'commercial', 'sponsored', 'promo', 'review', 'unboxing']
-                
-                for video in video_results:
-                    title = video.get('title', '').strip()
-                    link = video.get('link', '')
+                    note = " | ".join(note_parts)
                     
-                    if any(keyword in title.lower() for keyword in ad_keywords):
-                        if link and 'youtube.com' in link:
-                            note_parts = [f"🎬 SerpAPI 광고성 콘텐츠"]
-                            if 'views' in video:
-                                note_parts.append(f"조회수: {video['views']}")
-                            if 'channel' in video and 'name' in video['channel']:
-                                note_parts.append(f"채널: {video['channel']['name']}")
-                            
-                            note = " | ".join(note_parts)
-                            
-                            ad_video = AdVideoInfo(
-                                title=title[:150],
-                                url=link,
-                                note=note[:200]
-                            )
-                            ad_videos.append(ad_video)
-                
-                logger.info(f"   ✅ 수집된 광고: {len(ad_videos)}개")
-                return ad_videos
-                
-            else:
-                logger.error(f"SerpAPI 요청 실패: HTTP {response.status_code}")
-                return []
-                
-        except requests.exceptions.RequestException as e:
-            logger.error(f"SerpAPI 요청 실패: {e}")
-            return []
-        except Exception as e:
-            logger.error(f"SerpAPI 데이터 처리 중 오류: {e}")
-            return []
+                    ad_video = AdVideoInfo(
+                        title=title[:150],
+                        url=link,
+                        note=note[:200],
+                        video_id=video_id
+                    )
+                    ad_videos.append(ad_video)
+        
+        return ad_videos
+    
+    @staticmethod
+    def _serpapi_fingerprint(ads: List[AdVideoInfo]) -> str:
+        """첫 페이지 결과 지문 (순서와 무관한 영상 URL 집합의 해시)"""
+        return hashlib.sha1('\n'.join(sorted(ad.url for ad in ads)).encode('utf-8')).hexdigest()
+    
+    def _reserve_serpapi_page(self) -> bool:
+        """수집 사이클 전체의 SerpAPI 페이지 예산에서 1페이지 차감 (사이클 밖의 단독 호출은 무제한)"""
+        with self._budget_lock:
+            self.serpapi_pages_used += 1
+            if self._serpapi_pages_left is None:
+                return True
+            if self._serpapi_pages_left <= 0:
+                self.serpapi_pages_used -= 1
+                return False
+            self._serpapi_pages_left -= 1
+            return True
+    
+    def _start_page_budget(self):
+        """수집 사이클 시작: SerpAPI 페이지 예산 초기화"""
+        with self._budget_lock:
+            self._serpapi_pages_left = Config.SERPAPI_PAGE_BUDGET
+            self.serpapi_pages_used = 0
+    
+    def _end_page_budget(self):
+        with self._budget_lock:
+            self._serpapi_pages_left = None
+    
+    def _due_queries(self, search_queries: List[str], api_source: str) -> Dict[str, bool]:
+        """재수집 간격이 지나고 일일 예산 안에 드는 검색어 조회 (수율 기반 간격, 한 번의 인덱스 조회)"""
+        due = self.refresh_policy.due(search_queries, api_source)
+        skipped = [query for query, is_due in due.items() if not is_due]
+        if skipped:
+            logger.info(f"⏭️ {api_source} {len(skipped)}개 검색어 건너뛰기 (재수집 간격 이내 또는 일일 예산 소진)")
+        return due
+    
+    def _sample_yields(self):
+        """이번 수집 결과를 수율/일일 호출 수에 반영"""
+        for api_source, enabled in (("Apify", self.apify_token), ("SerpAPI", self.serp_api_key)):
+            if enabled:
+                self.refresh_policy.refresh(api_source)
+    
+    def _select_due(self, search_queries: List[str], api_source: str,
+                    due_queries: Optional[Dict[str, List[str]]]) -> Dict[str, bool]:
+        """수집할 검색어 (호출자가 지정했으면 그대로, 아니면 재수집 간격 확인)"""
+        if due_queries is None:
+            return self._due_queries(search_queries, api_source)
+        return {query: True for query in due_queries.get(api_source, [])}
     
     def collect_all_ads(self, search_queries: List[str] = None, max_ads_per_query: int = 30) -> Dict[str, int]:
         """
         모든 방법으로 광고 수집 및 DB 저장
         
         Returns:
-            {'total_collected': 50, 'new_ads': 25, 'apify': 20, 'serpapi': 5}
+            {'total_collected': 50, 'new_ads': 25, 'apify': 20, 'serpapi': 5, 'serpapi_pages': 8}
         """
         if search_queries is None:
-            search_queries = [
-                "advertisement commercial",
-                "product promotion",
-                "brand commercial",
-                "sponsored content",
-                "new product launch",
-                "company ad",
-                "marketing video",
-                "product review"
-            ]
+            search_queries = DEFAULT_SEARCH_QUERIES
         
         results = {
             'total_collected': 0,
             'new_ads': 0,
             'apify': 0,
             'serpapi': 0,
-            'skipped_queries': 0
+            'skipped_queries': 0,
+            'serpapi_pages': 0
         }
         
         logger.info(f"🚀 광고 수집 시작 - {len(search_queries)}개 검색어")
         
+        # 🔥 중복 호출 방지 체크 (검색어 전체를 한 번에 조회)
+        apify_due = self._due_queries(search_queries, "Apify") if self.apify_token else {}
+        serpapi_due = self._due_queries(search_queries, "SerpAPI") if self.serp_api_key else {}
+        
+        # Apify 비동기 실행: 검색어별로 기다리지 않고 전부 시작한 뒤 끝나는 대로 저장
+        apify_collected = {}
+        if self.apify_mode == 'async' and apify_due:
+            apify_collected = self._collect_apify_runs([q for q in search_queries if apify_due.get(q)],
+                                                       max_ads_per_query, results)
+            apify_due = {}
+        
+        self._start_page_budget()
+        try:
+            self._collect_queries_sequential(search_queries, max_ads_per_query, apify_due, serpapi_due, results,
+                                             apify_collected)
+        finally:
+            self._end_page_budget()
+        
+        results['serpapi_pages'] = self.serpapi_pages_used
+        self._sample_yields()
+        return results
+    
+    def _collect_queries_sequential(self, search_queries: List[str], max_ads_per_query: int,
+                                    apify_due: Dict[str, bool], serpapi_due: Dict[str, bool], results: dict,
+                                    already_collected: Dict[str, int] = None):
+        """
+        collect_all_ads 의 검색어별 순차 수집 (results 를 갱신)
+        
+        Args:
+            already_collected: 앞서 비동기 실행으로 수집한 검색어별 개수 (건너뛴 검색어 집계용)
+        """
+        already_collected = already_collected or {}
         for i, query in enumerate(search_queries, 1):
             print(f"\n📍 [{i}/{len(search_queries)}] 검색어: '{query}'")
             
-            collected_this_query = 0
+            collected_this_query = already_collected.get(query, 0)
             
             # Apify 수집
-            if self.apify_token:
-                apify_ads = self.collect_ads_with_apify(query, max_ads_per_query)
-                if apify_ads:
-                    new_count = self.db.save_ads(apify_ads, query, "Apify")
-                    results['total_collected'] += len(apify_ads)
-                    results['new_ads'] += new_count
-                    results['apify'] += len(apify_ads)
-                    collected_this_query += len(apify_ads)
-                    time.sleep(2)  # API 요청 간격
+            if apify_due.get(query):
+                apify_count, new_count = self.save_ads_with_apify(query, max_ads_per_query, check_freshness=False)
+                results['total_collected'] += apify_count
+                results['new_ads'] += new_count
+                results['apify'] += apify_count
+                collected_this_query += apify_count
             
             # SerpAPI 수집
-            if self.serp_api_key:
-                serpapi_ads = self.collect_ads_with_serpapi(query)
+            if serpapi_due.get(query):
+                serpapi_ads = self.collect_ads_with_serpapi(query, check_freshness=False)
                 if serpapi_ads:
-                    new_count = self.db.save_ads(serpapi_ads, query, "SerpAPI")
+                    new_count = self._save_collected(serpapi_ads, query, "SerpAPI")
                     results['total_collected'] += len(serpapi_ads)
                     results['new_ads'] += new_count
                     results['serpapi'] += len(serpapi_ads)
                     collected_this_query += len(serpapi_ads)
-                    time.sleep(1)  # API 요청 간격
             
             if collected_this_query == 0:
                 results['skipped_queries'] += 1
                 print(f"   ⏭️ 건너뛰기 (최근 수집됨 또는 오류)")
             else:
                 print(f"   ✅ 이번 쿼리 수집: {collected_this_query}개")
+    
+    def collect_all_ads_concurrent(self, search_queries: List[str] = None, max_ads_per_query: int = 30,
+                                   provider_concurrency: Optional[Dict[str, int]] = None,
+                                   due_queries: Optional[Dict[str, List[str]]] = None) -> Dict[str, int]:
+        """
+        검색어와 API 소스를 동시에 수집 (API 소스별 스레드 풀)
+        
+        collect_all_ads 와 같은 결과 dict 를 반환하지만, 한 사이클의 소요 시간이
+        모든 호출의 합이 아니라 가장 느린 호출에 가까워진다.
+        광고 저장은 호출 스레드에서 수행하고, Apify 동기 실행만 작업자 스레드가 페이지마다 저장한다.
+        
+        Args:
+            search_queries: 검색어 목록
+            max_ads_per_query: 검색어당 최대 수집 개수 (Apify)
+            provider_concurrency: API 소스별 동시 요청 수 (기본값: Config.PROVIDER_CONCURRENCY)
+            due_queries: API 소스별로 수집할 검색어 {'SerpAPI': [...]} - 지정하면 재수집 간격 확인을 생략
+                         (수집 스케줄러처럼 호출자가 이미 차례를 계산한 경우)
+        
+        Returns:
+            {'total_collected': 50, 'new_ads': 25, 'apify': 20, 'serpapi': 5, 'skipped_queries': 3,
+             'serpapi_pages': 8}
+        """
+        if search_queries is None:
+            search_queries = DEFAULT_SEARCH_QUERIES
+        
+        concurrency = dict(Config.PROVIDER_CONCURRENCY)
+        if provider_concurrency:
+            concurrency.update(provider_concurrency)
+        
+        results = {
+            'total_collected': 0,
+            'new_ads': 0,
+            'apify': 0,
+            'serpapi': 0,
+            'skipped_queries': 0,
+            'serpapi_pages': 0
+        }
+        
+        # (API 소스, 수집 함수, 인자 생성 함수, 결과 키)
+        providers = []
+        if self.apify_token and self.apify_mode != 'async':
+            providers.append(("Apify", self.save_ads_with_apify,
+                              lambda q: (q, max_ads_per_query, False), 'apify'))
+        if self.serp_api_key:
+            providers.append(("SerpAPI", self.collect_ads_with_serpapi, lambda q: (q, False), 'serpapi'))
         
+        labels = [f"{p[0]}: {max(1, concurrency.get(p[0], 1))}개 동시" for p in providers]
+        if self.apify_token and self.apify_mode == 'async':
+            labels.append("Apify: 비동기 실행")
+        logger.info(f"🚀 동시 광고 수집 시작 - {len(search_queries)}개 검색어 ({', '.join(labels)})")
+        
+        collected_per_query = {query: 0 for query in search_queries}
+        executors = []
+        futures = {}
+        
+        self._start_page_budget()
+        try:
+            for api_source, collect_fn, make_args, result_key in providers:
+                due = self._select_due(search_queries, api_source, due_queries)
+                executor = ThreadPoolExecutor(
+                    max_workers=max(1, concurrency.get(api_source, 1)),
+                    thread_name_prefix=f"collect-{api_source}"
+                )
+                executors.append(executor)
+                for query in search_queries:
+                    if not due.get(query):
+                        continue
+                    future = executor.submit(collect_fn, *make_args(query))
+                    futures[future] = (query, api_source, result_key)
+            
+            # Apify 비동기 실행은 스레드 없이 이 스레드에서 폴링 (그동안 다른 API 소스는 스레드 풀에서 진행)
+            if self.apify_token and self.apify_mode == 'async':
+                due = self._select_due(search_queries, "Apify", due_queries)
+                apify_collected = self._collect_apify_runs([q for q in search_queries if due.get(q)],
+                                                           max_ads_per_query, results)
+                for query, count in apify_collected.items():
+                    collected_per_query[query] += count
+            
+            for future in as_completed(futures):
+                query, api_source, result_key = futures[future]
+                try:
+                    ads = future.result()
+                except Exception as e:
+                    logger.error(f"{api_source} '{query}' 수집 중 오류: {e}")
+                    continue
+                
+                if isinstance(ads, tuple):
+                    count, new_count = ads  # save_ads_with_apify: 작업자 스레드에서 이미 저장
+                elif ads:
+                    count, new_count = len(ads), self._save_collected(ads, query, api_source)
+                else:
+                    count = 0
+                if count:
+                    results['total_collected'] += count
+                    results['new_ads'] += new_count
+                    results[result_key] += count
+                    collected_per_query[query] += count
+                    print(f"   ✅ [{api_source}] '{query}': {count}개 수집")
+        finally:
+            for executor in executors:
+                executor.shutdown(wait=True)
+            self._end_page_budget()
+        
+        results['skipped_queries'] = sum(1 for count in collected_per_query.values() if count == 0)
+        results['serpapi_pages'] = self.serpapi_pages_used
+        self._sample_yields()
         return results
     
     def get_database_stats(self) -> dict:
         """데이터베이스 통계 조회"""
         return self.db.get_statistics()
     
-    def export_for_web_service(self, status: str = 'pending', limit: int = 100) -> list:
+    def get_http_metrics(self) -> Dict[str, dict]:
+        """API 소스별 호출 지연 시간 지표"""
+        return self._http.get_metrics() if self._http else {}
+    
+    def get_seen_filter_stats(self) -> dict:
+        """기존 영상 사전 필터 상태 (메모리 사용량, 오탐률)"""
+        return self.seen_filter.stats() if self.seen_filter else {}
+    
+    def get_refresh_stats(self) -> Dict[str, dict]:
+        """API 소스별 오늘 호출 수 / 일일 예산"""
+        return self.refresh_policy.get_stats()
+    
+    def get_cache_stats(self) -> dict:
+        """API 응답 캐시 상태 (적중/미적중, 크기)"""
+        return self.response_cache.stats() if self.response_cache else {'mode': 'off'}
+    
+    def export_for_web_service(self, status: str = 'pending', limit: int = 100, after_id: int = 0) -> list:
         """
         웹서비스 연동용 데이터 추출
         
         Args:
             status: 'pending', 'all'
             limit: 최대 개수
-            
+            after_id: 이 id 다음부터 (이전 호출의 마지막 id, status 가 'pending' 이 아닐 때)
+        
         Returns:
             [{'id': 1, 'title': '...', 'url': '...', 'note': '...'}, ...]
         """
         if status == 'pending':
             return self.db.get_pending_analysis(limit)
         else:
-            # 모든 데이터 조회 로직 (필요시 구현)
-            pass
+            return list(self.db.iter_ads(status, after_id, limit=limit))
+
+def _max_ads_per_query(max_ads: Optional[int], default: int = 20) -> int:
+    """
+    검색어당 최대 수집 개수
+    
+    --max-ads 인자 → MAX_ADS_PER_QUERY 환경 변수 → (터미널에서 직접 실행한 경우만) 입력 순서로 정함
+    """
+    if max_ads is not None:
+        return max_ads
+    if os.getenv('MAX_ADS_PER_QUERY'):
+        return int(os.getenv('MAX_ADS_PER_QUERY'))
+    if sys.stdin.isatty():
+        return int(input(f"\n🎯 검색어당 최대 수집 개수 (기본값: {default}): ") or str(default))
+    return default
 
 def main():
     """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="YouTube 광고 동영상 URL 수집 (DB 연동)")
+    parser.add_argument('--max-ads', type=int, default=None, help="검색어당 최대 수집 개수 (기본값: 20)")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    
     print("🚀 YouTube 광고 동영상 URL 자동 수집 엔진 (DB 연동)")
     print("=" * 60)
     
-    # API 키 설정
+    # API 키 설정 (SerpAPI 키는 코드에 두지 않음)
     apify_token = os.getenv('APIFY_TOKEN')
     serp_api_key = os.getenv('SERPAPI_KEY')
     
-    if not apify_token and not serp_api_key:
-        print("🔑 API 키 입력")
-        serp_api_key = "646e6386e54a3e331122aa9460166830bcdbd35c89283b857dcf66901e11db2a"
-        if not apify_token and not serp_api_key:
-            logger.error("최소 하나의 API 키가 필요합니다!")
-            return
+    if not serp_api_key:
+        logger.error("SERPAPI_KEY 환경 변수가 설정되지 않았습니다 (export SERPAPI_KEY=...)")
+        return 1
     
     # 수집기 초기화
     collector = YouTubeAdsCollectorDB(
@@ -315,7 +805,7 @@ def main():
     
     # 사용자 설정
     try:
-        max_ads = int(input(f"\n🎯 검색어당 최대 수집 개수 (기본값: 20): ") or "20")
+        max_ads = _max_ads_per_query(args.max_ads)
         
         # 수집 실행
         print(f"\n🚀 광고 수집 시작...")
@@ -352,7 +842,7 @@ def main():
                     print()
         else:
             print(f"\n💡 신규 광고가 없습니다. (중복 제거됨)")
-            
+    
     except KeyboardInterrupt:
         print("\n\n⏸️ 사용자에 의해 중단되었습니다.")
     except ValueError:
@@ -361,6 +851,6 @@ def main():
         logger.error(f"실행 중 오류 발생: {e}")
 
 if __name__ == "__main__":
-
-    main()
+    
+    sys.exit(main())
 
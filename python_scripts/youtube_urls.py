@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+YouTube URL 정규화
+- watch / shorts / embed / youtu.be / 추적 파라미터 URL 에서 11자리 video ID 추출
+- 같은 영상은 항상 같은 watch URL 로 저장
+"""
+
+import re
+from typing import Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+VIDEO_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{11}$')
+
+YOUTUBE_HOSTS = (
+    'youtube.com',
+    'www.youtube.com',
+    'm.youtube.com',
+    'music.youtube.com',
+    'youtube-nocookie.com',
+    'www.youtube-nocookie.com'
+)
+
+# /shorts/<id>, /embed/<id>, /v/<id>, /live/<id>
+PATH_PREFIXES = ('shorts', 'embed', 'v', 'live')
+
+# 광고 리다이렉트 URL 에서 실제 대상 URL 을 담는 파라미터
+REDIRECT_PARAMS = ('adurl', 'url', 'u', 'q')
+
+def is_valid_video_id(value: Optional[str]) -> bool:
+    """11자리 YouTube video ID 형식인지 확인"""
+    return bool(value) and bool(VIDEO_ID_PATTERN.match(value))
+
+def extract_video_id(url: Optional[str], _depth: int = 0) -> Optional[str]:
+    """
+    URL 에서 video ID 추출
+    
+    Examples:
+        https://www.youtube.com/watch?v=dQw4w9WgXcQ&pp=ygU... → dQw4w9WgXcQ
+        https://youtu.be/dQw4w9WgXcQ?si=abc               → dQw4w9WgXcQ
+        https://www.youtube.com/shorts/dQw4w9WgXcQ         → dQw4w9WgXcQ
+    
+    Returns:
+        video ID, 추출할 수 없으면 None
+    """
+    if not url:
+        return None
+    
+    url = url.strip()
+    if '://' not in url:
+        url = f"https://{url}"
+    
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return None
+    
+    host = (parts.hostname or '').lower()
+    query = parse_qs(parts.query)
+    segments = [segment for segment in parts.path.split('/') if segment]
+    
+    if host == 'youtu.be':
+        if segments and is_valid_video_id(segments[0]):
+            return segments[0]
+        return None
+    
+    if host in YOUTUBE_HOSTS:
+        video_id = (query.get('v') or [None])[0]
+        if is_valid_video_id(video_id):
+            return video_id
+        
+        if len(segments) >= 2 and segments[0] in PATH_PREFIXES and is_valid_video_id(segments[1]):
+            return segments[1]
+        return None
+    
+    # 광고 클릭 추적 URL (googleadservices 등) 은 대상 URL 을 한 번만 따라간다
+    if _depth == 0:
+        for param in REDIRECT_PARAMS:
+            for target in query.get(param, []):
+                video_id = extract_video_id(target, _depth=1)
+                if video_id:
+                    return video_id
+    
+    return None
+
+def canonical_url(video_id: str) -> str:
+    """video ID 의 표준 watch URL"""
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+def canonicalize(url: str) -> Tuple[str, Optional[str]]:
+    """
+    URL 정규화
+    
+    Returns:
+        (표준 URL, video ID) - video ID 를 찾지 못하면 (원래 URL, None)
+    """
+    video_id = extract_video_id(url)
+    if video_id:
+        return canonical_url(video_id), video_id
+    return url, None
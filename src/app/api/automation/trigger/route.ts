@@ -1,72 +1,11 @@
 import { NextRequest, NextResponse } from 'next/server';
-import { spawn } from 'child_process';
 import path from 'path';
-import fs from 'fs/promises';
+import { getCollectorWorker } from '@/lib/collector-worker';
 
-// Python 스크립트 실행 함수
+// Python 수집 실행 (상주 작업자에 수집 명령 전송, 진행 상황은 이벤트로 바로 로그)
 async function runPythonCollector(maxAds: number = 20): Promise<any> {
-  return new Promise((resolve, reject) => {
-    const scriptPath = path.join(process.cwd(), 'python_scripts', 'youtube_ads_collector_with_db.py');
-    const venvPython = path.join(process.cwd(), 'venv', 'bin', 'python');
-    
-    // Python 스크립트에 파라미터 전달을 위한 환경변수
-    const env = {
-      ...process.env,
-      MAX_ADS_PER_QUERY: maxAds.toString(),
-      AUTO_MODE: 'true', // 대화형 입력 스킵
-    };
-    
-    const pythonProcess = spawn(venvPython, [scriptPath], {
-      env,
-      cwd: process.cwd(),
-    });
-    
-    let output = '';
-    let errorOutput = '';
-    
-    pythonProcess.stdout.on('data', (data) => {
-      output += data.toString();
-      console.log('[Python]:', data.toString().trim());
-    });
-    
-    pythonProcess.stderr.on('data', (data) => {
-      errorOutput += data.toString();
-      console.error('[Python Error]:', data.toString().trim());
-    });
-    
-    pythonProcess.on('close', (code) => {
-      if (code === 0) {
-        // 결과 파싱 시도
-        try {
-          // Python 출력에서 JSON 결과 추출
-          const lines = output.split('\n');
-          const resultLine = lines.find(line => line.includes('RESULT_JSON:'));
-          
-          if (resultLine) {
-            const jsonStr = resultLine.replace('RESULT_JSON:', '').trim();
-            const result = JSON.parse(jsonStr);
-            resolve(result);
-          } else {
-            // JSON이 없으면 기본 성공 응답
-            resolve({
-              success: true,
-              output: output,
-            });
-          }
-        } catch (e) {
-          resolve({
-            success: true,
-            output: output,
-          });
-        }
-      } else {
-        reject(new Error(`Python script exited with code ${code}: ${errorOutput}`));
-      }
-    });
-    
-    pythonProcess.on('error', (error) => {
-      reject(error);
-    });
+  return getCollectorWorker().collect({ maxAdsPerQuery: maxAds }, (message) => {
+    console.log('[Python]:', message);
   });
 }
 
@@ -260,7 +199,18 @@ export async function GET(req: NextRequest) {
     const dbPath = path.join(process.cwd(), 'data', 'youtube_ads.db');
     
     const { execSync } = require('child_process');
-    const statsQuery = `
+    // ads_stats: database_setup.py 의 트리거가 유지하는 카운터 (폴링해도 전체 테이블 스캔 없음)
+    // 아직 마이그레이션 전의 DB (ads_stats 없음) 는 youtube_ads 를 직접 집계
+    const hasCounters = execSync(
+      `sqlite3 "${dbPath}" "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ads_stats';"`
+    ).toString().trim() === '1';
+    const statsQuery = hasCounters ? `
+      SELECT 
+        COALESCE((SELECT count FROM ads_stats WHERE dimension = 'total'), 0) as total_ads,
+        COALESCE((SELECT count FROM ads_stats WHERE dimension = 'status' AND key = 'pending'), 0) as pending,
+        COALESCE((SELECT count FROM ads_stats WHERE dimension = 'status' AND key = 'completed'), 0) as completed,
+        (SELECT MAX(collected_at) FROM youtube_ads) as latest_collection;
+    ` : `
       SELECT 
         COUNT(*) as total_ads,
         SUM(CASE WHEN analysis_status = 'pending' THEN 1 ELSE 0 END) as pending,
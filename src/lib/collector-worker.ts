@@ -0,0 +1,298 @@
+import { spawn, ChildProcessWithoutNullStreams } from 'child_process';
+import * as fs from 'fs';
+import * as path from 'path';
+import * as readline from 'readline';
+
+/**
+ * 상주 Python 수집 작업자 클라이언트 (python_scripts/collector_worker.py)
+ * - 작업자를 한 번만 띄워 두고 JSON-lines 명령을 표준 입력으로 보냄
+ *   (수집할 때마다 인터프리터 기동/모듈 import/DB 초기화를 반복하지 않음)
+ * - 작업자가 명령을 꺼내 실행을 시작하면 started, 진행 중 출력은 progress 이벤트로 바로 전달,
+ *   명령이 끝나면 result / error 이벤트
+ * - 작업자가 종료되면 다음 요청 때 다시 띄움
+ */
+
+export interface WorkerEvent {
+  id?: string | null;
+  event: 'ready' | 'started' | 'progress' | 'result' | 'error';
+  message?: string;
+  data?: any;
+  error?: string;
+  pid?: number;
+}
+
+export interface CollectRequest {
+  searchQueries?: string[];
+  maxAdsPerQuery?: number;
+  concurrent?: boolean;
+  timeoutMs?: number;  // 0 이면 제한 없음 (Apify 비동기 실행은 APIFY_RUN_TIMEOUT_SECONDS 까지 걸릴 수 있음)
+}
+
+export interface CollectResult {
+  success: boolean;
+  total_collected: number;
+  new_ads: number;
+  apify: number;
+  serpapi: number;
+  skipped_queries: number;
+  serpapi_pages: number;
+  stats: any;
+  [key: string]: any;
+}
+
+export interface WorkerOptions {
+  apifyToken?: string;
+  serpApiKey?: string;
+  dbPath?: string;
+}
+
+type ProgressHandler = (message: string) => void;
+
+interface PendingRequest {
+  cmd: string;
+  args: Record<string, any>;
+  resolve: (data: any) => void;
+  reject: (error: Error) => void;
+  onProgress?: ProgressHandler;
+  timeoutMs: number;
+  started?: boolean;  // 작업자가 실행을 시작함 (started 이벤트)
+  timer?: NodeJS.Timeout;
+}
+
+// 조회 명령 제한 시간
+const QUERY_TIMEOUT_MS = 30000;
+
+export class CollectorWorker {
+  private options: WorkerOptions;
+  private process: ChildProcessWithoutNullStreams | null = null;
+  private ready: Promise<void> | null = null;
+  private pending = new Map<string, PendingRequest>();
+  private nextId = 0;
+  
+  constructor(options: WorkerOptions = {}) {
+    this.options = options;
+  }
+  
+  /**
+   * 작업자 실행 (이미 실행 중이면 준비 완료까지 대기)
+   * SERPAPI_KEY (환경 변수 또는 serpApiKey 옵션) 가 없으면 실행하지 않고 실패
+   */
+  start(): Promise<void> {
+    if (this.ready) {
+      return this.ready;
+    }
+    
+    const serpApiKey = this.options.serpApiKey || process.env.SERPAPI_KEY;
+    if (!serpApiKey) {
+      return Promise.reject(new Error('SERPAPI_KEY is not set: export it or pass serpApiKey to CollectorWorker'));
+    }
+    
+    const scriptPath = path.join(process.cwd(), 'python_scripts', 'collector_worker.py');
+    const venvPython = path.join(process.cwd(), 'venv', 'bin', 'python');
+    const python = process.env.PYTHON_BIN || (fs.existsSync(venvPython) ? venvPython : 'python3');
+    const args = [scriptPath];
+    const dbPath = this.options.dbPath || process.env.COLLECTOR_DB_PATH;
+    if (dbPath) {
+      args.push('--db', dbPath);
+    }
+    
+    const child = spawn(python, args, {
+      cwd: process.cwd(),
+      env: {
+        ...process.env,
+        APIFY_TOKEN: this.options.apifyToken || process.env.APIFY_TOKEN || '',
+        SERPAPI_KEY: serpApiKey,
+        PYTHONUNBUFFERED: '1'
+      },
+      stdio: ['pipe', 'pipe', 'pipe']
+    });
+    this.process = child;
+    
+    this.ready = new Promise<void>((resolve, reject) => {
+      const lines = readline.createInterface({ input: child.stdout });
+      lines.on('line', (line) => {
+        let event: WorkerEvent;
+        try {
+          event = JSON.parse(line);
+        } catch (e) {
+          console.log(`[Collector Worker] ${line}`);
+          return;
+        }
+        if (event.event === 'ready') {
+          console.log(`✅ 수집 작업자 준비 완료 (PID ${event.pid})`);
+          resolve();
+          return;
+        }
+        this.dispatch(event);
+      });
+      
+      child.stderr.on('data', (data) => {
+        console.error(`[Collector Worker Error] ${data.toString().trim()}`);
+      });
+      
+      child.on('error', (error) => {
+        console.error('❌ 수집 작업자 시작 실패:', error);
+        this.handleExit(child, new Error(`Failed to start collector worker: ${error.message}`));
+        reject(error);
+      });
+      
+      child.on('close', (code) => {
+        const error = new Error(`Collector worker exited with code ${code}`);
+        this.handleExit(child, error);
+        reject(error);
+      });
+    });
+    
+    return this.ready;
+  }
+  
+  private dispatch(event: WorkerEvent) {
+    const request = event.id != null ? this.pending.get(String(event.id)) : undefined;
+    
+    if (event.event === 'progress') {
+      if (request?.onProgress) {
+        request.onProgress(event.message || '');
+      } else {
+        console.log(`[Collector Worker] ${event.message}`);
+      }
+      return;
+    }
+    
+    if (event.event === 'started') {
+      // 제한 시간은 앞선 명령을 기다린 시간을 빼고 실제로 실행을 시작한 때부터 잰다
+      if (request && !request.started) {
+        request.started = true;
+        if (request.timeoutMs > 0) {
+          request.timer = setTimeout(() => this.timeout(String(event.id)), request.timeoutMs);
+        }
+      }
+      return;
+    }
+    
+    if (!request) {
+      if (event.event === 'error') {
+        console.error(`[Collector Worker Error] ${event.error}`);
+      }
+      return;
+    }
+    
+    this.pending.delete(String(event.id));
+    if (request.timer) {
+      clearTimeout(request.timer);
+    }
+    if (event.event === 'result') {
+      request.resolve(event.data);
+    } else {
+      request.reject(new Error(event.error || 'Collector worker error'));
+    }
+  }
+  
+  private handleExit(child: ChildProcessWithoutNullStreams, error: Error) {
+    // 이미 교체된 예전 작업자의 종료 이벤트는 무시
+    if (this.process !== child) {
+      return;
+    }
+    this.process = null;
+    this.ready = null;
+    for (const [id, request] of Array.from(this.pending.entries())) {
+      if (request.timer) {
+        clearTimeout(request.timer);
+      }
+      request.reject(error);
+      this.pending.delete(id);
+    }
+  }
+  
+  /**
+   * 명령 전송 후 result 이벤트까지 대기
+   *
+   * 작업자는 명령을 한 번에 하나씩 처리하므로 앞선 명령이 끝난 뒤에 시작된다.
+   * 제한 시간(timeoutMs > 0)은 작업자가 이 명령을 시작한 때부터 재며, 지나면 이 요청만 실패로 처리한다.
+   */
+  async request<T = any>(cmd: string, args: Record<string, any> = {},
+                         onProgress?: ProgressHandler, timeoutMs: number = 0): Promise<T> {
+    await this.start();
+    const id = String(++this.nextId);
+    return new Promise<T>((resolve, reject) => {
+      this.send(id, { cmd, args, resolve, reject, onProgress, timeoutMs });
+    });
+  }
+  
+  private send(id: string, request: PendingRequest) {
+    const child = this.process;
+    if (!child) {
+      request.reject(new Error('Collector worker is not running'));
+      return;
+    }
+    this.pending.set(id, request);
+    child.stdin.write(JSON.stringify({ id, cmd: request.cmd, args: request.args }) + '\n');
+  }
+  
+  /**
+   * 실행 중인 명령의 제한 시간 초과
+   *
+   * 실행 중인 명령은 멈출 방법이 없으므로 작업자를 종료하고,
+   * 뒤에서 기다리던 (아직 시작하지 않은) 요청은 새로 띄운 작업자에 같은 순서로 다시 보낸다.
+   */
+  private timeout(id: string) {
+    const request = this.pending.get(id);
+    if (!request) {
+      return;
+    }
+    this.pending.delete(id);
+    request.reject(new Error(`Collector worker timeout (${Math.round(request.timeoutMs / 1000)}s): ${request.cmd}`));
+    
+    const queued = Array.from(this.pending.entries()).filter(([, waiting]) => !waiting.started);
+    for (const [queuedId] of queued) {
+      this.pending.delete(queuedId);
+    }
+    this.stop();
+    
+    for (const [queuedId, waiting] of queued) {
+      this.start().then(() => this.send(queuedId, waiting), waiting.reject);
+    }
+  }
+  
+  /**
+   * 광고 수집 1회 (결과는 auto wrapper 의 RESULT_JSON 과 같은 형태)
+   */
+  collect(options: CollectRequest = {}, onProgress?: ProgressHandler): Promise<CollectResult> {
+    const { searchQueries, maxAdsPerQuery = 30, concurrent = true, timeoutMs = 0 } = options;
+    return this.request<CollectResult>('collect', {
+      search_queries: searchQueries,
+      max_ads_per_query: maxAdsPerQuery,
+      concurrent
+    }, onProgress, timeoutMs);
+  }
+  
+  stats(): Promise<any> {
+    return this.request('stats', {}, undefined, QUERY_TIMEOUT_MS);
+  }
+  
+  /**
+   * 작업자 종료 (진행 중인 요청은 실패 처리)
+   */
+  stop() {
+    const child = this.process;
+    if (child) {
+      this.handleExit(child, new Error('Collector worker stopped'));
+      child.kill('SIGTERM');
+    }
+  }
+}
+
+// Next.js 개발 서버의 모듈 재로딩에도 작업자를 하나만 유지 (API 키 조합별)
+const globalWorkers = globalThis as unknown as { __collectorWorkers?: Map<string, CollectorWorker> };
+
+export function getCollectorWorker(options: WorkerOptions = {}): CollectorWorker {
+  if (!globalWorkers.__collectorWorkers) {
+    globalWorkers.__collectorWorkers = new Map();
+  }
+  const key = JSON.stringify([options.apifyToken || '', options.serpApiKey || '', options.dbPath || '']);
+  let worker = globalWorkers.__collectorWorkers.get(key);
+  if (!worker) {
+    worker = new CollectorWorker(options);
+    globalWorkers.__collectorWorkers.set(key, worker);
+  }
+  return worker;
+}
@@ -15,7 +15,7 @@ export class WebServiceConnector {
       const pythonScript = path.join(process.cwd(), 'python_scripts', 'web_service_connector.py');
       const venvPython = path.join(process.cwd(), 'venv', 'bin', 'python');
       
-      const pythonProcess = spawn(venvPython, [pythonScript], {
+      const pythonProcess = spawn(venvPython, [pythonScript, '--mode', '1', '--batch-size', String(batchSize)], {
         env: {
           ...process.env,
           WEB_SERVICE_URL: this.webServiceUrl,
@@ -1,5 +1,5 @@
-import { spawn } from 'child_process';
 import * as path from 'path';
+import { getCollectorWorker } from './collector-worker';
 
 export class YouTubeAdsCollectorDB {
   private apifyToken?: string;
@@ -11,85 +11,41 @@ export class YouTubeAdsCollectorDB {
   }
 
   async collect_all_ads(searchQueries?: string[], batchSize: number = 20) {
-    return new Promise<any>((resolve, reject) => {
-      const pythonScript = path.join(process.cwd(), 'python_scripts', 'youtube_ads_collector_with_db.py');
-      const venvPython = path.join(process.cwd(), 'venv', 'bin', 'python');
-      
-      const pythonProcess = spawn(venvPython, [pythonScript], {
-        env: {
-          ...process.env,
-          SERPAPI_KEY: this.serpApiKey || process.env.SERPAPI_KEY || '646e6386e54a3e331122aa9460166830bcdbd35c89283b857dcf66901e11db2a',
-          APIFY_TOKEN: this.apifyToken || process.env.APIFY_TOKEN || '',
-          PYTHONUNBUFFERED: '1'
-        },
-        stdio: ['pipe', 'pipe', 'pipe']
-      });
-
-      let output = '';
-      let errorOutput = '';
-
-      pythonProcess.stdout.on('data', (data) => {
-        output += data.toString();
-      });
-
-      pythonProcess.stderr.on('data', (data) => {
-        errorOutput += data.toString();
-      });
-
-      pythonProcess.on('close', (code) => {
-        if (code === 0) {
-          // Python 스크립트에서 JSON 결과 파싱
-          try {
-            const lines = output.split('\n');
-            const resultLine = lines.find(line => line.includes('RESULT_JSON:'));
-            if (resultLine) {
-              const jsonStr = resultLine.replace('RESULT_JSON:', '').trim();
-              const result = JSON.parse(jsonStr);
-              resolve(result);
-            } else {
-              resolve({
-                total_collected: 0,
-                new_ads: 0,
-                serpapi: 0,
-                skipped_queries: 0
-              });
-            }
-          } catch (e) {
-            console.error('Failed to parse Python script output:', e);
-            resolve({
-              total_collected: 0,
-              new_ads: 0,
-              serpapi: 0,
-              skipped_queries: 0
-            });
-          }
-        } else {
-          reject(new Error(`Python script failed with code ${code}: ${errorOutput}`));
-        }
-      });
-
-      pythonProcess.on('error', (error) => {
-        reject(error);
-      });
-
-      // 자동으로 실행하도록 stdin 닫기
-      pythonProcess.stdin.end();
-    });
+    // 상주 Python 작업자에서 수집 (결과는 RESULT_JSON 과 같은 형태)
+    const worker = getCollectorWorker({ apifyToken: this.apifyToken, serpApiKey: this.serpApiKey });
+    return worker.collect({ searchQueries, maxAdsPerQuery: batchSize });
   }
 
   async get_database_stats() {
     return new Promise<any>((resolve, reject) => {
-      const { spawn } = require('child_process');
+      const { spawn, spawnSync } = require('child_process');
+      const dbPath = path.join(process.cwd(), 'youtube_ads.db');
+      
+      // ads_stats: database_setup.py 의 트리거가 유지하는 카운터 (전체 테이블 스캔 없음)
+      // 아직 마이그레이션 전의 DB (ads_stats 없음) 는 youtube_ads 를 직접 집계
+      const check = spawnSync('sqlite3', [
+        dbPath,
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ads_stats'"
+      ]);
+      const hasCounters = check.status === 0 && String(check.stdout).trim() === '1';
       
       const sqlite = spawn('sqlite3', [
-        path.join(process.cwd(), 'youtube_ads.db'), 
+        dbPath, 
         '-json', 
-        `SELECT 
-          (SELECT COUNT(*) FROM youtube_ads) as total_ads,
-          (SELECT COUNT(*) FROM youtube_ads WHERE analysis_status = 'pending') as pending,
-          (SELECT COUNT(*) FROM youtube_ads WHERE analysis_status = 'completed') as completed,
-          (SELECT COUNT(*) FROM youtube_ads WHERE analysis_status = 'failed') as failed,
-          (SELECT MAX(collected_at) FROM youtube_ads) as latest_collection`
+        hasCounters
+          ? `SELECT 
+              COALESCE((SELECT count FROM ads_stats WHERE dimension = 'total'), 0) as total_ads,
+              COALESCE((SELECT count FROM ads_stats WHERE dimension = 'status' AND key = 'pending'), 0) as pending,
+              COALESCE((SELECT count FROM ads_stats WHERE dimension = 'status' AND key = 'completed'), 0) as completed,
+              COALESCE((SELECT count FROM ads_stats WHERE dimension = 'status' AND key = 'failed'), 0) as failed,
+              (SELECT MAX(collected_at) FROM youtube_ads) as latest_collection`
+          : `SELECT 
+              COUNT(*) as total_ads,
+              SUM(CASE WHEN analysis_status = 'pending' THEN 1 ELSE 0 END) as pending,
+              SUM(CASE WHEN analysis_status = 'completed' THEN 1 ELSE 0 END) as completed,
+              SUM(CASE WHEN analysis_status = 'failed' THEN 1 ELSE 0 END) as failed,
+              MAX(collected_at) as latest_collection
+            FROM youtube_ads`
       ]);
       
       let output = '';